@@ -1,10 +1,35 @@
 import sys
 import os
+import logging
 
-# Add backend directory to Python path
+# Add repository root and backend directory to Python path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'backend'))
 
-from backend.server import app
+from backend.server import app as backend_app
+from database import ensure_connection
+
+logger = logging.getLogger(__name__)
+
+class ServerlessApp:
+    """Wrap the FastAPI app for per-invocation runtimes
+
+    Vercel does not run the lifespan handler, so the cached Mongo client is
+    pre-checked here instead: the first invocation of a container warms the
+    pool and later warm invocations reuse it, re-pinging at most once per
+    MONGO_CONNECTION_CHECK_INTERVAL seconds.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http':
+            try:
+                await ensure_connection()
+            except Exception as e:
+                logger.error(f"MongoDB pre-check failed: {e}")
+        await self.app(scope, receive, send)
 
 # Export the FastAPI app for Vercel
-app = app
+app = ServerlessApp(backend_app)
@@ -0,0 +1,230 @@
+import asyncio
+import heapq
+import itertools
+import json
+import math
+import os
+import re
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Pattern
+
+import jwt
+
+from metrics import ADMISSION_IN_FLIGHT, ADMISSION_QUEUED, ADMISSION_REJECTED, ADMISSION_WAIT
+
+# Priority admission control. Requests are classified by method and path
+# before routing; each class has a concurrency limit, a bounded wait queue
+# and a queue timeout, and all classes share one in-flight budget. When
+# capacity frees up the highest-priority waiter goes first, and a request
+# whose queue is full or whose wait times out gets 503 with Retry-After.
+# Heavy admin endpoints get small limits and short queues, so under load
+# they queue and shed long before the student apply path does.
+
+ADMISSION_ENABLED = os.environ.get('ADMISSION_ENABLED', 'true').lower() != 'false'
+ADMISSION_MAX_IN_FLIGHT = int(os.environ.get('ADMISSION_MAX_IN_FLIGHT', 256))
+
+class PriorityClass(NamedTuple):
+    name: str
+    priority: int  # lower is served first
+    limit: int  # concurrent requests in this class
+    max_queue: int  # waiting requests before shedding
+    queue_timeout: float  # seconds a request may wait
+
+PRIORITY_CLASSES = {
+    'interactive': PriorityClass(
+        'interactive', 0,
+        int(os.environ.get('ADMISSION_INTERACTIVE_LIMIT', 200)),
+        int(os.environ.get('ADMISSION_INTERACTIVE_QUEUE', 1000)),
+        float(os.environ.get('ADMISSION_INTERACTIVE_TIMEOUT', 10)),
+    ),
+    'heavy': PriorityClass(
+        'heavy', 1,
+        int(os.environ.get('ADMISSION_HEAVY_LIMIT', 4)),
+        int(os.environ.get('ADMISSION_HEAVY_QUEUE', 16)),
+        float(os.environ.get('ADMISSION_HEAVY_TIMEOUT', 5)),
+    ),
+}
+DEFAULT_CLASS = 'interactive'
+
+class Rule(NamedTuple):
+    """Requests matching `method` and `pattern` (and `when`, if given) belong to `priority_class`"""
+    name: str
+    method: str
+    pattern: Pattern
+    priority_class: str
+    limit: Optional[int] = None  # per-route concurrency on top of the class limit
+    when: Optional[Callable[[dict], bool]] = None
+
+def rule(name: str, method: str, path: str, priority_class: str, limit: Optional[int] = None, when=None) -> Rule:
+    return Rule(name, method, re.compile(path), priority_class, limit, when)
+
+def _bearer_role(scope: dict) -> Optional[str]:
+    """Role claimed by the bearer token, unverified; only used to pick a queue, auth still verifies it"""
+    for name, value in scope['headers']:
+        if name == b'authorization':
+            scheme, _, token = value.decode('latin-1').partition(' ')
+            if scheme.lower() != 'bearer':
+                return None
+            try:
+                return jwt.decode(token, options={'verify_signature': False}).get('role')
+            except jwt.PyJWTError:
+                return None
+    return None
+
+def is_admin(scope: dict) -> bool:
+    return _bearer_role(scope) == 'admin'
+
+# Never queued or shed
+EXEMPT_PATHS = {'/health', '/metrics'}
+
+# First match wins; anything unmatched is 'interactive'
+ADMISSION_RULES = [
+    rule('analytics', 'GET', r'^/api/analytics(/|$)', 'heavy', limit=2),
+    rule('export', 'GET', r'^/api/export/', 'heavy', limit=2),
+    rule('ranking', 'GET', r'^/api/drives/[^/]+/ranking$', 'heavy'),
+    rule('admin_dashboard', 'GET', r'^/api/dashboard/admin(/|$)', 'heavy'),
+    rule('all_applications', 'GET', r'^/api/applications$', 'heavy', when=is_admin),
+    rule('notification_bulk', 'POST', r'^/api/notifications/(broadcast|digest/run)$', 'heavy', limit=1),
+]
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: float):
+        self.reason = reason
+        self.retry_after = retry_after
+
+class _Waiter:
+    __slots__ = ('future', 'priority_class', 'rule')
+
+    def __init__(self, future, priority_class, rule):
+        self.future = future
+        self.priority_class = priority_class
+        self.rule = rule
+
+class AdmissionController:
+    def __init__(self, rules: List[Rule] = ADMISSION_RULES, classes: Dict[str, PriorityClass] = PRIORITY_CLASSES,
+                 max_in_flight: int = ADMISSION_MAX_IN_FLIGHT):
+        self.rules = rules
+        self.classes = classes
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self._class_in_flight = {name: 0 for name in classes}
+        self._rule_in_flight = {r.name: 0 for r in rules}
+        self._queued = {name: 0 for name in classes}
+        self._waiters = []  # heap of (priority, seq, waiter)
+        self._seq = itertools.count()
+
+    def classify(self, scope: dict) -> tuple:
+        method, path = scope['method'], scope['path']
+        for r in self.rules:
+            if r.method == method and r.pattern.match(path) and (r.when is None or r.when(scope)):
+                return self.classes[r.priority_class], r
+        return self.classes[DEFAULT_CLASS], None
+
+    def _has_capacity(self, priority_class: PriorityClass, r: Optional[Rule]) -> bool:
+        return (self.in_flight < self.max_in_flight
+                and self._class_in_flight[priority_class.name] < priority_class.limit
+                and (r is None or r.limit is None or self._rule_in_flight[r.name] < r.limit))
+
+    def _take(self, priority_class: PriorityClass, r: Optional[Rule]) -> None:
+        self.in_flight += 1
+        self._class_in_flight[priority_class.name] += 1
+        if r is not None:
+            self._rule_in_flight[r.name] += 1
+        ADMISSION_IN_FLIGHT.set(self._class_in_flight[priority_class.name], priority_class=priority_class.name)
+
+    def release(self, priority_class: PriorityClass, r: Optional[Rule]) -> None:
+        self.in_flight -= 1
+        self._class_in_flight[priority_class.name] -= 1
+        if r is not None:
+            self._rule_in_flight[r.name] -= 1
+        ADMISSION_IN_FLIGHT.set(self._class_in_flight[priority_class.name], priority_class=priority_class.name)
+        self._wake()
+
+    def _wake(self) -> None:
+        """Admit waiters in priority order while there is room for them"""
+        blocked = []
+        while self._waiters and self.in_flight < self.max_in_flight:
+            entry = heapq.heappop(self._waiters)
+            waiter = entry[2]
+            if waiter.future.done():  # timed out or cancelled
+                continue
+            if self._has_capacity(waiter.priority_class, waiter.rule):
+                self._take(waiter.priority_class, waiter.rule)
+                waiter.future.set_result(None)
+            else:
+                blocked.append(entry)  # its class or route is full; let lower priorities through
+        for entry in blocked:
+            heapq.heappush(self._waiters, entry)
+
+    def _waiting_ahead(self, priority_class: PriorityClass) -> bool:
+        """Whether requests of this or a higher priority are already queued (they go first)"""
+        return any(self._queued[c.name] for c in self.classes.values() if c.priority <= priority_class.priority)
+
+    async def acquire(self, priority_class: PriorityClass, r: Optional[Rule]) -> None:
+        if self._has_capacity(priority_class, r) and not self._waiting_ahead(priority_class):
+            self._take(priority_class, r)
+            return
+        if self._queued[priority_class.name] >= priority_class.max_queue:
+            raise Rejected('queue_full', priority_class.queue_timeout)
+
+        waiter = _Waiter(asyncio.get_running_loop().create_future(), priority_class, r)
+        heapq.heappush(self._waiters, (priority_class.priority, next(self._seq), waiter))
+        self._queued[priority_class.name] += 1
+        ADMISSION_QUEUED.set(self._queued[priority_class.name], priority_class=priority_class.name)
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), priority_class.queue_timeout)
+        except asyncio.TimeoutError:
+            if waiter.future.done():  # admitted just as the timeout fired
+                return
+            waiter.future.cancel()
+            raise Rejected('timeout', priority_class.queue_timeout)
+        except asyncio.CancelledError:
+            # Client went away: give back a slot granted in the meantime
+            if waiter.future.done() and not waiter.future.cancelled():
+                self.release(priority_class, r)
+            waiter.future.cancel()
+            raise
+        finally:
+            self._queued[priority_class.name] -= 1
+            ADMISSION_QUEUED.set(self._queued[priority_class.name], priority_class=priority_class.name)
+            ADMISSION_WAIT.observe(time.perf_counter() - started, priority_class=priority_class.name)
+
+class AdmissionMiddleware:
+    """Pure ASGI middleware applying an AdmissionController to HTTP requests"""
+
+    def __init__(self, app, controller: AdmissionController, enabled: bool = ADMISSION_ENABLED):
+        self.app = app
+        self.controller = controller
+        self.enabled = enabled
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http' or not self.enabled or scope['path'] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        priority_class, r = self.controller.classify(scope)
+        try:
+            await self.controller.acquire(priority_class, r)
+        except Rejected as e:
+            ADMISSION_REJECTED.inc(priority_class=priority_class.name, reason=e.reason)
+            await self.reject(send, e.retry_after)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release(priority_class, r)
+
+    @staticmethod
+    async def reject(send, retry_after: float) -> None:
+        body = json.dumps({'detail': 'Server is busy, please retry shortly'}).encode()
+        await send({
+            'type': 'http.response.start',
+            'status': 503,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(body)).encode()),
+                (b'retry-after', str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': body})
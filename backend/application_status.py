@@ -0,0 +1,65 @@
+import uuid
+from datetime import datetime
+from typing import Optional
+
+# Application status state machine. Every change is appended to the
+# application_events collection with the time spent in the previous stage,
+# so the funnel and time-in-stage analytics group events instead of
+# scanning applications.
+
+APPLIED = 'applied'
+WITHDRAWN = 'withdrawn'  # recorded when a student withdraws (the application is deleted)
+
+STATUSES = ('applied', 'shortlisted', 'interview', 'waitlisted', 'selected', 'rejected')
+
+# Forward-only: stages may be skipped (e.g. final results uploaded straight
+# from 'applied'), 'selected' and 'rejected' are final.
+TRANSITIONS = {
+    'applied': {'shortlisted', 'interview', 'waitlisted', 'selected', 'rejected'},
+    'shortlisted': {'interview', 'waitlisted', 'selected', 'rejected'},
+    'interview': {'waitlisted', 'selected', 'rejected'},
+    'waitlisted': {'shortlisted', 'interview', 'selected', 'rejected'},
+    'selected': set(),
+    'rejected': set(),
+}
+
+def transition_error(current: str, new: str) -> Optional[str]:
+    """Why `current` -> `new` is not allowed, or None if it is"""
+    if new not in TRANSITIONS.get(current, ()):
+        return f"Cannot move an application from '{current}' to '{new}'"
+    return None
+
+def status_changed_at(app: dict) -> str:
+    """When the application entered its current status (applications predating events use applied_at)"""
+    return app.get('status_changed_at') or app['applied_at']
+
+def status_event(app: dict, to_status: str, at: datetime, actor: Optional[str] = None) -> dict:
+    """Event for `app` leaving its current status for `to_status`"""
+    entered_at = status_changed_at(app)
+    return {
+        'id': f"event_{at.timestamp()}_{uuid.uuid4().hex[:8]}",
+        'application_id': app['id'],
+        'student_id': app['student_id'],
+        'drive_id': app['drive_id'],
+        'from_status': app['status'],
+        'to_status': to_status,
+        'entered_at': entered_at,
+        'duration_seconds': round((at - datetime.fromisoformat(entered_at)).total_seconds(), 3),
+        'at': at.isoformat(),
+        'actor': actor,
+    }
+
+def applied_event(app: dict, actor: Optional[str] = None) -> dict:
+    """First event of an application's timeline"""
+    return {
+        'id': f"event_{datetime.fromisoformat(app['applied_at']).timestamp()}_{uuid.uuid4().hex[:8]}",
+        'application_id': app['id'],
+        'student_id': app['student_id'],
+        'drive_id': app['drive_id'],
+        'from_status': None,
+        'to_status': APPLIED,
+        'entered_at': None,
+        'duration_seconds': None,
+        'at': app['applied_at'],
+        'actor': actor,
+    }
@@ -0,0 +1,242 @@
+import asyncio
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import datetime, timezone, timedelta
+from pathlib import Path
+
+import bcrypt
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+load_dotenv(BACKEND_DIR / '.env')
+
+from database import apply_indexes
+from drive_search import package_fields
+from snapshots import student_snapshot, drive_snapshot
+
+# Benchmarks never touch the application database unless told to
+BENCH_MONGO_URL = os.environ.get('BENCH_MONGO_URL', 'mongodb://localhost:27017')
+BENCH_DB_NAME = os.environ.get('BENCH_DB_NAME', 'placement_flow_bench')
+
+BENCH_PASSWORD = 'Bench1234'
+ADMIN_EMAIL = 'bench-admin@college.edu'
+
+DEPARTMENTS = [
+    'Computer Science', 'Information Technology', 'Electronics', 'Electrical',
+    'Mechanical', 'Civil', 'Chemical', 'Biotechnology',
+]
+BATCHES = [2024, 2025, 2026, 2027]
+SKILLS = [
+    'Python', 'Java', 'C++', 'JavaScript', 'TypeScript', 'React', 'Angular', 'Node.js',
+    'FastAPI', 'Django', 'Spring', 'SQL', 'MongoDB', 'PostgreSQL', 'AWS', 'Azure', 'GCP',
+    'Docker', 'Kubernetes', 'Linux', 'Git', 'Machine Learning', 'Deep Learning', 'NLP',
+    'Data Analysis', 'Pandas', 'TensorFlow', 'PyTorch', 'Go', 'Rust', 'Embedded C',
+    'VLSI', 'MATLAB', 'AutoCAD', 'SolidWorks', 'Excel', 'Power BI', 'Tableau',
+    'System Design', 'DSA',
+]
+COMPANIES = [
+    ('Google', 'Technology'), ('Microsoft', 'Technology'), ('Amazon', 'E-commerce'),
+    ('Goldman Sachs', 'Finance'), ('JP Morgan', 'Finance'), ('Infosys', 'IT Services'),
+    ('TCS', 'IT Services'), ('Wipro', 'IT Services'), ('Siemens', 'Manufacturing'),
+    ('L&T', 'Construction'), ('Bosch', 'Automotive'), ('Deloitte', 'Consulting'),
+]
+ROLES = ['Software Engineer', 'Data Analyst', 'Backend Developer', 'Frontend Developer',
+         'ML Engineer', 'Graduate Engineer Trainee', 'Business Analyst', 'Design Engineer']
+LOCATIONS = ['Bangalore', 'Hyderabad', 'Pune', 'Chennai', 'Mumbai', 'Gurgaon', 'Noida', 'Remote']
+APPLICATION_STATUSES = (['applied'] * 6 + ['shortlisted'] * 2 + ['interview', 'selected', 'rejected'])
+
+def student_docs(start: int, stop: int, password_hash: str, now: str):
+    users, profiles = [], []
+    for i in range(start, stop):
+        user_id = f"user_bench_{i}"
+        email = f"student{i}@bench.college.edu"
+        name = f"Student {i}"
+        users.append({
+            'id': user_id,
+            'email': email,
+            'password_hash': password_hash,
+            'role': 'student',
+            'name': name,
+            'created_at': now,
+        })
+        profiles.append({
+            'id': f"profile_{user_id}",
+            'user_id': user_id,
+            'name': name,
+            'email': email,
+            'department': random.choice(DEPARTMENTS),
+            'batch': random.choice(BATCHES),
+            'cgpa': round(random.uniform(6.0, 10.0), 2),
+            'skills': random.sample(SKILLS, random.randint(3, 8)),
+            'resume_url': None,
+        })
+    return users, profiles
+
+def drive_docs(count: int):
+    today = datetime.now()
+    drives = []
+    for j in range(count):
+        company, domain = random.choice(COMPANIES)
+        low = random.randint(3, 30)
+        package = f"{low}-{low + random.randint(1, 8)} LPA"
+        deadline = today + timedelta(days=random.randint(-30, 60))
+        drives.append({
+            'id': f"drive_bench_{j}",
+            'company_name': company,
+            'company_domain': domain,
+            'job_role': random.choice(ROLES),
+            'package': package,
+            **package_fields(package),
+            'location': random.choice(LOCATIONS),
+            'job_description': f"{company} is hiring for {random.choice(ROLES)} roles. "
+                               f"Work with {', '.join(random.sample(SKILLS, 3))}.",
+            'eligibility': {
+                'min_cgpa': round(random.uniform(6.0, 8.5), 1),
+                'required_skills': random.sample(SKILLS, random.randint(0, 4)),
+                'departments': random.sample(DEPARTMENTS, random.randint(1, 4)),
+                'batches': random.sample(BATCHES, random.randint(1, 2)),
+            },
+            'deadline': deadline.strftime('%Y-%m-%d'),
+            'status': 'active' if deadline >= today else 'closed',
+            'created_at': (deadline - timedelta(days=30)).isoformat(),
+        })
+    return drives
+
+def application_docs(start: int, stop: int, profiles: list, drives: list, seen: set):
+    """Applications for random (student, drive) pairs, with the snapshots apply_to_drive embeds"""
+    students = len(profiles)
+    applied = datetime.now(timezone.utc)
+    apps = []
+    k = start
+    while k < stop:
+        student, drive = random.randrange(students), random.randrange(len(drives))
+        pair = student * len(drives) + drive
+        if pair in seen:
+            continue
+        seen.add(pair)
+        apps.append({
+            'id': f"app_bench_{k}",
+            'student_id': f"user_bench_{student}",
+            'drive_id': f"drive_bench_{drive}",
+            'status': random.choice(APPLICATION_STATUSES),
+            'applied_at': (applied - timedelta(minutes=random.randint(0, 60 * 24 * 60))).isoformat(),
+            **drive_snapshot(drives[drive]),
+            **student_snapshot(profiles[student]),
+        })
+        k += 1
+    return apps
+
+async def insert_batches(collection, batches, concurrency: int):
+    """Insert batches with ordered=False, keeping a few in flight at once"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def insert(docs):
+        async with semaphore:
+            await collection.insert_many(docs, ordered=False)
+
+    await asyncio.gather(*(insert(docs) for docs in batches if docs))
+
+async def generate(args):
+    random.seed(args.seed)
+    client = AsyncIOMotorClient(args.mongo_url)
+    db = client[args.db_name]
+    total_started = time.perf_counter()
+
+    print(f"🌱 Generating campus in {args.db_name}: {args.students} students, "
+          f"{args.drives} drives, {args.applications} applications")
+    if args.applications > args.students * args.drives:
+        raise SystemExit("✗ More applications than (student, drive) pairs")
+
+    for name in ('users', 'student_profiles', 'placement_drives', 'applications', 'notifications'):
+        await db[name].drop()
+    await apply_indexes(db)
+    print("✓ Reset collections and applied index manifest")
+
+    now = datetime.now(timezone.utc).isoformat()
+    # One shared hash: hashing every synthetic password would dominate the run
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), bcrypt.gensalt(args.bcrypt_rounds)).decode('utf-8')
+    await db.users.insert_one({
+        'id': 'user_bench_admin',
+        'email': ADMIN_EMAIL,
+        'password_hash': password_hash,
+        'role': 'admin',
+        'name': 'Bench Admin',
+        'created_at': now,
+    })
+
+    started = time.perf_counter()
+    user_batches, profile_batches, all_profiles = [], [], []
+    for start in range(0, args.students, args.batch_size):
+        users, profiles = student_docs(start, min(start + args.batch_size, args.students), password_hash, now)
+        user_batches.append(users)
+        profile_batches.append(profiles)
+        all_profiles.extend(profiles)
+    await insert_batches(db.users, user_batches, args.concurrency)
+    await insert_batches(db.student_profiles, profile_batches, args.concurrency)
+    print(f"✓ Inserted {args.students} students in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    drives = drive_docs(args.drives)
+    await insert_batches(db.placement_drives, [drives[i:i + args.batch_size] for i in range(0, len(drives), args.batch_size)], args.concurrency)
+    print(f"✓ Inserted {args.drives} drives in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    seen = set()
+    pending = []
+    for start in range(0, args.applications, args.batch_size):
+        pending.append(application_docs(start, min(start + args.batch_size, args.applications), all_profiles, drives, seen))
+        if len(pending) >= args.concurrency:
+            await insert_batches(db.applications, pending, args.concurrency)
+            pending = []
+    await insert_batches(db.applications, pending, args.concurrency)
+    print(f"✓ Inserted {args.applications} applications in {time.perf_counter() - started:.1f}s")
+
+    client.close()
+    print(f"🎉 Campus generated in {time.perf_counter() - total_started:.1f}s "
+          f"(admin: {ADMIN_EMAIL} / {BENCH_PASSWORD})")
+
+async def populate(storage, students: int, drives: int, applications: int, bcrypt_rounds: int = 4, seed: int = 42):
+    """Fill a storage backend (e.g. MemoryStorage) with the same synthetic campus"""
+    random.seed(seed)
+    now = datetime.now(timezone.utc).isoformat()
+    password_hash = bcrypt.hashpw(BENCH_PASSWORD.encode('utf-8'), bcrypt.gensalt(bcrypt_rounds)).decode('utf-8')
+    await storage.users.insert({
+        'id': 'user_bench_admin', 'email': ADMIN_EMAIL, 'password_hash': password_hash,
+        'role': 'admin', 'name': 'Bench Admin', 'created_at': now,
+    })
+    users, profiles = student_docs(0, students, password_hash, now)
+    for user, profile in zip(users, profiles):
+        await storage.users.insert(user)
+        await storage.profiles.insert(profile)
+    drive_list = drive_docs(drives)
+    for drive in drive_list:
+        await storage.drives.insert(drive)
+    for app in application_docs(0, applications, profiles, drive_list, set()):
+        await storage.applications.insert(app)
+
+def parse_count(value: str) -> int:
+    """Accept counts like 50000, 50k or 1M"""
+    value = value.strip().lower()
+    multiplier = {'k': 1_000, 'm': 1_000_000}.get(value[-1], 1)
+    return int(float(value[:-1] if multiplier > 1 else value) * multiplier)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Generate a synthetic campus for benchmarks')
+    parser.add_argument('--students', type=parse_count, default=5_000)
+    parser.add_argument('--drives', type=parse_count, default=100)
+    parser.add_argument('--applications', type=parse_count, default=50_000)
+    parser.add_argument('--batch-size', type=int, default=5_000)
+    parser.add_argument('--concurrency', type=int, default=4, help='insert_many batches in flight')
+    parser.add_argument('--bcrypt-rounds', type=int, default=12)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--mongo-url', default=BENCH_MONGO_URL)
+    parser.add_argument('--db-name', default=BENCH_DB_NAME)
+    return parser
+
+if __name__ == "__main__":
+    asyncio.run(generate(build_parser().parse_args()))
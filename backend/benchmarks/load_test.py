@@ -0,0 +1,203 @@
+import asyncio
+import argparse
+import os
+import random
+import sys
+import time
+from collections import Counter
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from benchmarks.generate_campus import BENCH_MONGO_URL, BENCH_DB_NAME, BENCH_PASSWORD, parse_count, populate
+from benchmarks.report import summarize, print_table, save_results
+
+APPLICATION_STATUSES = ['shortlisted', 'interview', 'selected', 'rejected']
+
+# ============ Scenarios ============
+
+SCENARIOS = {}
+
+def scenario(name: str):
+    def register(fn):
+        SCENARIOS[name] = fn
+        return fn
+    return register
+
+@scenario('login_storm')
+async def login_storm(client, ctx, i):
+    student = random.randrange(ctx['students'])
+    return [await client.post('/api/auth/login', json={
+        'email': f"student{student}@bench.college.edu", 'password': BENCH_PASSWORD,
+    })]
+
+@scenario('student_dashboard')
+async def student_dashboard(client, ctx, i):
+    # Mirrors StudentDashboard.js: drives and applications fetched in parallel
+    headers = random.choice(ctx['student_headers'])
+    return await asyncio.gather(
+        client.get('/api/drives', headers=headers),
+        client.get('/api/applications', headers=headers),
+    )
+
+@scenario('admin_dashboard')
+async def admin_dashboard(client, ctx, i):
+    drive_id = f"drive_bench_{random.randrange(ctx['drives'])}"
+    return await asyncio.gather(
+        client.get(f'/api/drives/{drive_id}', headers=ctx['admin_headers']),
+        client.get(f'/api/applications/drive/{drive_id}', headers=ctx['admin_headers']),
+    )
+
+@scenario('apply_burst')
+async def apply_burst(client, ctx, i):
+    headers = random.choice(ctx['student_headers'])
+    drive_id = f"drive_bench_{random.randrange(ctx['drives'])}"
+    return [await client.post('/api/applications', json={'drive_id': drive_id}, headers=headers)]
+
+@scenario('bulk_status_updates')
+async def bulk_status_updates(client, ctx, i):
+    app_id = f"app_bench_{random.randrange(ctx['applications'])}"
+    return [await client.put(f'/api/applications/{app_id}/status',
+                             json={'status': random.choice(APPLICATION_STATUSES)},
+                             headers=ctx['admin_headers'])]
+
+@scenario('export')
+async def export(client, ctx, i):
+    drive_id = f"drive_bench_{random.randrange(ctx['drives'])}"
+    return [await client.get(f'/api/export/applications/{drive_id}', headers=ctx['admin_headers'])]
+
+@scenario('analytics')
+async def analytics(client, ctx, i):
+    return [await client.get('/api/analytics', headers=ctx['admin_headers'])]
+
+# Applies while admins pull reports: only the apply is timed, the heavy reads
+# run in the background and are counted as background_<status>
+@scenario('peak_apply')
+async def peak_apply(client, ctx, i):
+    if i % 2 == 0:
+        heavy = random.choice((analytics, export))
+        task = asyncio.create_task(heavy(client, ctx, i))
+        ctx.setdefault('background', set()).add(task)
+    return await apply_burst(client, ctx, i)
+
+# ============ Runner ============
+
+async def run_scenario(name, client, ctx, operations: int, concurrency: int) -> dict:
+    fn = SCENARIOS[name]
+    latencies = []
+    statuses = Counter()
+    counter = iter(range(operations))
+
+    async def worker():
+        for i in counter:
+            started = time.perf_counter()
+            try:
+                responses = await fn(client, ctx, i)
+                for response in responses:
+                    statuses[response.status_code] += 1
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    for result in await asyncio.gather(*ctx.pop('background', ()), return_exceptions=True):
+        if isinstance(result, Exception):
+            statuses[f'background_{type(result).__name__}'] += 1
+        else:
+            for response in result:
+                statuses[f'background_{response.status_code}'] += 1
+    return summarize(name, latencies, elapsed,
+                     concurrency=concurrency, statuses=dict(statuses))
+
+async def count_campus(args) -> dict:
+    if args.storage == 'memory':
+        from server import storage
+        await populate(storage, args.students, args.drives, args.applications, seed=args.seed)
+        return {'students': args.students, 'drives': args.drives, 'applications': args.applications}
+    from motor.motor_asyncio import AsyncIOMotorClient
+    mongo = AsyncIOMotorClient(args.mongo_url)
+    db = mongo[args.db_name]
+    counts = {
+        'students': await db.student_profiles.count_documents({}),
+        'drives': await db.placement_drives.count_documents({}),
+        'applications': await db.applications.count_documents({}),
+    }
+    mongo.close()
+    return counts
+
+async def build_context(args, create_token) -> dict:
+    ctx = await count_campus(args)
+    if not ctx['students'] or not ctx['drives']:
+        raise SystemExit("✗ Bench database is empty, run benchmarks/generate_campus.py first")
+
+    # Tokens are minted directly so the scenarios do not all pay for bcrypt
+    sample = random.sample(range(ctx['students']), min(args.users, ctx['students']))
+    ctx['student_headers'] = [
+        {'Authorization': f"Bearer {create_token(f'user_bench_{i}', 'student')}"} for i in sample
+    ]
+    ctx['admin_headers'] = {'Authorization': f"Bearer {create_token('user_bench_admin', 'admin')}"}
+    return ctx
+
+def make_client(args):
+    if args.base_url:
+        return httpx.AsyncClient(base_url=args.base_url, timeout=args.timeout)
+    from server import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://bench', timeout=args.timeout)
+
+async def main(args):
+    random.seed(args.seed)
+    if args.base_url and args.storage == 'memory':
+        raise SystemExit("✗ --storage memory only applies to the in-process app")
+    if not args.base_url:
+        # In-process runs serve the bench database through the real app
+        os.environ['MONGO_URL'] = args.mongo_url
+        os.environ['DB_NAME'] = args.db_name
+        os.environ.setdefault('INDEX_MODE', 'off')
+        os.environ['STORAGE_BACKEND'] = args.storage
+        if not args.with_rate_limits:
+            os.environ['RATE_LIMIT_ENABLED'] = 'false'
+    from server import create_token
+
+    ctx = await build_context(args, create_token)
+    print(f"🏫 Campus: {ctx['students']} students, {ctx['drives']} drives, {ctx['applications']} applications")
+    results = []
+    async with make_client(args) as client:
+        for name in args.scenarios:
+            if args.warmup:
+                await run_scenario(name, client, ctx, args.warmup, args.concurrency)
+            results.append(await run_scenario(name, client, ctx, args.operations, args.concurrency))
+            print(f"✓ {name}")
+    print()
+    print_table(results)
+    if args.json:
+        save_results(args.json, results)
+        print(f"\n✓ Results written to {args.json}")
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Run load scenarios against a generated campus')
+    parser.add_argument('--scenarios', nargs='+', choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument('--operations', type=int, default=500, help='operations per scenario')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=20, help='untimed operations per scenario')
+    parser.add_argument('--users', type=int, default=200, help='distinct students with tokens')
+    parser.add_argument('--base-url', help='target a running server instead of the in-process app')
+    parser.add_argument('--storage', choices=['mongo', 'memory'], default='mongo',
+                        help='in-process storage backend; memory generates its own campus')
+    parser.add_argument('--students', type=parse_count, default=2_000, help='memory storage only')
+    parser.add_argument('--drives', type=parse_count, default=100, help='memory storage only')
+    parser.add_argument('--applications', type=parse_count, default=20_000, help='memory storage only')
+    parser.add_argument('--with-rate-limits', action='store_true', help='keep rate limiting enabled in-process')
+    parser.add_argument('--timeout', type=float, default=60.0)
+    parser.add_argument('--seed', type=int, default=7)
+    parser.add_argument('--json', help='write results to this file for comparison between runs')
+    parser.add_argument('--mongo-url', default=BENCH_MONGO_URL)
+    parser.add_argument('--db-name', default=BENCH_DB_NAME)
+    return parser
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
@@ -0,0 +1,126 @@
+import asyncio
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+# Hot-path logic is measured against the in-memory store, without network I/O
+os.environ['STORAGE_BACKEND'] = 'memory'
+
+from benchmarks.generate_campus import parse_count, populate
+from benchmarks.report import summarize, print_table, save_results
+from eligibility import check_eligibility
+
+BENCHMARKS = {}
+
+def benchmark(name: str):
+    def register(fn):
+        BENCHMARKS[name] = fn
+        return fn
+    return register
+
+@benchmark('eligibility_per_student')
+async def eligibility_per_student(server, ctx):
+    """check_eligibility over every drive for one student (get_drives filter)"""
+    profile = random.choice(ctx['profiles'])
+    return [d for d in ctx['drives'] if check_eligibility(profile, d['eligibility'])]
+
+@benchmark('eligibility_fanout')
+async def eligibility_fanout(server, ctx):
+    """check_eligibility of one drive over every student (create_drive fan-out)"""
+    drive = random.choice(ctx['drives'])
+    return [p for p in ctx['profiles'] if check_eligibility(p, drive['eligibility'])]
+
+@benchmark('get_drives_student')
+async def get_drives_student(server, ctx):
+    user_id = random.choice(ctx['profiles'])['user_id']
+    return await server.get_drives(current_user={'user_id': user_id, 'role': 'student'})
+
+@benchmark('recommended_student')
+async def recommended_student(server, ctx):
+    user_id = random.choice(ctx['profiles'])['user_id']
+    return await server.get_recommended_drives(current_user={'user_id': user_id, 'role': 'student'})
+
+@benchmark('get_applications_student')
+async def get_applications_student(server, ctx):
+    user_id = random.choice(ctx['profiles'])['user_id']
+    return await server.get_applications(current_user={'user_id': user_id, 'role': 'student'})
+
+@benchmark('dashboard_student')
+async def dashboard_student(server, ctx):
+    """One composite request replacing get_drives_student + get_applications_student"""
+    user_id = random.choice(ctx['profiles'])['user_id']
+    return await server.get_student_dashboard(current_user={'user_id': user_id, 'role': 'student'})
+
+@benchmark('get_drive_applications')
+async def get_drive_applications(server, ctx):
+    drive_id = random.choice(ctx['drives'])['id']
+    return await server.get_drive_applications(drive_id, current_user=ctx['admin'])
+
+@benchmark('rank_drive_applicants')
+async def rank_drive_applicants(server, ctx):
+    drive_id = random.choice(ctx['drives'])['id']
+    return await server.get_drive_ranking(drive_id, weights=server.RankingWeights(), current_user=ctx['admin'])
+
+@benchmark('rate_limit_hit')
+async def rate_limit_hit(server, ctx):
+    """One token-bucket decision on the configured store (RATE_LIMIT_STORE)"""
+    user_id = random.choice(ctx['profiles'])['user_id']
+    return await server.rate_limiter.hit('user', user_id)
+
+@benchmark('authenticate')
+async def authenticate(server, ctx):
+    """get_current_user: JWT decode plus the per-user rate limit"""
+    token = random.choice(ctx['tokens'])
+    return await server.get_current_user(server.HTTPAuthorizationCredentials(scheme='Bearer', credentials=token))
+
+@benchmark('analytics')
+async def analytics(server, ctx):
+    return await server.get_analytics(current_user=ctx['admin'])
+
+async def main(args):
+    import server
+    await populate(server.storage, args.students, args.drives, args.applications, seed=args.seed)
+    ctx = {
+        'profiles': await server.storage.profiles.list_all(),
+        'drives': await server.storage.drives.list_all(),
+        'admin': {'user_id': 'user_bench_admin', 'role': 'admin'},
+    }
+    ctx['tokens'] = [server.create_token(p['user_id'], 'student') for p in ctx['profiles'][:1000]]
+    print(f"🏫 In-memory campus: {args.students} students, {args.drives} drives, {args.applications} applications")
+
+    results = []
+    for name in args.benchmarks:
+        fn = BENCHMARKS[name]
+        for _ in range(args.warmup):
+            await fn(server, ctx)
+        latencies = []
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            op_started = time.perf_counter()
+            await fn(server, ctx)
+            latencies.append(time.perf_counter() - op_started)
+        results.append(summarize(name, latencies, time.perf_counter() - started))
+    print_table(results)
+    if args.json:
+        save_results(args.json, results)
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description='Micro-benchmarks of hot paths on the in-memory store')
+    parser.add_argument('--benchmarks', nargs='+', choices=list(BENCHMARKS), default=list(BENCHMARKS))
+    parser.add_argument('--students', type=parse_count, default=10_000)
+    parser.add_argument('--drives', type=parse_count, default=300)
+    parser.add_argument('--applications', type=parse_count, default=100_000)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--warmup', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--json')
+    return parser
+
+if __name__ == "__main__":
+    asyncio.run(main(build_parser().parse_args()))
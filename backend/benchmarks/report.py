@@ -0,0 +1,38 @@
+import json
+import math
+from typing import List
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = min(len(sorted_values) - 1, max(0, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def summarize(name: str, latencies: List[float], elapsed: float, **extra) -> dict:
+    """Summarize per-operation latencies (seconds) into p50/p95/p99 and throughput"""
+    ordered = sorted(latencies)
+    return {
+        'scenario': name,
+        'operations': len(ordered),
+        'p50_ms': round(percentile(ordered, 50) * 1000, 2),
+        'p95_ms': round(percentile(ordered, 95) * 1000, 2),
+        'p99_ms': round(percentile(ordered, 99) * 1000, 2),
+        'max_ms': round(ordered[-1] * 1000, 2) if ordered else 0.0,
+        'throughput_ops': round(len(ordered) / elapsed, 1) if elapsed else 0.0,
+        **extra,
+    }
+
+def print_table(results: List[dict]) -> None:
+    header = f"{'scenario':<24}{'ops':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'ops/s':>10}  extra"
+    print(header)
+    print('-' * len(header))
+    for row in results:
+        extra = {k: v for k, v in row.items() if k not in (
+            'scenario', 'operations', 'p50_ms', 'p95_ms', 'p99_ms', 'max_ms', 'throughput_ops')}
+        print(f"{row['scenario']:<24}{row['operations']:>9}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['p99_ms']:>10}{row['throughput_ops']:>10}  {extra if extra else ''}")
+
+def save_results(path: str, results: List[dict]) -> None:
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
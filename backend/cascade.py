@@ -0,0 +1,81 @@
+import asyncio
+import logging
+import os
+from typing import Dict
+
+from metrics import CASCADE_DELETES
+
+logger = logging.getLogger(__name__)
+
+# Deleting a drive only marks it deleted (it disappears from every read at
+# once); its applications, status events and notifications are removed here
+# in bounded batches, and the drive document last. The soft-deleted drive is
+# the job record: after a crash or restart, resume() restarts every cascade
+# that did not finish, and re-running a cascade is harmless.
+
+CASCADE_BATCH_SIZE = int(os.environ.get('CASCADE_BATCH_SIZE', 500))
+# Pause between batches so a large delete does not saturate the primary
+CASCADE_BATCH_PAUSE = float(os.environ.get('CASCADE_BATCH_PAUSE', 0.05))
+
+class DriveDeletionCascade:
+    def __init__(self, storage, batch_size: int = CASCADE_BATCH_SIZE, pause: float = CASCADE_BATCH_PAUSE):
+        self.storage = storage
+        self.batch_size = batch_size
+        self.pause = pause
+        self._tasks: Dict[str, asyncio.Task] = {}
+
+    def start(self, drive_id: str) -> None:
+        if drive_id not in self._tasks:
+            task = asyncio.create_task(self._run(drive_id))
+            self._tasks[drive_id] = task
+            task.add_done_callback(lambda _: self._tasks.pop(drive_id, None))
+
+    async def _run(self, drive_id: str) -> None:
+        try:
+            await self.run(drive_id)
+        except Exception:
+            # The drive stays soft-deleted, so the next resume() retries it
+            logger.exception(f"Deletion cascade for drive {drive_id} failed")
+
+    async def run(self, drive_id: str) -> Dict[str, int]:
+        """Delete everything belonging to a soft-deleted drive, then the drive itself"""
+        deleted = {}
+        for name in ('applications', 'application_events', 'notifications'):
+            repository = getattr(self.storage, name)
+            deleted[name] = 0
+            while True:
+                count = await repository.delete_by_drive(drive_id, limit=self.batch_size)
+                deleted[name] += count
+                CASCADE_DELETES.inc(count, collection=name)
+                if count < self.batch_size:
+                    break
+                await asyncio.sleep(self.pause)
+        await self.storage.drives.delete(drive_id)
+        logger.info(f"Deletion cascade for drive {drive_id} finished: {deleted}")
+        return deleted
+
+    async def resume(self) -> int:
+        """Restart cascades interrupted by a crash or shutdown"""
+        pending = await self.storage.drives.list_deleted()
+        for drive in pending:
+            self.start(drive['id'])
+        return len(pending)
+
+    async def run_pending(self) -> Dict[str, Dict[str, int]]:
+        """Finish every pending cascade before returning (serverless, where background tasks do not survive)"""
+        results = {}
+        for drive in await self.storage.drives.list_deleted():
+            results[drive['id']] = await self.run(drive['id'])
+        return results
+
+    async def drain(self) -> None:
+        """Wait for running cascades (tests and benchmarks)"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks.values()))
+
+    async def stop(self) -> None:
+        """Cancel running cascades; they resume on the next start"""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
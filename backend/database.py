@@ -0,0 +1,304 @@
+import os
+import time
+import asyncio
+import logging
+from pymongo import monitoring, ReadPreference, IndexModel, ASCENDING, TEXT
+from pymongo.errors import PyMongoError
+from motor.motor_asyncio import AsyncIOMotorClient
+from metrics import command_metrics
+from drive_search import SEARCH_TEXT_WEIGHTS
+from querydebug import query_debug_listener, QUERY_DEBUG
+
+logger = logging.getLogger(__name__)
+
+# Serverless runtimes (Vercel, AWS Lambda) reuse the module between warm
+# invocations but may freeze or replace the event loop in between.
+SERVERLESS = bool(os.environ.get('VERCEL') or os.environ.get('AWS_LAMBDA_FUNCTION_NAME'))
+
+# ============ Pool Configuration ============
+
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', 10 if SERVERLESS else 100))
+MONGO_MIN_POOL_SIZE = int(os.environ.get('MONGO_MIN_POOL_SIZE', 0))
+# Drop idle sockets before the platform silently kills them between invocations
+MONGO_MAX_IDLE_TIME_MS = int(os.environ.get('MONGO_MAX_IDLE_TIME_MS', 60000 if SERVERLESS else 0)) or None
+MONGO_WAIT_QUEUE_TIMEOUT_MS = int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 5000))
+MONGO_SERVER_SELECTION_TIMEOUT_MS = int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', 10000))
+
+# Read preference for analytics and export routes ('secondaryPreferred' or 'primary')
+MONGO_REPORTING_READ_PREFERENCE = os.environ.get('MONGO_REPORTING_READ_PREFERENCE', 'secondaryPreferred')
+
+# ============ Query Budgets ============
+
+# Server-side maxTimeMS per endpoint class, overridable via QUERY_BUDGET_<NAME>_MS
+_DEFAULT_QUERY_BUDGETS_MS = {
+    'default': 5000,
+    'auth': 2000,
+    'analytics': 15000,
+    'export': 30000,
+}
+
+QUERY_BUDGETS_MS = {
+    name: int(os.environ.get(f'QUERY_BUDGET_{name.upper()}_MS', default))
+    for name, default in _DEFAULT_QUERY_BUDGETS_MS.items()
+}
+
+def query_budget(name: str = 'default') -> int:
+    """Return the maxTimeMS budget for an endpoint class"""
+    return QUERY_BUDGETS_MS.get(name, QUERY_BUDGETS_MS['default'])
+
+# ============ Pool Monitoring ============
+
+class PoolStats(monitoring.ConnectionPoolListener):
+    """Track connection pool utilization across all servers"""
+
+    def __init__(self):
+        self.open = 0
+        self.checked_out = 0
+        self.checkout_failures = 0
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_cleared(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
+
+    def connection_created(self, event):
+        self.open += 1
+
+    def connection_ready(self, event):
+        pass
+
+    def connection_closed(self, event):
+        self.open = max(0, self.open - 1)
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_check_out_failed(self, event):
+        self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        self.checked_out += 1
+
+    def connection_checked_in(self, event):
+        self.checked_out = max(0, self.checked_out - 1)
+
+    def snapshot(self) -> dict:
+        return {
+            'max_pool_size': MONGO_MAX_POOL_SIZE,
+            'min_pool_size': MONGO_MIN_POOL_SIZE,
+            'open_connections': self.open,
+            'checked_out': self.checked_out,
+            'utilization': round(self.checked_out / MONGO_MAX_POOL_SIZE, 3) if MONGO_MAX_POOL_SIZE else None,
+            'checkout_failures': self.checkout_failures,
+        }
+
+pool_stats = PoolStats()
+
+# ============ Client Factory ============
+
+def create_client(mongo_url: str) -> AsyncIOMotorClient:
+    """Create a Motor client with the configured pool settings"""
+    listeners = [pool_stats, command_metrics]
+    if QUERY_DEBUG:
+        listeners.append(query_debug_listener)
+    return AsyncIOMotorClient(
+        mongo_url,
+        maxPoolSize=MONGO_MAX_POOL_SIZE,
+        minPoolSize=MONGO_MIN_POOL_SIZE,
+        waitQueueTimeoutMS=MONGO_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGO_SERVER_SELECTION_TIMEOUT_MS,
+        maxIdleTimeMS=MONGO_MAX_IDLE_TIME_MS,
+        event_listeners=listeners,
+    )
+
+def reporting_database(client: AsyncIOMotorClient, name: str):
+    """Database handle for analytics and export reads"""
+    if MONGO_REPORTING_READ_PREFERENCE == 'secondaryPreferred':
+        return client.get_database(name, read_preference=ReadPreference.SECONDARY_PREFERRED)
+    return client.get_database(name)
+
+# ============ Lazy Client ============
+
+# Seconds between connection pre-checks on warm invocations
+CONNECTION_CHECK_INTERVAL = float(os.environ.get('MONGO_CONNECTION_CHECK_INTERVAL', 30))
+
+_client = None
+_client_loop = None
+_last_check = 0.0
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+def get_client() -> AsyncIOMotorClient:
+    """Return the cached client, creating it on first use
+
+    The client is kept at module level so warm serverless invocations reuse
+    its pool. If the event loop it was bound to has been closed (a runtime
+    that starts a fresh loop per invocation), a new client is created.
+    """
+    global _client, _client_loop, _last_check
+    loop = _running_loop()
+    if _client is not None and _client_loop is not None and _client_loop is not loop and _client_loop.is_closed():
+        _client.close()
+        _client = None
+    if _client is None:
+        _client = create_client(os.environ['MONGO_URL'])
+        _client_loop = loop
+        _last_check = 0.0
+    elif _client_loop is None:
+        _client_loop = loop
+    return _client
+
+def get_database():
+    return get_client()[os.environ['DB_NAME']]
+
+def get_reporting_database():
+    return reporting_database(get_client(), os.environ['DB_NAME'])
+
+def close_client() -> None:
+    global _client, _client_loop
+    if _client is not None:
+        _client.close()
+        _client = None
+        _client_loop = None
+
+async def ensure_connection(force: bool = False) -> None:
+    """Ping the server at most once per interval, reconnecting once on failure"""
+    global _last_check
+    now = time.monotonic()
+    if not force and _client is not None and now - _last_check < CONNECTION_CHECK_INTERVAL:
+        return
+    try:
+        await get_client().admin.command('ping')
+    except PyMongoError as e:
+        logger.warning(f"MongoDB pre-check failed, reconnecting: {e}")
+        close_client()
+        await get_client().admin.command('ping')
+    _last_check = time.monotonic()
+
+async def warm_up() -> None:
+    """Establish the connection pool ahead of the first real query"""
+    started = time.perf_counter()
+    await ensure_connection(force=True)
+    logger.info(f"MongoDB warm-up finished in {(time.perf_counter() - started) * 1000:.1f} ms")
+
+class LazyDatabase:
+    """Database proxy that defers client creation until a collection is used"""
+
+    def __init__(self, factory):
+        self._factory = factory
+
+    def __getattr__(self, name):
+        return getattr(self._factory(), name)
+
+    def __getitem__(self, name):
+        return self._factory()[name]
+
+# ============ Index Manifest ============
+
+# Declarative list of every index the application relies on. Apply with
+# `python migrate_indexes.py`; startup behaviour is controlled by INDEX_MODE.
+INDEXES = {
+    'users': [
+        IndexModel([('email', ASCENDING)], unique=True),
+        IndexModel([('id', ASCENDING)]),
+    ],
+    'student_profiles': [
+        IndexModel([('user_id', ASCENDING)], unique=True),
+        IndexModel([('email', ASCENDING)]),
+        IndexModel([('resume.sha256', ASCENDING)], sparse=True),
+        IndexModel([('resume_skills', ASCENDING)]),
+        IndexModel([('skill_keys', ASCENDING)]),
+        IndexModel([('department', ASCENDING), ('batch', ASCENDING), ('cgpa', ASCENDING)]),
+    ],
+    'placement_drives': [
+        IndexModel([('id', ASCENDING)], unique=True),
+        IndexModel([('deadline', ASCENDING)]),
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('status', ASCENDING), ('deadline', ASCENDING)]),
+        IndexModel([('package_band', ASCENDING)]),
+        IndexModel([('package_min', ASCENDING)]),
+        IndexModel([('package_max', ASCENDING)]),
+        IndexModel([('required_skill_keys', ASCENDING)]),
+        IndexModel([('deleted_at', ASCENDING)], sparse=True),
+        IndexModel([(field, TEXT) for field in SEARCH_TEXT_WEIGHTS],
+                   name='drive_search_text', weights=SEARCH_TEXT_WEIGHTS),
+    ],
+    'applications': [
+        IndexModel([('id', ASCENDING)], unique=True),
+        IndexModel([('student_id', ASCENDING)]),
+        IndexModel([('drive_id', ASCENDING)]),
+        IndexModel([('status', ASCENDING)]),
+        IndexModel([('applied_at', ASCENDING)]),
+    ],
+    'notifications': [
+        IndexModel([('user_id', ASCENDING)]),
+        IndexModel([('drive_id', ASCENDING)], sparse=True),
+        IndexModel([('created_at', ASCENDING)]),
+        # Not sparse: digests look up unclaimed notifications with digest_id: None
+        IndexModel([('digest_id', ASCENDING), ('read', ASCENDING), ('created_at', ASCENDING)]),
+    ],
+    'application_events': [
+        IndexModel([('id', ASCENDING)], unique=True),
+        IndexModel([('application_id', ASCENDING), ('at', ASCENDING)]),
+        IndexModel([('drive_id', ASCENDING), ('to_status', ASCENDING)]),
+    ],
+    'import_jobs': [
+        IndexModel([('id', ASCENDING)], unique=True),
+    ],
+    'resume_extractions': [
+        IndexModel([('sha256', ASCENDING)], unique=True),
+    ],
+}
+
+# 'ensure' creates only missing indexes, 'verify' logs them, 'off' skips the check
+INDEX_MODE = os.environ.get('INDEX_MODE', 'off' if SERVERLESS else 'ensure')
+
+async def _existing_index_names(db, collection: str) -> set:
+    cursor = db[collection].list_indexes()
+    return {index['name'] async for index in cursor}
+
+async def find_missing_indexes(db) -> dict:
+    """Compare the manifest against the database with one list_indexes per collection"""
+    collections = list(INDEXES)
+    existing = await asyncio.gather(*(_existing_index_names(db, name) for name in collections))
+    missing = {}
+    for name, names in zip(collections, existing):
+        absent = [index for index in INDEXES[name] if index.document['name'] not in names]
+        if absent:
+            missing[name] = absent
+    return missing
+
+async def apply_indexes(db, indexes: dict = None) -> int:
+    """Create the given indexes (default: the full manifest) concurrently per collection"""
+    indexes = INDEXES if indexes is None else indexes
+    await asyncio.gather(*(
+        db[name].create_indexes(models) for name, models in indexes.items() if models
+    ))
+    return sum(len(models) for models in indexes.values())
+
+async def prepare_indexes(db, mode: str = None) -> dict:
+    """Run the startup index check according to INDEX_MODE"""
+    mode = mode or INDEX_MODE
+    if mode == 'off':
+        return {}
+    missing = await find_missing_indexes(db)
+    if not missing:
+        return {}
+    names = {name: [index.document['name'] for index in models] for name, models in missing.items()}
+    if mode == 'verify':
+        logger.warning(f"Missing indexes (run migrate_indexes.py): {names}")
+    else:
+        await apply_indexes(db, missing)
+        logger.info(f"Created missing indexes: {names}")
+    return names
@@ -0,0 +1,117 @@
+import asyncio
+import logging
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from database import SERVERLESS
+from mailer import SMTP_HOST, SMTPPool
+from metrics import DIGEST_EMAILS
+
+logger = logging.getLogger(__name__)
+
+# Periodic email digests. Each run claims every unread notification not yet
+# mailed (one update_many, so concurrent instances never mail the same one),
+# groups them per student in the database and sends one email per student
+# over the pooled SMTP connections: the cost of a run is O(recipients), not
+# O(notifications). Delivery is at most once: a run that dies after claiming
+# skips those notifications, while a send that fails returns them to the
+# next run.
+
+# Off without SMTP_HOST; serverless deployments call POST /api/notifications/digest/run from a cron
+DIGEST_ENABLED = os.environ.get(
+    'DIGEST_ENABLED', 'true' if SMTP_HOST and not SERVERLESS else 'false').lower() != 'false'
+DIGEST_INTERVAL = int(os.environ.get('DIGEST_INTERVAL', 3600))
+# Unread notifications older than this are left out of digests (e.g. the backlog on first start)
+DIGEST_LOOKBACK_HOURS = float(os.environ.get('DIGEST_LOOKBACK_HOURS', 24))
+# Messages listed per email; the rest are counted
+DIGEST_MAX_ITEMS = int(os.environ.get('DIGEST_MAX_ITEMS', 10))
+# Emails handed to the SMTP pool at a time
+DIGEST_SEND_BATCH = int(os.environ.get('DIGEST_SEND_BATCH', 100))
+DIGEST_APP_URL = os.environ.get('DIGEST_APP_URL', os.environ.get('CORS_ORIGINS', '').split(',')[0].strip())
+
+def digest_email(name: Optional[str], count: int, messages: List[str], app_url: str = DIGEST_APP_URL) -> tuple:
+    """(subject, body) of a digest listing `messages` out of `count` unread notifications"""
+    subject = f"You have {count} new notification{'s' if count != 1 else ''} on Placement Flow"
+    lines = [f"Hi {name or 'there'},", '', 'Here is what you missed:', '']
+    lines += [f"- {message}" for message in messages]
+    if count > len(messages):
+        lines.append(f"...and {count - len(messages)} more")
+    if app_url.startswith('http'):
+        lines += ['', f"Open Placement Flow: {app_url}"]
+    return subject, '\n'.join(lines) + '\n'
+
+class DigestMailer:
+    def __init__(self, storage, pool: SMTPPool, interval: int = DIGEST_INTERVAL,
+                 lookback_hours: float = DIGEST_LOOKBACK_HOURS):
+        self.storage = storage
+        self.pool = pool
+        self.interval = interval
+        self.lookback = timedelta(hours=lookback_hours)
+        self._task: Optional[asyncio.Task] = None
+
+    async def run_once(self, now: Optional[datetime] = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        # Unique per run: summaries and releases select notifications by this claim
+        digest_id = f"digest_{now.timestamp()}_{uuid.uuid4().hex[:8]}"
+        claimed = await self.storage.notifications.claim_for_digest(
+            digest_id, (now - self.lookback).isoformat(), now.isoformat())
+        result = {'notifications': claimed, 'sent': 0, 'failed': 0, 'skipped': 0}
+        if not claimed:
+            return result
+
+        summaries = await self.storage.notifications.digest_summaries(digest_id, DIGEST_MAX_ITEMS)
+        failed = []
+        try:
+            for start in range(0, len(summaries), DIGEST_SEND_BATCH):
+                batch = summaries[start:start + DIGEST_SEND_BATCH]
+                profiles = await self.storage.profiles.get_many_by_user(s['user_id'] for s in batch)
+                outcomes = await asyncio.gather(*(self._send(s, profiles.get(s['user_id'])) for s in batch))
+                for summary, outcome in zip(batch, outcomes):
+                    result[outcome] += 1
+                    if outcome == 'failed':
+                        failed.append(summary['user_id'])
+        finally:
+            await self.pool.close()
+            if failed:
+                await self.storage.notifications.release_digest(digest_id, failed)
+        logger.info(f"Notification digest: {claimed} notifications, {result['sent']} emails sent, "
+                    f"{result['failed']} failed")
+        return result
+
+    async def _send(self, summary: dict, profile: Optional[dict]) -> str:
+        if not profile or not profile.get('email'):
+            DIGEST_EMAILS.inc(result='skipped')
+            return 'skipped'
+        subject, body = digest_email(profile.get('name'), summary['count'], summary['messages'])
+        try:
+            await self.pool.send(profile['email'], subject, body)
+        except Exception as e:
+            logger.warning(f"Digest email to {summary['user_id']} failed: {e!r}")
+            DIGEST_EMAILS.inc(result='failed')
+            return 'failed'
+        DIGEST_EMAILS.inc(result='sent')
+        return 'sent'
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception('Notification digest run failed')
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.pool.close()
@@ -0,0 +1,129 @@
+import re
+from typing import Optional, Tuple
+
+# Search over placement drives: text fields, facets and package bands shared
+# by the Mongo ($text + $facet) and in-memory search implementations.
+
+# Text index fields with their relevance weights
+SEARCH_TEXT_WEIGHTS = {
+    'company_name': 10,
+    'job_role': 5,
+    'location': 3,
+    'job_description': 1,
+}
+
+# Facet name -> drive field
+SEARCH_FACETS = {
+    'domain': 'company_domain',
+    'location': 'location',
+    'package_band': 'package_band',
+    'status': 'status',
+}
+
+SEARCH_SORTS = ('relevance', 'deadline', 'package')
+SEARCH_MAX_PAGE_SIZE = 100
+UNSPECIFIED = 'unspecified'
+
+# Lower bound (LPA) of each package band, highest first
+PACKAGE_BANDS = [
+    (20, '20+ LPA'),
+    (10, '10-20 LPA'),
+    (5, '5-10 LPA'),
+    (0, '0-5 LPA'),
+]
+
+# An amount with its optional unit, converted to lakhs per annum (LPA)
+_UNITS = {
+    'crore': 100, 'crores': 100, 'cr': 100,
+    'lakh': 1, 'lakhs': 1, 'lac': 1, 'lacs': 1, 'lpa': 1, 'l': 1,
+    'thousand': 0.01, 'k': 0.01,
+}
+_AMOUNT = r'(\d[\d,]*(?:\.\d+)?)\s*(crores?|cr|lakhs?|lacs?|lpa|l|thousand|k)?(?![a-z])'
+_SINGLE = re.compile(_AMOUNT, re.IGNORECASE)
+_RANGE = re.compile(rf'{_AMOUNT}\s*(?:-|–|to)\s*{_AMOUNT}', re.IGNORECASE)
+_MONTHLY = re.compile(r'(?:/\s*|\bper\s+)(?:month|mon|mo|m)\b|\bmonthly\b|\bp\.?m\b', re.IGNORECASE)
+# Amounts in other currencies cannot be placed in an LPA band
+_FOREIGN = re.compile(r'[$€£]|\b(?:usd|eur|gbp)\b', re.IGNORECASE)
+
+def _to_lpa(number: str, unit: Optional[str], monthly: bool) -> Optional[float]:
+    amount = float(number.replace(',', ''))
+    if unit:
+        amount *= _UNITS[unit.lower()]
+    elif amount >= 1000:
+        amount /= 100_000  # plain rupees
+    elif monthly:
+        return None  # '50/month' has no unit to read it in
+    return amount * 12 if monthly else amount
+
+def parse_package_range(text: Optional[str]) -> Tuple[Optional[float], Optional[float]]:
+    """(min, max) package in LPA: '12-15 LPA' -> (12.0, 15.0), '1.2Cr' -> (120.0, 120.0)
+
+    Units are crore, lakh/LPA and k/thousand; amounts of 1000 or more
+    without one are rupees ('8,50,000' -> 8.5) and smaller ones LPA.
+    Monthly amounts ('50k/month') are annualized. Anything that cannot be
+    placed (other currencies, '50/month', no number) is (None, None).
+    """
+    text = text or ''
+    if _FOREIGN.search(text):
+        return None, None
+    match = _RANGE.search(text)
+    if match:
+        low, low_unit, high, high_unit = match.groups()
+        if not low_unit and float(low.replace(',', '')) < 1000:
+            low_unit = high_unit  # '12-15 LPA', '50-60k'
+        amounts = [(low, low_unit), (high, high_unit)]
+    else:
+        match = _SINGLE.search(text)
+        if not match:
+            return None, None
+        amounts = [match.groups()]
+    monthly = bool(_MONTHLY.search(text))
+    converted = [_to_lpa(number, unit, monthly) for number, unit in amounts]
+    if None in converted:
+        return None, None
+    return round(min(converted), 2), round(max(converted), 2)
+
+def package_band_for(amount: Optional[float]) -> str:
+    if amount is None:
+        return UNSPECIFIED
+    for lower, band in PACKAGE_BANDS:
+        if amount >= lower:
+            return band
+    return UNSPECIFIED
+
+def package_fields(text: Optional[str]) -> dict:
+    """Normalized package fields stored alongside the free-form string"""
+    package_min, package_max = parse_package_range(text)
+    return {
+        'package_min': package_min,
+        'package_max': package_max,
+        'package_band': package_band_for(package_min),
+    }
+
+def package_range_query(min_package: Optional[float] = None, max_package: Optional[float] = None) -> dict:
+    """Drives paying at least `min_package` and at most `max_package` (LPA)"""
+    query = {}
+    if min_package is not None:
+        query['package_min'] = {'$gte': min_package}
+    if max_package is not None:
+        query['package_max'] = {'$lte': max_package}
+    return query
+
+def in_package_range(drive: dict, min_package: Optional[float] = None, max_package: Optional[float] = None) -> bool:
+    if min_package is not None and (drive.get('package_min') is None or drive['package_min'] < min_package):
+        return False
+    if max_package is not None and (drive.get('package_max') is None or drive['package_max'] > max_package):
+        return False
+    return True
+
+def search_terms(text: str) -> list:
+    return [t for t in re.findall(r'\w+', (text or '').lower()) if len(t) > 1]
+
+def relevance(drive: dict, terms: list) -> float:
+    """Weighted term matches, the in-memory stand-in for Mongo's textScore"""
+    score = 0.0
+    for field, weight in SEARCH_TEXT_WEIGHTS.items():
+        words = search_terms(drive.get(field, ''))
+        if words:
+            score += weight * sum(words.count(t) for t in terms) / len(words)
+    return score
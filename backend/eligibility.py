@@ -0,0 +1,190 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from metrics import record_cache
+
+# Students whose per-drive eligibility results are kept in memory
+ELIGIBILITY_CACHE_STUDENTS = int(os.environ.get('ELIGIBILITY_CACHE_STUDENTS', 5000))
+
+# Profile fields that eligibility depends on
+ELIGIBILITY_FIELDS = ('cgpa', 'skills', 'department', 'batch')
+
+def check_eligibility(profile: dict, criteria: dict) -> bool:
+    # Check CGPA
+    if profile['cgpa'] < criteria['min_cgpa']:
+        return False
+    
+    # Check department
+    if profile['department'] not in criteria['departments']:
+        return False
+    
+    # Check batch
+    if profile['batch'] not in criteria['batches']:
+        return False
+    
+    # Check skills (at least one match)
+    if criteria['required_skills']:
+        student_skills = [s.lower() for s in profile['skills']]
+        required_skills = [s.lower() for s in criteria['required_skills']]
+        if not any(skill in student_skills for skill in required_skills):
+            return False
+    
+    return True
+
+# Skills match case-insensitively. Mongo documents store lower-cased copies
+# (profiles: skill_keys, drives: required_skill_keys) written by the Mongo
+# repositories, so skill filters are plain $in matches an index can serve.
+
+def skill_keys(skills: Optional[List[str]]) -> List[str]:
+    return sorted({s.lower() for s in skills or []})
+
+def eligibility_query(profile: Optional[dict]) -> dict:
+    """Mongo filter matching the drives check_eligibility accepts for this profile"""
+    if not profile:
+        return {}
+    return {
+        'eligibility.min_cgpa': {'$lte': profile['cgpa']},
+        'eligibility.departments': profile['department'],
+        'eligibility.batches': profile['batch'],
+        '$or': [
+            {'required_skill_keys': {'$size': 0}},
+            {'required_skill_keys': {'$in': skill_keys(profile.get('skills'))}},
+        ],
+    }
+
+def eligible_profiles_query(criteria: dict) -> dict:
+    """Mongo filter over student_profiles matching check_eligibility for a drive"""
+    query = {
+        'cgpa': {'$gte': criteria['min_cgpa']},
+        'department': {'$in': criteria['departments']},
+        'batch': {'$in': criteria['batches']},
+    }
+    if criteria['required_skills']:
+        query['skill_keys'] = {'$in': skill_keys(criteria['required_skills'])}
+    return query
+
+# ============ Compiled Matchers ============
+
+class CompiledCriteria:
+    """check_eligibility with the criteria pre-processed into sets"""
+    __slots__ = ('min_cgpa', 'departments', 'batches', 'skills')
+
+    def __init__(self, criteria: dict):
+        self.min_cgpa = criteria['min_cgpa']
+        self.departments = frozenset(criteria['departments'])
+        self.batches = frozenset(criteria['batches'])
+        self.skills = frozenset(s.lower() for s in criteria['required_skills'])
+
+    def matches(self, profile: dict) -> bool:
+        if profile['cgpa'] < self.min_cgpa:
+            return False
+        if profile['department'] not in self.departments or profile['batch'] not in self.batches:
+            return False
+        if self.skills and self.skills.isdisjoint(s.lower() for s in profile['skills']):
+            return False
+        return True
+
+    def may_flip(self, old: dict, new: dict) -> bool:
+        """Whether any changed profile field can change this drive's outcome"""
+        if old['cgpa'] != new['cgpa'] and min(old['cgpa'], new['cgpa']) < self.min_cgpa <= max(old['cgpa'], new['cgpa']):
+            return True
+        if (old['department'] in self.departments) != (new['department'] in self.departments):
+            return True
+        if (old['batch'] in self.batches) != (new['batch'] in self.batches):
+            return True
+        return bool(self.skills) and old['skills'] != new['skills']
+
+def criteria_key(criteria: dict) -> tuple:
+    return (criteria['min_cgpa'], tuple(criteria['departments']), tuple(criteria['batches']),
+            tuple(criteria['required_skills']))
+
+def eligibility_profile_key(profile: dict) -> tuple:
+    return profile['cgpa'], profile['department'], profile['batch'], tuple(profile['skills'])
+
+class EligibilityCache:
+    """Per-student {drive_id: (criteria key, eligible)} plus compiled matchers per drive
+
+    Entries carry the inputs they were computed from, so edited drives are
+    re-evaluated on the next lookup; profile edits go through
+    apply_profile_change, which only re-evaluates drives that may flip.
+    """
+
+    def __init__(self, max_students: int = ELIGIBILITY_CACHE_STUDENTS):
+        self.max_students = max_students
+        self._students: OrderedDict = OrderedDict()
+        self._matchers: Dict[str, Tuple[tuple, CompiledCriteria]] = {}
+        self._lock = threading.Lock()
+
+    def matcher(self, drive: dict) -> Tuple[tuple, CompiledCriteria]:
+        key = criteria_key(drive['eligibility'])
+        cached = self._matchers.get(drive['id'])
+        if cached is None or cached[0] != key:
+            cached = self._matchers[drive['id']] = (key, CompiledCriteria(drive['eligibility']))
+        return cached
+
+    def _entry(self, user_id: str, profile_key: tuple) -> dict:
+        with self._lock:
+            entry = self._students.get(user_id)
+            if entry is None or entry[0] != profile_key:
+                entry = (profile_key, {})
+            self._students[user_id] = entry
+            self._students.move_to_end(user_id)
+            while len(self._students) > self.max_students:
+                self._students.popitem(last=False)
+        return entry[1]
+
+    def eligible(self, profile: dict, drives: List[dict]) -> List[dict]:
+        results = self._entry(profile['user_id'], eligibility_profile_key(profile))
+        eligible = []
+        hits = 0
+        for drive in drives:
+            key, compiled = self.matcher(drive)
+            cached = results.get(drive['id'])
+            if cached is not None and cached[0] == key:
+                hits += 1
+                ok = cached[1]
+            else:
+                ok = compiled.matches(profile)
+                results[drive['id']] = (key, ok)
+            if ok:
+                eligible.append(drive)
+        record_cache('eligibility', True, hits)
+        record_cache('eligibility', False, len(drives) - hits)
+        return eligible
+
+    def apply_profile_change(self, old: dict, new: dict, drives: List[dict]) -> Tuple[List[dict], List[dict]]:
+        """Re-evaluate only drives whose outcome may flip; returns (newly eligible, no longer eligible)"""
+        user_id = new['user_id']
+        old_key, new_key = eligibility_profile_key(old), eligibility_profile_key(new)
+        with self._lock:
+            entry = self._students.get(user_id)
+            previous = entry[1] if entry is not None and entry[0] == old_key else {}
+            # Only the given drives are checked against the change; results for any other drive are dropped
+            results = {}
+            self._students[user_id] = (new_key, results)
+            self._students.move_to_end(user_id)
+
+        gained, lost = [], []
+        for drive in drives:
+            key, compiled = self.matcher(drive)
+            if not compiled.may_flip(old, new):
+                # The old profile's result stays valid for drives that cannot flip
+                cached = previous.get(drive['id'])
+                if cached is not None and cached[0] == key:
+                    results[drive['id']] = cached
+                continue
+            before, after = compiled.matches(old), compiled.matches(new)
+            results[drive['id']] = (key, after)
+            if after and not before:
+                gained.append(drive)
+            elif before and not after:
+                lost.append(drive)
+        return gained, lost
+
+    def forget_drive(self, drive_id: str) -> None:
+        with self._lock:
+            self._matchers.pop(drive_id, None)
+            for _, results in self._students.values():
+                results.pop(drive_id, None)
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timezone
+from typing import Optional
+
+from database import SERVERLESS
+from metrics import DRIVE_LIFECYCLE_EVENTS
+from notifications import fan_out
+
+logger = logging.getLogger(__name__)
+
+# Drives are open through their deadline date (UTC). A periodic task closes
+# drives once the date has passed and reminds eligible students who have not
+# applied on the last day. Both steps are safe with several app instances:
+# closing is an idempotent update_many and each reminder is claimed atomically.
+
+# Background loops do not survive between serverless invocations; trigger
+# POST /api/drives/lifecycle/run from an external cron there instead.
+DRIVE_SCHEDULER_ENABLED = os.environ.get(
+    'DRIVE_SCHEDULER_ENABLED', 'false' if SERVERLESS else 'true').lower() != 'false'
+DRIVE_SCHEDULER_INTERVAL = int(os.environ.get('DRIVE_SCHEDULER_INTERVAL', 300))
+
+CLOSED = 'closed'
+
+def today(now: Optional[datetime] = None) -> str:
+    return (now or datetime.now(timezone.utc)).strftime('%Y-%m-%d')
+
+def is_open(drive: dict, on: str) -> bool:
+    """Still accepting applications on the given 'YYYY-MM-DD' date"""
+    return drive.get('status') != CLOSED and drive.get('deadline', '') >= on
+
+def open_query(on: str) -> dict:
+    """Mongo filter equivalent of is_open"""
+    return {'status': {'$ne': CLOSED}, 'deadline': {'$gte': on}}
+
+class DriveLifecycleScheduler:
+    def __init__(self, storage, interval: int = DRIVE_SCHEDULER_INTERVAL):
+        self.storage = storage
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def close_expired(self, now: datetime) -> int:
+        closed = await self.storage.drives.close_expired(today(now), now.isoformat())
+        DRIVE_LIFECYCLE_EVENTS.inc(closed, event='closed')
+        return closed
+
+    async def send_reminders(self, now: datetime) -> int:
+        """Remind eligible non-applicants of drives whose deadline is today"""
+        sent = 0
+        while True:
+            drive = await self.storage.drives.claim_reminder(today(now), now.isoformat())
+            if drive is None:
+                return sent
+            sent += await self.remind(drive, now)
+
+    async def remind(self, drive: dict, now: datetime) -> int:
+        eligible, applications = await asyncio.gather(
+            self.storage.profiles.list_eligible(drive['eligibility']),
+            self.storage.applications.list_by_drive(drive['id']),
+        )
+        applied = {a['student_id'] for a in applications}
+        message = f"Closing in 24h: {drive['company_name']} - {drive['job_role']} (deadline {drive['deadline']})"
+        notifications = [{
+            'id': f"notif_{now.timestamp()}_reminder_{drive['id']}_{profile['user_id']}",
+            'user_id': profile['user_id'],
+            'drive_id': drive['id'],
+            'message': message,
+            'read': False,
+            'created_at': now.isoformat()
+        } for profile in eligible if profile['user_id'] not in applied]
+
+        DRIVE_LIFECYCLE_EVENTS.inc(event='reminded')
+        return await fan_out(self.storage, notifications, source='closing_reminder')
+
+    async def run_once(self, now: Optional[datetime] = None) -> dict:
+        now = now or datetime.now(timezone.utc)
+        closed = await self.close_expired(now)
+        reminded = await self.send_reminders(now)
+        if closed or reminded:
+            logger.info(f"Drive lifecycle: closed {closed} drives, sent {reminded} reminders")
+        return {'closed': closed, 'reminders': reminded}
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception('Drive lifecycle run failed')
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,110 @@
+import asyncio
+import logging
+import os
+import smtplib
+import ssl
+from email.message import EmailMessage
+from typing import List, Optional
+
+from metrics import SMTP_CONNECTIONS
+
+logger = logging.getLogger(__name__)
+
+# Outgoing mail over a small pool of reused SMTP connections. smtplib is
+# blocking, so each send runs in a thread; a connection is opened (and
+# authenticated) once and carries many messages instead of one handshake per
+# email. For local testing point SMTP_HOST/SMTP_PORT at a debugging server
+# that prints every message, e.g. `python -m aiosmtpd -n -l localhost:1025`.
+
+SMTP_HOST = os.environ.get('SMTP_HOST')
+SMTP_PORT = int(os.environ.get('SMTP_PORT', 587))
+SMTP_USER = os.environ.get('SMTP_USER')
+SMTP_PASSWORD = os.environ.get('SMTP_PASSWORD')
+SMTP_FROM = os.environ.get('SMTP_FROM') or SMTP_USER or 'noreply@localhost'
+# 'starttls', 'ssl' (implicit TLS) or 'none' (local debugging servers)
+SMTP_SECURITY = os.environ.get('SMTP_SECURITY', {587: 'starttls', 465: 'ssl'}.get(SMTP_PORT, 'none'))
+SMTP_POOL_SIZE = int(os.environ.get('SMTP_POOL_SIZE', 2))
+SMTP_TIMEOUT = float(os.environ.get('SMTP_TIMEOUT', 30))
+
+# Rejections of one message; the connection itself is still usable
+MESSAGE_ERRORS = (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused, smtplib.SMTPDataError)
+
+class _Connection:
+    def __init__(self):
+        self.smtp: Optional[smtplib.SMTP] = None
+
+class SMTPPool:
+    def __init__(self, host: Optional[str] = SMTP_HOST, port: int = SMTP_PORT, user: Optional[str] = SMTP_USER,
+                 password: Optional[str] = SMTP_PASSWORD, security: str = SMTP_SECURITY,
+                 size: int = SMTP_POOL_SIZE, timeout: float = SMTP_TIMEOUT, sender: str = SMTP_FROM):
+        self.host = host
+        self.port = port
+        self.user = user
+        self.password = password
+        self.security = security
+        self.timeout = timeout
+        self.sender = sender
+        self._slots = asyncio.Semaphore(size)
+        self._idle: List[_Connection] = []
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.host)
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.security == 'ssl':
+            smtp = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout, context=ssl.create_default_context())
+        else:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.security == 'starttls':
+                smtp.starttls(context=ssl.create_default_context())
+        if self.user:
+            smtp.login(self.user, self.password or '')
+        SMTP_CONNECTIONS.inc()
+        return smtp
+
+    def _deliver(self, connection: _Connection, message: EmailMessage) -> None:
+        if connection.smtp is None:
+            connection.smtp = self._connect()
+        try:
+            connection.smtp.send_message(message)
+        except smtplib.SMTPServerDisconnected:
+            # Servers drop connections that sat idle; reconnect once
+            connection.smtp = self._connect()
+            connection.smtp.send_message(message)
+
+    @staticmethod
+    def _quit(connection: _Connection) -> None:
+        if connection.smtp is not None:
+            try:
+                connection.smtp.quit()
+            except (smtplib.SMTPException, OSError):
+                connection.smtp.close()
+            connection.smtp = None
+
+    async def send(self, to: str, subject: str, body: str) -> None:
+        """Send a plain-text email, reusing an idle connection when there is one"""
+        message = EmailMessage()
+        message['From'] = self.sender
+        message['To'] = to
+        message['Subject'] = subject
+        message.set_content(body)
+        async with self._slots:
+            connection = self._idle.pop() if self._idle else _Connection()
+            try:
+                await asyncio.to_thread(self._deliver, connection, message)
+            except MESSAGE_ERRORS:
+                self._idle.append(connection)
+                raise
+            except asyncio.CancelledError:
+                raise  # the thread still owns the connection; it is dropped, not reused
+            except Exception:
+                await asyncio.to_thread(self._quit, connection)
+                raise
+            self._idle.append(connection)
+
+    async def close(self) -> None:
+        """Close idle connections (after a batch of sends, so none sit open until the server drops them)"""
+        idle, self._idle = self._idle, []
+        for connection in idle:
+            await asyncio.to_thread(self._quit, connection)
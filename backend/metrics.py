@@ -0,0 +1,282 @@
+import time
+import threading
+from pymongo import monitoring
+
+# Prometheus text exposition format, implemented in-process so the app
+# does not need an extra dependency or a multiprocess collector.
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+def _format_labels(labelnames, values, extra: str = '') -> str:
+    pairs = [f'{name}="{str(value)}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+class Metric:
+    kind = 'untyped'
+
+    def __init__(self, name: str, description: str, labelnames=()):
+        self.name = name
+        self.description = description
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        registry.register(self)
+
+    def _key(self, labels: dict) -> tuple:
+        return tuple(labels.get(name, '') for name in self.labelnames)
+
+    def header(self) -> list:
+        return [f'# HELP {self.name} {self.description}', f'# TYPE {self.name} {self.kind}']
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def __init__(self, name, description, labelnames=()):
+        super().__init__(name, description, labelnames)
+        self._values = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, value in sorted(self._values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {value}')
+        return lines
+
+class Gauge(Metric):
+    kind = 'gauge'
+
+    def __init__(self, name, description, labelnames=(), callback=None):
+        super().__init__(name, description, labelnames)
+        self._values = {}
+        self._callback = callback  # returns {label_tuple: value} at scrape time
+
+    def set(self, value: float, **labels) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> list:
+        lines = self.header()
+        values = self._callback() if self._callback else self._values
+        for key, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, key)} {value}')
+        return lines
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, description, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, description, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._series = {}  # key -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(self._key(labels))
+        return series[-1] if series else 0
+
+    def render(self) -> list:
+        lines = self.header()
+        for key, series in sorted(self._series.items()):
+            cumulative = 0
+            for bound, observed in zip(self.buckets, series):
+                cumulative += observed
+                labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                lines.append(f'{self.name}_bucket{labels} {cumulative}')
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            lines.append(f'{self.name}_bucket{labels} {series[-1]}')
+            lines.append(f'{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}')
+            lines.append(f'{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}')
+        return lines
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric: Metric) -> None:
+        self._metrics.append(metric)
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+registry = Registry()
+
+# ============ Application Metrics ============
+
+HTTP_REQUESTS = Counter(
+    'http_requests_total', 'HTTP requests by route template', ['method', 'route', 'status'])
+HTTP_LATENCY = Histogram(
+    'http_request_duration_seconds', 'HTTP request latency by route template', ['method', 'route'])
+
+MONGO_COMMANDS = Counter(
+    'mongo_commands_total', 'MongoDB commands by collection', ['collection', 'command', 'outcome'])
+MONGO_LATENCY = Histogram(
+    'mongo_command_duration_seconds', 'MongoDB command latency by collection', ['collection', 'command'])
+
+BCRYPT_QUEUE_DEPTH = Gauge(
+    'bcrypt_pool_queue_depth', 'Password hashing jobs waiting for a worker')
+BCRYPT_IN_FLIGHT = Gauge(
+    'bcrypt_pool_in_flight', 'Password hashing jobs currently running')
+
+CACHE_REQUESTS = Counter(
+    'cache_requests_total', 'Cache lookups by result', ['cache', 'result'])
+
+NOTIFICATION_FANOUT = Histogram(
+    'notification_fanout_size', 'Notifications written per fan-out', ['source'],
+    buckets=(1, 10, 50, 100, 500, 1000, 5000, 10000, 50000))
+
+DRIVE_LIFECYCLE_EVENTS = Counter(
+    'drive_lifecycle_events_total', 'Drives closed or reminded by the lifecycle scheduler', ['event'])
+
+SNAPSHOT_REFRESHES = Counter(
+    'application_snapshot_refreshes_total', 'Students or drives whose application snapshots were rewritten', ['source'])
+
+CASCADE_DELETES = Counter(
+    'cascade_deleted_documents_total', 'Documents removed by drive deletion cascades', ['collection'])
+
+RATE_LIMIT_DECISIONS = Counter(
+    'rate_limit_decisions_total', 'Rate limiter decisions by scope', ['scope', 'result'])
+
+ADMISSION_IN_FLIGHT = Gauge(
+    'admission_in_flight', 'Requests admitted and running by priority class', ['priority_class'])
+ADMISSION_QUEUED = Gauge(
+    'admission_queued', 'Requests waiting for admission by priority class', ['priority_class'])
+ADMISSION_REJECTED = Counter(
+    'admission_rejected_total', 'Requests shed with 503 by priority class', ['priority_class', 'reason'])
+ADMISSION_WAIT = Histogram(
+    'admission_wait_seconds', 'Time queued requests waited for admission', ['priority_class'])
+
+RESUME_UPLOADS = Counter(
+    'resume_uploads_total', 'Resume uploads by outcome (deduplicated: identical file already stored)', ['result'])
+
+RESUME_EXTRACTIONS = Counter(
+    'resume_extractions_total', 'Resume skill extractions by outcome (cached: same file parsed before)', ['result'])
+
+DIGEST_EMAILS = Counter(
+    'notification_digest_emails_total', 'Digest emails by outcome (skipped: no email address on the profile)', ['result'])
+SMTP_CONNECTIONS = Counter(
+    'smtp_connections_total', 'SMTP connections opened by the mail pool')
+
+SINGLEFLIGHT_CALLS = Counter(
+    'singleflight_calls_total', 'Coalesced reads: leaders query the store, shared callers reuse their result',
+    ['flight', 'result'])
+
+def _cache_hit_ratios() -> dict:
+    caches = {key[0] for key in CACHE_REQUESTS._values}
+    ratios = {}
+    for cache in caches:
+        hits = CACHE_REQUESTS.value(cache=cache, result='hit')
+        total = hits + CACHE_REQUESTS.value(cache=cache, result='miss')
+        ratios[(cache,)] = round(hits / total, 4) if total else 0
+    return ratios
+
+CACHE_HIT_RATIO = Gauge(
+    'cache_hit_ratio', 'Cache hit ratio since process start', ['cache'], callback=_cache_hit_ratios)
+
+def record_cache(cache: str, hit: bool, count: int = 1) -> None:
+    if count:
+        CACHE_REQUESTS.inc(count, cache=cache, result='hit' if hit else 'miss')
+
+# ============ Mongo Command Listener ============
+
+# Commands whose first field names the target collection
+_COLLECTION_COMMANDS = {
+    'find', 'insert', 'update', 'delete', 'aggregate', 'count', 'distinct',
+    'findAndModify', 'createIndexes', 'listIndexes',
+}
+
+class CommandMetrics(monitoring.CommandListener):
+    """Record MongoDB command counts and latencies per collection"""
+
+    def __init__(self):
+        self._pending = {}
+
+    @staticmethod
+    def _key(event):
+        return (event.request_id, event.connection_id)
+
+    def started(self, event):
+        command = event.command_name
+        if command in _COLLECTION_COMMANDS:
+            collection = event.command.get(command)
+        elif command == 'getMore':
+            collection = event.command.get('collection')
+        else:
+            collection = ''
+        self._pending[self._key(event)] = (str(collection or ''), command)
+
+    def _finish(self, event, outcome: str):
+        collection, command = self._pending.pop(self._key(event), ('', event.command_name))
+        MONGO_COMMANDS.inc(collection=collection, command=command, outcome=outcome)
+        MONGO_LATENCY.observe(event.duration_micros / 1e6, collection=collection, command=command)
+
+    def succeeded(self, event):
+        self._finish(event, 'success')
+
+    def failed(self, event):
+        self._finish(event, 'failure')
+
+command_metrics = CommandMetrics()
+
+# ============ HTTP Middleware ============
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request counts and latency per route template"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = scope.get('route')
+            template = getattr(route, 'path', None) or 'unmatched'
+            HTTP_REQUESTS.inc(method=scope['method'], route=template, status=status_code)
+            HTTP_LATENCY.observe(time.perf_counter() - started, method=scope['method'], route=template)
@@ -0,0 +1,39 @@
+import asyncio
+import argparse
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import get_database, close_client, find_missing_indexes, apply_indexes, INDEXES
+
+async def migrate(check_only: bool):
+    db = get_database()
+    print(f"🔍 Checking indexes in {os.environ['DB_NAME']}...")
+    missing = await find_missing_indexes(db)
+    
+    if not missing:
+        print(f"✓ All {sum(len(models) for models in INDEXES.values())} indexes present")
+        close_client()
+        return 0
+    
+    for collection, models in missing.items():
+        for index in models:
+            print(f"  ✗ {collection}.{index.document['name']}")
+    
+    if check_only:
+        close_client()
+        return 1
+    
+    created = await apply_indexes(db, missing)
+    print(f"✓ Created {created} indexes")
+    close_client()
+    return 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Apply the index manifest from database.INDEXES')
+    parser.add_argument('--check', action='store_true', help='Only report missing indexes (exit 1 if any)')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(migrate(args.check)))
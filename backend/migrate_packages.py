@@ -0,0 +1,53 @@
+import asyncio
+import argparse
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import get_database, close_client
+from drive_search import package_fields
+
+async def backfill(batch_size: int, force: bool, dry_run: bool):
+    """Parse package_min/package_max/package_band for drives stored before they existed"""
+    db = get_database()
+    query = {} if force else {'package_min': {'$exists': False}}
+    print(f"🔍 Backfilling package fields in {os.environ['DB_NAME']}.placement_drives...")
+
+    updated = 0
+    unparsed = []
+    batch = []
+    cursor = db.placement_drives.find(query, {'_id': 0, 'id': 1, 'package': 1}).batch_size(batch_size)
+    async for drive in cursor:
+        fields = package_fields(drive.get('package'))
+        if fields['package_min'] is None:
+            unparsed.append(drive.get('package'))
+        batch.append(UpdateOne({'id': drive['id']}, {'$set': fields}))
+        if len(batch) >= batch_size:
+            updated += await write(db, batch, dry_run)
+            batch = []
+    if batch:
+        updated += await write(db, batch, dry_run)
+
+    print(f"✓ {'Would update' if dry_run else 'Updated'} {updated} drives")
+    if unparsed:
+        print(f"  {len(unparsed)} packages could not be parsed (stored as unspecified), e.g. {unparsed[:5]}")
+    close_client()
+    return 0
+
+async def write(db, batch, dry_run: bool) -> int:
+    if dry_run:
+        return len(batch)
+    result = await db.placement_drives.bulk_write(batch, ordered=False)
+    return result.modified_count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backfill numeric package fields on existing drives')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--force', action='store_true', help='Re-parse every drive, not only unparsed ones')
+    parser.add_argument('--dry-run', action='store_true', help='Parse and report without writing')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(backfill(args.batch_size, args.force, args.dry_run)))
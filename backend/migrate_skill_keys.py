@@ -0,0 +1,52 @@
+import asyncio
+import argparse
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+from pymongo import UpdateOne
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import get_database, close_client
+from eligibility import skill_keys
+
+# collection -> (lower-cased field, key field, source of the skills)
+TARGETS = {
+    'student_profiles': ('skill_keys', 'user_id', lambda doc: doc.get('skills')),
+    'placement_drives': ('required_skill_keys', 'id', lambda doc: (doc.get('eligibility') or {}).get('required_skills')),
+}
+
+async def backfill(batch_size: int, force: bool, dry_run: bool):
+    """Store lower-cased skills (skill_keys, required_skill_keys) on documents written before they existed"""
+    db = get_database()
+    for collection, (field, key, source) in TARGETS.items():
+        query = {} if force else {field: {'$exists': False}}
+        print(f"🔍 Backfilling {field} in {os.environ['DB_NAME']}.{collection}...")
+        updated = 0
+        batch = []
+        cursor = db[collection].find(query, {'_id': 0, key: 1, 'skills': 1, 'eligibility': 1}).batch_size(batch_size)
+        async for doc in cursor:
+            batch.append(UpdateOne({key: doc[key]}, {'$set': {field: skill_keys(source(doc))}}))
+            if len(batch) >= batch_size:
+                updated += await write(db[collection], batch, dry_run)
+                batch = []
+        if batch:
+            updated += await write(db[collection], batch, dry_run)
+        print(f"✓ {'Would update' if dry_run else 'Updated'} {updated} documents in {collection}")
+    close_client()
+    return 0
+
+async def write(collection, batch, dry_run: bool) -> int:
+    if dry_run:
+        return len(batch)
+    result = await collection.bulk_write(batch, ordered=False)
+    return result.modified_count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Backfill lower-cased skill fields used by indexed skill filters')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--force', action='store_true', help='Recompute every document, not only missing ones')
+    parser.add_argument('--dry-run', action='store_true', help='Compute and report without writing')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(backfill(args.batch_size, args.force, args.dry_run)))
@@ -0,0 +1,62 @@
+import asyncio
+import argparse
+import os
+from dotenv import load_dotenv
+from pathlib import Path
+from pymongo import UpdateMany
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+from database import get_database, close_client
+from snapshots import (
+    student_snapshot, drive_snapshot, STUDENT_SNAPSHOT_FIELDS, DRIVE_SNAPSHOT_FIELDS, SNAPSHOT_FIELDS,
+)
+
+async def backfill(batch_size: int, force: bool, dry_run: bool):
+    """Embed student and drive snapshots in applications stored before they existed"""
+    db = get_database()
+    missing = {'$or': [{field: {'$exists': False}} for field in SNAPSHOT_FIELDS]}
+    query = {} if force else missing
+    print(f"🔍 Backfilling snapshots in {os.environ['DB_NAME']}.applications...")
+
+    student_ids = await db.applications.distinct('student_id', query)
+    drive_ids = await db.applications.distinct('drive_id', query)
+    updated = await refresh(db, db.student_profiles, 'user_id', student_ids, 'student_id',
+                            student_snapshot, STUDENT_SNAPSHOT_FIELDS, batch_size, dry_run)
+    updated += await refresh(db, db.placement_drives, 'id', drive_ids, 'drive_id',
+                             drive_snapshot, DRIVE_SNAPSHOT_FIELDS, batch_size, dry_run)
+
+    if dry_run:
+        print(f"✓ Would refresh snapshots for {len(student_ids)} students and {len(drive_ids)} drives")
+    else:
+        print(f"✓ Refreshed snapshots for {len(student_ids)} students and {len(drive_ids)} drives "
+              f"({updated} application updates)")
+    close_client()
+    return 0
+
+async def refresh(db, source, source_key, ids, app_key, snapshot, fields, batch_size: int, dry_run: bool) -> int:
+    """One UpdateMany per source document, written in bulk batches"""
+    updated = 0
+    projection = {'_id': 0, source_key: 1, **{f: 1 for f in fields.values()}}
+    for start in range(0, len(ids), batch_size):
+        chunk = ids[start:start + batch_size]
+        batch = []
+        async for doc in source.find({source_key: {'$in': chunk}}, projection):
+            batch.append(UpdateMany({app_key: doc[source_key]}, {'$set': snapshot(doc)}))
+        if not batch:
+            continue
+        if dry_run:
+            updated += len(batch)
+        else:
+            result = await db.applications.bulk_write(batch, ordered=False)
+            updated += result.modified_count
+    return updated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description='Embed student/drive snapshots in existing applications')
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--force', action='store_true', help='Refresh every application, not only those without snapshots')
+    parser.add_argument('--dry-run', action='store_true', help='Count the updates without writing')
+    args = parser.parse_args()
+    raise SystemExit(asyncio.run(backfill(args.batch_size, args.force, args.dry_run)))
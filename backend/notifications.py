@@ -0,0 +1,61 @@
+import os
+from datetime import datetime
+from typing import List
+
+from eligibility import skill_keys
+from metrics import NOTIFICATION_FANOUT
+
+# Notifications written per insert_many when fanning out to many students
+NOTIFICATION_BATCH_SIZE = int(os.environ.get('NOTIFICATION_BATCH_SIZE', 1000))
+
+async def fan_out(storage, notifications: List[dict], source: str, batch_size: int = NOTIFICATION_BATCH_SIZE) -> int:
+    """Insert notifications in batches and record the fan-out size"""
+    for start in range(0, len(notifications), batch_size):
+        await storage.notifications.insert_many(notifications[start:start + batch_size])
+    NOTIFICATION_FANOUT.observe(len(notifications), source=source)
+    return len(notifications)
+
+# ============ Broadcasts ============
+
+# An audience is a dict of optional criteria: 'departments', 'batches'
+# (any of), 'min_cgpa' and 'skills' (any of, case-insensitive). Every
+# criterion given narrows the audience; an empty audience is every student.
+
+def audience_query(audience: dict) -> dict:
+    """Mongo filter over student_profiles matching matches_audience"""
+    query = {}
+    if audience.get('departments'):
+        query['department'] = {'$in': audience['departments']}
+    if audience.get('batches'):
+        query['batch'] = {'$in': audience['batches']}
+    if audience.get('min_cgpa') is not None:
+        query['cgpa'] = {'$gte': audience['min_cgpa']}
+    if audience.get('skills'):
+        query['skill_keys'] = {'$in': skill_keys(audience['skills'])}
+    return query
+
+def matches_audience(profile: dict, audience: dict) -> bool:
+    if audience.get('departments') and profile['department'] not in audience['departments']:
+        return False
+    if audience.get('batches') and profile['batch'] not in audience['batches']:
+        return False
+    if audience.get('min_cgpa') is not None and profile['cgpa'] < audience['min_cgpa']:
+        return False
+    if audience.get('skills'):
+        wanted = {s.lower() for s in audience['skills']}
+        if wanted.isdisjoint(s.lower() for s in profile['skills']):
+            return False
+    return True
+
+async def broadcast(storage, broadcast_id: str, message: str, audience: dict, now: datetime) -> int:
+    """Notify every student in the audience; returns the number notified"""
+    user_ids = await storage.profiles.list_audience(audience)
+    notifications = [{
+        'id': f"notif_{broadcast_id}_{user_id}",
+        'user_id': user_id,
+        'broadcast_id': broadcast_id,
+        'message': message,
+        'read': False,
+        'created_at': now.isoformat()
+    } for user_id in user_ids]
+    return await fan_out(storage, notifications, source='broadcast')
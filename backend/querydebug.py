@@ -0,0 +1,110 @@
+import os
+import time
+import logging
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from pymongo import monitoring
+
+# Development/staging aid: counts MongoDB commands per HTTP request, logs
+# requests that look like N+1 loops or slow paths, and reports the database
+# time through a Server-Timing header. Disabled unless QUERY_DEBUG is set.
+
+QUERY_DEBUG = os.environ.get('QUERY_DEBUG', '').lower() in ('1', 'true', 'yes')
+QUERY_DEBUG_MAX_COMMANDS = int(os.environ.get('QUERY_DEBUG_MAX_COMMANDS', 10))
+QUERY_DEBUG_MAX_MS = float(os.environ.get('QUERY_DEBUG_MAX_MS', 500))
+
+logger = logging.getLogger(__name__)
+
+# Commands that only exist to manage cursors/sessions are not interesting here
+_IGNORED_COMMANDS = {'endSessions', 'killCursors', 'hello', 'isMaster', 'ismaster'}
+
+def query_shape(value):
+    """Replace literal values with '?' while keeping field names and operators"""
+    if isinstance(value, dict):
+        return {key: query_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [query_shape(value[0])] if value and isinstance(value[0], (dict, list)) else '?'
+    return '?'
+
+def command_shape(command_name: str, command: dict) -> str:
+    collection = command.get(command_name) if command_name != 'getMore' else command.get('collection')
+    if command_name == 'find':
+        body = command.get('filter', {})
+    elif command_name in ('update', 'delete'):
+        statements = command.get('updates') or command.get('deletes') or [{}]
+        body = statements[0].get('q', {})
+    elif command_name == 'aggregate':
+        body = [next(iter(stage), '') for stage in command.get('pipeline', [])]
+    elif command_name in ('count', 'findAndModify'):
+        body = command.get('query', {})
+    else:
+        body = None
+    shape = f"{command_name} {collection}"
+    if body is None:
+        return shape
+    return f"{shape} {body if command_name == 'aggregate' else query_shape(body)}"
+
+class RequestQueryStats:
+    def __init__(self):
+        self.count = 0
+        self.duration_ms = 0.0
+        self.shapes = Counter()
+
+_current: ContextVar[Optional[RequestQueryStats]] = ContextVar('query_debug_stats', default=None)
+
+class QueryDebugListener(monitoring.CommandListener):
+    """Attribute each MongoDB command to the HTTP request that issued it"""
+
+    def started(self, event):
+        stats = _current.get()
+        if stats is None or event.command_name in _IGNORED_COMMANDS:
+            return
+        stats.count += 1
+        stats.shapes[command_shape(event.command_name, event.command)] += 1
+
+    def succeeded(self, event):
+        stats = _current.get()
+        if stats is not None and event.command_name not in _IGNORED_COMMANDS:
+            stats.duration_ms += event.duration_micros / 1000
+
+    def failed(self, event):
+        self.succeeded(event)
+
+query_debug_listener = QueryDebugListener()
+
+class QueryDebugMiddleware:
+    """Pure ASGI middleware reporting per-request MongoDB usage"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestQueryStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+
+        async def send_wrapper(message):
+            if message['type'] == 'http.response.start':
+                total_ms = (time.perf_counter() - started) * 1000
+                timing = f'db;dur={stats.duration_ms:.1f};desc="{stats.count} queries", app;dur={total_ms:.1f}'
+                message['headers'] = list(message.get('headers', [])) + [(b'server-timing', timing.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            total_ms = (time.perf_counter() - started) * 1000
+            if stats.count > QUERY_DEBUG_MAX_COMMANDS or total_ms > QUERY_DEBUG_MAX_MS:
+                repeated = [f"{n}x {shape}" for shape, n in stats.shapes.most_common() if n > 1]
+                logger.warning(
+                    f"{scope['method']} {scope['path']}: {stats.count} queries, "
+                    f"{stats.duration_ms:.1f} ms in db, {total_ms:.1f} ms total"
+                    + (f"; repeated shapes (possible N+1): {repeated}" if repeated else "")
+                    + f"; shapes: {dict(stats.shapes)}"
+                )
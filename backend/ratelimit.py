@@ -0,0 +1,197 @@
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Tuple
+
+from fastapi import HTTPException, Request
+
+from metrics import RATE_LIMIT_DECISIONS
+
+logger = logging.getLogger(__name__)
+
+# Token-bucket rate limiting. Each key owns a bucket holding up to `burst`
+# tokens that refills continuously at `count / period`; a request takes one
+# token or is rejected with 429 and a Retry-After. Buckets live in a shared
+# store so limits hold across workers and replicas: 'memory' (single
+# process) or 'redis' (any Redis-protocol server, updated atomically by a
+# Lua script using the server's clock).
+
+# RATE_LIMIT_ENABLED=false is meant for local load tests only
+RATE_LIMIT_ENABLED = os.environ.get('RATE_LIMIT_ENABLED', 'true').lower() != 'false'
+RATE_LIMIT_STORE = os.environ.get('RATE_LIMIT_STORE', 'memory')
+RATE_LIMIT_REDIS_URL = os.environ.get('RATE_LIMIT_REDIS_URL', 'redis://localhost:6379/0')
+RATE_LIMIT_MEMORY_KEYS = int(os.environ.get('RATE_LIMIT_MEMORY_KEYS', 100_000))
+RATE_LIMIT_MEMORY_SWEEP_SECONDS = float(os.environ.get('RATE_LIMIT_MEMORY_SWEEP_SECONDS', 60))
+
+_PERIODS = {'second': 1, 'minute': 60, 'hour': 3600, 'day': 86400}
+_RATE = re.compile(r'^\s*(\d+)\s*/\s*(second|minute|hour|day)\s*(?:;\s*burst\s*=\s*(\d+)\s*)?$')
+
+class Rate(NamedTuple):
+    count: int
+    period: int  # seconds
+    burst: int  # bucket capacity
+
+    @property
+    def per_second(self) -> float:
+        return self.count / self.period
+
+    def __str__(self):
+        unit = next((name for name, seconds in _PERIODS.items() if seconds == self.period), f"{self.period}s")
+        return f"{self.count} per {unit}"
+
+def parse_rate(spec: str) -> Rate:
+    """'10/minute' or '10/minute;burst=20' (burst defaults to the count)"""
+    match = _RATE.match(spec)
+    if not match:
+        raise ValueError(f"Invalid rate limit '{spec}', expected e.g. '10/minute' or '10/minute;burst=20'")
+    count, period, burst = match.groups()
+    return Rate(int(count), _PERIODS[period], int(burst) if burst else int(count))
+
+# Limits per scope (overridable, e.g. RATE_LIMIT_LOGIN='20/minute;burst=5')
+RATE_LIMITS = {
+    scope: parse_rate(os.environ.get(f'RATE_LIMIT_{scope.upper()}', default))
+    for scope, default in {
+        'register': '5/hour',
+        'login': '10/minute',  # per client IP + email
+        'login_ip': '300/minute',  # per client IP, loose enough for a campus behind one NAT
+        'refresh': '20/minute',
+        'user': '600/minute;burst=120',  # per authenticated user, all routes
+    }.items()
+}
+
+class Decision(NamedTuple):
+    allowed: bool
+    remaining: int
+    retry_after: float  # seconds until a token is available (0 when allowed)
+
+def refill(tokens: float, elapsed: float, rate: Rate) -> float:
+    return min(float(rate.burst), tokens + max(elapsed, 0.0) * rate.per_second)
+
+class MemoryBucketStore:
+    """Buckets in a process-local dict; only correct with a single worker"""
+
+    def __init__(self, max_keys: int = RATE_LIMIT_MEMORY_KEYS, clock=time.monotonic,
+                 sweep_interval: float = RATE_LIMIT_MEMORY_SWEEP_SECONDS):
+        self.max_keys = max_keys
+        self.clock = clock
+        self.sweep_interval = sweep_interval
+        self._buckets: OrderedDict[str, Tuple[float, float, Rate]] = OrderedDict()  # key -> (tokens, updated, rate), LRU first
+        self._swept = clock()
+
+    async def take(self, key: str, rate: Rate, cost: int = 1) -> Decision:
+        now = self.clock()
+        bucket = self._buckets.get(key)
+        tokens = refill(bucket[0], now - bucket[1], rate) if bucket else float(rate.burst)
+        if tokens >= cost:
+            tokens -= cost
+            decision = Decision(True, int(tokens), 0.0)
+        else:
+            decision = Decision(False, 0, (cost - tokens) / rate.per_second)
+        self._buckets[key] = (tokens, now, rate)
+        self._buckets.move_to_end(key)
+        if now - self._swept >= self.sweep_interval:
+            self._sweep(now)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)  # least recently used
+        return decision
+
+    def _sweep(self, now: float) -> None:
+        # Refilled buckets carry no state. A full pass, but at most once per
+        # interval, so its cost is spread over every request in between.
+        self._swept = now
+        for key in [key for key, (tokens, updated, rate) in self._buckets.items()
+                    if refill(tokens, now - updated, rate) >= rate.burst]:
+            del self._buckets[key]
+
+    async def close(self) -> None:
+        self._buckets.clear()
+
+# KEYS[1] bucket hash; ARGV: burst, tokens per second, cost.
+# Returns {allowed, remaining tokens, retry after} (floats as strings).
+TOKEN_BUCKET_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local per_second = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or burst
+local updated = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(now - updated, 0) * per_second)
+local allowed = 0
+local retry_after = 0
+if tokens >= cost then
+    tokens = tokens - cost
+    allowed = 1
+else
+    retry_after = (cost - tokens) / per_second
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / per_second * 1000) + 1000)
+return {allowed, tostring(tokens), tostring(retry_after)}
+"""
+
+class RedisBucketStore:
+    """Buckets in a Redis-protocol server shared by every worker and replica"""
+
+    def __init__(self, url: str = RATE_LIMIT_REDIS_URL, client=None, prefix: str = 'ratelimit:'):
+        if client is None:
+            try:
+                import redis.asyncio as aioredis
+            except ImportError as e:
+                raise RuntimeError("RATE_LIMIT_STORE=redis requires the 'redis' package") from e
+            client = aioredis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, rate: Rate, cost: int = 1) -> Decision:
+        allowed, tokens, retry_after = await self._script(
+            keys=[self.prefix + key], args=[rate.burst, rate.per_second, cost])
+        return Decision(bool(int(allowed)), int(float(tokens)), float(retry_after))
+
+    async def close(self) -> None:
+        await self.client.aclose()
+
+def create_store(kind: str = RATE_LIMIT_STORE):
+    if kind == 'memory':
+        return MemoryBucketStore()
+    if kind == 'redis':
+        return RedisBucketStore()
+    raise ValueError(f"Unknown RATE_LIMIT_STORE '{kind}' (expected 'memory' or 'redis')")
+
+def client_ip(request: Request) -> str:
+    return request.client.host if request.client else 'unknown'
+
+class RateLimiter:
+    def __init__(self, store, limits: Dict[str, Rate] = RATE_LIMITS, enabled: bool = RATE_LIMIT_ENABLED):
+        self.store = store
+        self.limits = limits
+        self.enabled = enabled
+
+    async def hit(self, scope: str, key: str) -> Decision:
+        """Take a token from `scope`'s bucket for `key`; a store outage lets the request through"""
+        rate = self.limits[scope]
+        try:
+            decision = await self.store.take(f"{scope}:{key}", rate)
+        except Exception:
+            logger.exception(f"Rate limit store unavailable, allowing {scope} request")
+            RATE_LIMIT_DECISIONS.inc(scope=scope, result='error')
+            return Decision(True, rate.burst, 0.0)
+        RATE_LIMIT_DECISIONS.inc(scope=scope, result='allowed' if decision.allowed else 'limited')
+        return decision
+
+    async def enforce(self, scope: str, key: str) -> None:
+        """Raise 429 with Retry-After when `key` is over `scope`'s limit"""
+        if not self.enabled:
+            return
+        decision = await self.hit(scope, key)
+        if not decision.allowed:
+            raise HTTPException(
+                status_code=429,
+                detail=f"Rate limit exceeded: {self.limits[scope]}",
+                headers={'Retry-After': str(max(1, math.ceil(decision.retry_after)))},
+            )
@@ -0,0 +1,129 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+from metrics import record_cache
+
+# Ranking of eligible drives for a student. The profile/drive dependent part
+# of a score (skill overlap and CGPA headroom) is cached per (student, drive)
+# together with the inputs it was computed from, so a changed profile or
+# drive only recomputes its own pairs. Deadline urgency depends on the date
+# and is applied per request.
+
+RECOMMEND_WEIGHTS = {
+    'skills': float(os.environ.get('RECOMMEND_WEIGHT_SKILLS', 0.6)),
+    'cgpa': float(os.environ.get('RECOMMEND_WEIGHT_CGPA', 0.25)),
+    'urgency': float(os.environ.get('RECOMMEND_WEIGHT_URGENCY', 0.15)),
+}
+RECOMMEND_CACHE_STUDENTS = int(os.environ.get('RECOMMEND_CACHE_STUDENTS', 5000))
+
+# Skill score for drives without required skills (no signal either way)
+NEUTRAL_SKILL_SCORE = 0.5
+# Days over which deadline urgency decays by half
+URGENCY_HALF_LIFE_DAYS = 7
+
+_WHITESPACE = re.compile(r'\s+')
+
+def normalize_skill(skill: str) -> str:
+    return _WHITESPACE.sub(' ', skill.strip().lower())
+
+def skill_set(skills) -> frozenset:
+    return frozenset(normalize_skill(s) for s in skills or [] if s and s.strip())
+
+def jaccard(a: frozenset, b: frozenset) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+# Cache keys are the raw score inputs; comparing them is cheaper than scoring
+def profile_key(profile: dict) -> tuple:
+    return profile['cgpa'], tuple(profile.get('skills') or ())
+
+def drive_key(drive: dict) -> tuple:
+    criteria = drive['eligibility']
+    return criteria['min_cgpa'], tuple(criteria.get('required_skills') or ())
+
+def base_scores(cgpa: float, skills: frozenset, drive_inputs: tuple) -> Tuple[float, float]:
+    """(skill overlap, CGPA headroom), each in [0, 1]"""
+    min_cgpa, required_skills = drive_inputs
+    required = skill_set(required_skills)
+    skill = jaccard(skills, required) if required else NEUTRAL_SKILL_SCORE
+    span = 10 - min_cgpa
+    headroom = min(1.0, max(0.0, (cgpa - min_cgpa) / span)) if span > 0 else 0.0
+    return skill, headroom
+
+def urgency(deadline: str, today: date) -> float:
+    """1.0 on the last day, halving every URGENCY_HALF_LIFE_DAYS"""
+    try:
+        days = (date.fromisoformat(deadline) - today).days
+    except ValueError:
+        return 0.0
+    return 0.5 ** (max(days, 0) / URGENCY_HALF_LIFE_DAYS)
+
+class RecommendationCache:
+    """Per-student LRU of {drive_id: (drive inputs, base scores)}"""
+
+    def __init__(self, max_students: int = RECOMMEND_CACHE_STUDENTS):
+        self.max_students = max_students
+        self._students: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scores_for(self, profile: dict, drives: List[dict]) -> Dict[str, Tuple[float, float]]:
+        inputs = profile_key(profile)
+        with self._lock:
+            entry = self._students.get(profile['user_id'])
+            if entry is None or entry[0] != inputs:
+                entry = (inputs, {})
+            self._students[profile['user_id']] = entry
+            self._students.move_to_end(profile['user_id'])
+            while len(self._students) > self.max_students:
+                self._students.popitem(last=False)
+
+        cached = entry[1]
+        skills = None
+        scores = {}
+        hits = 0
+        for drive in drives:
+            inputs_for_drive = drive_key(drive)
+            hit = cached.get(drive['id'])
+            if hit is not None and hit[0] == inputs_for_drive:
+                hits += 1
+                scores[drive['id']] = hit[1]
+                continue
+            if skills is None:
+                skills = skill_set(profile.get('skills'))
+            score = base_scores(profile['cgpa'], skills, inputs_for_drive)
+            cached[drive['id']] = (inputs_for_drive, score)
+            scores[drive['id']] = score
+        record_cache('recommendations', True, hits)
+        record_cache('recommendations', False, len(drives) - hits)
+        return scores
+
+    def invalidate_student(self, user_id: str) -> None:
+        with self._lock:
+            self._students.pop(user_id, None)
+
+    def invalidate_drive(self, drive_id: str) -> None:
+        with self._lock:
+            for _, cached in self._students.values():
+                cached.pop(drive_id, None)
+
+def rank_drives(profile: dict, drives: List[dict], cache: RecommendationCache, today: date,
+                limit: Optional[int] = None) -> List[dict]:
+    """Eligible drives ordered by weighted score, each with 'score' and 'score_breakdown'"""
+    base = cache.scores_for(profile, drives)
+    ranked = []
+    for drive in drives:
+        skill, headroom = base[drive['id']]
+        breakdown = {
+            'skills': round(skill, 4),
+            'cgpa': round(headroom, 4),
+            'urgency': round(urgency(drive.get('deadline', ''), today), 4),
+        }
+        score = sum(RECOMMEND_WEIGHTS[name] * value for name, value in breakdown.items())
+        ranked.append({**drive, 'score': round(score, 4), 'score_breakdown': breakdown})
+    ranked.sort(key=lambda d: (-d['score'], d.get('deadline', '')))
+    return ranked[:limit] if limit else ranked
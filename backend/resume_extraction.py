@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime, timezone
+from typing import List, Optional, Set
+
+from database import SERVERLESS
+from metrics import RESUME_EXTRACTIONS
+from resume_skills import (
+    EXTRACTABLE_TYPES, ResumeParseError, UnsupportedResume, VOCABULARY_VERSION, extract_text, normalize_skills,
+)
+from singleflight import SingleFlight
+
+logger = logging.getLogger(__name__)
+
+# Background skill extraction for uploaded resumes. Parsing runs in a
+# process pool, off the event loop and outside the GIL. Results are kept per
+# content hash in resume_extractions: a file parsed before (re-uploaded, or
+# shared by several students) costs one lookup, and a vocabulary change
+# re-normalizes the stored text without parsing again. A profile's
+# resume_skills stays None until its extraction lands, which is how
+# resume() finds work interrupted by a restart.
+
+# 0 parses in a thread instead (the default on serverless, where there is no lifespan to manage a pool)
+RESUME_EXTRACT_WORKERS = int(os.environ.get('RESUME_EXTRACT_WORKERS', 0 if SERVERLESS else 2))
+# A timed-out parse is abandoned, but keeps its worker until it finishes
+RESUME_EXTRACT_TIMEOUT = float(os.environ.get('RESUME_EXTRACT_TIMEOUT', 60))
+
+class ResumeSkillExtractor:
+    def __init__(self, storage, blob_store, workers: int = RESUME_EXTRACT_WORKERS,
+                 timeout: float = RESUME_EXTRACT_TIMEOUT):
+        self.storage = storage
+        self.blob_store = blob_store
+        self.workers = workers
+        self.timeout = timeout
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._slots = asyncio.Semaphore(max(workers, 1))  # bounds parses waiting on the pool (and their temp files)
+        self._flight = SingleFlight('resume_extraction')
+        self._tasks: Set[asyncio.Task] = set()
+
+    @property
+    def executor(self) -> Optional[ProcessPoolExecutor]:
+        if self._executor is None and self.workers > 0:
+            # spawn, not fork: the server process runs an event loop and driver threads
+            self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context('spawn'))
+        return self._executor
+
+    def submit(self, user_id: str, resume: dict) -> None:
+        """Extract skills from the profile's `resume` in the background"""
+        task = asyncio.create_task(self._run(user_id, resume))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, user_id: str, resume: dict) -> None:
+        try:
+            skills = await self.skills_for(resume)
+            # Ignored if the student uploaded another resume in the meantime
+            await self.storage.profiles.set_resume_skills(user_id, resume['sha256'], skills)
+        except Exception:
+            # The profile stays pending, so the next resume() retries it
+            logger.exception(f"Resume skill extraction for {user_id} failed")
+
+    async def skills_for(self, resume: dict) -> List[str]:
+        """Canonical skills in a stored resume, parsed at most once per content hash"""
+        return await self._flight.do(resume['sha256'], lambda: self._extract(resume))
+
+    async def _extract(self, resume: dict) -> List[str]:
+        sha256 = resume['sha256']
+        cached = await self.storage.resume_extractions.get(sha256)
+        if cached is not None and cached['vocabulary_version'] == VOCABULARY_VERSION:
+            RESUME_EXTRACTIONS.inc(result='cached')
+            return cached['skills']
+
+        if cached is not None:
+            text = cached['text']
+            RESUME_EXTRACTIONS.inc(result='renormalized')
+        else:
+            try:
+                text = await self._parse(resume)
+            except UnsupportedResume as e:
+                logger.info(f"Skipping skill extraction for resume {sha256}: {e}")
+                RESUME_EXTRACTIONS.inc(result='unsupported')
+                return []
+            except (ResumeParseError, asyncio.TimeoutError, BrokenProcessPool) as e:
+                # Not cached: a re-upload (or a fixed parser) gets another try
+                logger.warning(f"Could not extract text from resume {sha256}: {e!r}")
+                RESUME_EXTRACTIONS.inc(result='failed')
+                return []
+            RESUME_EXTRACTIONS.inc(result='extracted')
+
+        skills = normalize_skills(text)
+        await self.storage.resume_extractions.save({
+            'sha256': sha256,
+            'content_type': resume['content_type'],
+            'text': text,
+            'skills': skills,
+            'vocabulary_version': VOCABULARY_VERSION,
+            'extracted_at': datetime.now(timezone.utc).isoformat()
+        })
+        return skills
+
+    async def _parse(self, resume: dict) -> str:
+        if resume['content_type'] not in EXTRACTABLE_TYPES:
+            raise UnsupportedResume(f"Cannot extract text from {resume['content_type']}")
+        async with self._slots:
+            path = self.blob_store.local_path(resume['sha256'])
+            spooled = None
+            if path is None:
+                path = spooled = await self._spool(resume)
+            try:
+                loop = asyncio.get_running_loop()
+                return await asyncio.wait_for(
+                    loop.run_in_executor(self.executor, extract_text, path, resume['content_type']), self.timeout)
+            except BrokenProcessPool:
+                self._executor = None  # a worker died (e.g. out of memory); start a fresh pool next time
+                raise
+            finally:
+                if spooled:
+                    os.unlink(spooled)
+
+    async def _spool(self, resume: dict) -> str:
+        """Copy a blob from a remote store (GridFS) to a temp file the workers can open"""
+        handle, path = tempfile.mkstemp(prefix='resume_', suffix='.extract')
+        try:
+            with os.fdopen(handle, 'wb') as out:
+                async for chunk in self.blob_store.read(resume['sha256'], 0, resume['size'] - 1):
+                    out.write(chunk)
+        except BaseException:
+            os.unlink(path)
+            raise
+        return path
+
+    async def resume(self) -> int:
+        """Restart extractions interrupted by a crash or shutdown"""
+        pending = await self.storage.profiles.list_pending_resume_skills()
+        for profile in pending:
+            self.submit(profile['user_id'], profile['resume'])
+        return len(pending)
+
+    async def drain(self) -> None:
+        """Wait for running extractions (tests and benchmarks)"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks))
+
+    async def stop(self) -> None:
+        """Cancel running extractions (they resume on the next start) and stop the workers"""
+        tasks = list(self._tasks)
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
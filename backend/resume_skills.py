@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import re
+import zipfile
+from typing import Dict, List
+from xml.etree import ElementTree
+
+# Resume text extraction and skill normalization. Kept free of server and
+# database imports: extract_text runs in worker processes (see
+# resume_extraction.py), which import this module on their own.
+
+RESUME_EXTRACT_MAX_PAGES = int(os.environ.get('RESUME_EXTRACT_MAX_PAGES', 20))
+RESUME_EXTRACT_MAX_CHARS = int(os.environ.get('RESUME_EXTRACT_MAX_CHARS', 100_000))
+# A DOCX is a zip; refuse documents that inflate past this (zip bombs)
+DOCX_MAX_XML_BYTES = 20 * 1024 * 1024
+
+PDF = 'application/pdf'
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+EXTRACTABLE_TYPES = (PDF, DOCX)
+
+class UnsupportedResume(Exception):
+    """No extractor for this type (legacy .doc, or a PDF without pypdf installed)"""
+
+class ResumeParseError(Exception):
+    """The file could not be parsed (corrupt, truncated or hostile)"""
+
+_WORD_TEXT = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}t'
+_WORD_PARAGRAPH = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}p'
+
+def extract_docx(path: str) -> str:
+    with zipfile.ZipFile(path) as archive:
+        info = archive.getinfo('word/document.xml')
+        if info.file_size > DOCX_MAX_XML_BYTES:
+            raise ValueError('Document body too large')
+        parts = []
+        size = 0
+        with archive.open(info) as xml:
+            for _, element in ElementTree.iterparse(xml):
+                if element.tag == _WORD_TEXT and element.text:
+                    parts.append(element.text)
+                    size += len(element.text)
+                elif element.tag == _WORD_PARAGRAPH:
+                    parts.append('\n')
+                    element.clear()
+                if size > RESUME_EXTRACT_MAX_CHARS:
+                    break
+    return ''.join(parts)
+
+def extract_pdf(path: str) -> str:
+    try:
+        from pypdf import PdfReader
+    except ImportError as e:
+        raise UnsupportedResume("PDF extraction requires the 'pypdf' package") from e
+    reader = PdfReader(path)
+    parts = []
+    size = 0
+    for page in reader.pages[:RESUME_EXTRACT_MAX_PAGES]:
+        text = page.extract_text() or ''
+        parts.append(text)
+        size += len(text)
+        if size > RESUME_EXTRACT_MAX_CHARS:
+            break
+    return '\n'.join(parts)
+
+def extract_text(path: str, content_type: str) -> str:
+    """Plain text of a stored resume, truncated to RESUME_EXTRACT_MAX_CHARS (runs in a worker process)"""
+    if content_type not in EXTRACTABLE_TYPES:
+        raise UnsupportedResume(f"Cannot extract text from {content_type}")
+    try:
+        text = extract_docx(path) if content_type == DOCX else extract_pdf(path)
+    except UnsupportedResume:
+        raise
+    except Exception as e:
+        # Parser exceptions vary by library and may not pickle back from the worker
+        raise ResumeParseError(f"{type(e).__name__}: {e}") from None
+    return text[:RESUME_EXTRACT_MAX_CHARS]
+
+# ============ Skill Vocabulary ============
+
+# Canonical skill -> every spelling that maps to it, matched
+# case-insensitively as whole words. Canonical names follow how drives list
+# required_skills. Spellings that are also ordinary words ('C', 'Go',
+# 'rest', 'spring', 'excel') are left out in favour of unambiguous ones.
+SKILL_VOCABULARY: Dict[str, List[str]] = {
+    'Python': ['python', 'python3'],
+    'Java': ['java', 'core java', 'java se', 'java ee'],
+    'JavaScript': ['javascript', 'js', 'es6', 'ecmascript'],
+    'TypeScript': ['typescript'],
+    'C': ['c programming', 'c language', 'ansi c'],
+    'C++': ['c++', 'cpp', 'c plus plus'],
+    'C#': ['c#', 'csharp', 'c sharp'],
+    'Go': ['golang'],
+    'Rust': ['rust', 'rustlang'],
+    'Kotlin': ['kotlin'],
+    'Swift': ['swift', 'swiftui'],
+    'PHP': ['php'],
+    'SQL': ['sql', 'pl/sql', 't-sql'],
+    'MySQL': ['mysql'],
+    'PostgreSQL': ['postgresql', 'postgres', 'psql'],
+    'MongoDB': ['mongodb', 'mongo'],
+    'Redis': ['redis'],
+    'HTML': ['html', 'html5'],
+    'CSS': ['css', 'css3'],
+    'Tailwind CSS': ['tailwind', 'tailwindcss', 'tailwind css'],
+    'React': ['react', 'reactjs', 'react.js'],
+    'Angular': ['angular', 'angularjs', 'angular.js'],
+    'Vue': ['vue', 'vuejs', 'vue.js'],
+    'Node.js': ['node.js', 'nodejs', 'node js'],
+    'Express': ['express.js', 'expressjs'],
+    'Django': ['django'],
+    'Flask': ['flask'],
+    'FastAPI': ['fastapi'],
+    'Spring Boot': ['spring boot', 'springboot', 'spring framework'],
+    '.NET': ['.net', 'dotnet', 'asp.net', '.net core'],
+    'Git': ['git', 'github', 'gitlab'],
+    'Docker': ['docker'],
+    'Kubernetes': ['kubernetes', 'k8s'],
+    'AWS': ['aws', 'amazon web services', 'ec2', 's3'],
+    'Azure': ['azure', 'microsoft azure'],
+    'GCP': ['gcp', 'google cloud', 'google cloud platform'],
+    'Linux': ['linux', 'unix', 'ubuntu'],
+    'REST APIs': ['restful', 'rest api', 'rest apis'],
+    'GraphQL': ['graphql'],
+    'Machine Learning': ['machine learning', 'ml'],
+    'Deep Learning': ['deep learning', 'neural networks'],
+    'NLP': ['nlp', 'natural language processing'],
+    'Computer Vision': ['computer vision', 'opencv'],
+    'TensorFlow': ['tensorflow', 'keras'],
+    'PyTorch': ['pytorch'],
+    'Pandas': ['pandas'],
+    'NumPy': ['numpy'],
+    'scikit-learn': ['scikit-learn', 'sklearn', 'scikit learn'],
+    'Data Analysis': ['data analysis', 'data analytics'],
+    'Power BI': ['power bi', 'powerbi'],
+    'Tableau': ['tableau'],
+    'Excel': ['ms excel', 'microsoft excel', 'advanced excel'],
+    'Embedded Systems': ['embedded systems', 'embedded c', 'microcontrollers'],
+    'IoT': ['iot', 'internet of things'],
+    'MATLAB': ['matlab'],
+    'AutoCAD': ['autocad'],
+    'Figma': ['figma'],
+    'Android': ['android', 'android development'],
+    'Flutter': ['flutter', 'dart'],
+    'DSA': ['dsa', 'data structures', 'data structures and algorithms'],
+}
+
+def _build_aliases(vocabulary: Dict[str, List[str]]) -> Dict[str, str]:
+    aliases = {}
+    for canonical, names in vocabulary.items():
+        for name in names:
+            aliases[name.lower()] = canonical
+    return aliases
+
+SKILL_ALIASES = _build_aliases(SKILL_VOCABULARY)
+
+# Changes whenever the vocabulary does, so cached extractions are re-normalized
+VOCABULARY_VERSION = hashlib.sha256(json.dumps(SKILL_ALIASES, sort_keys=True).encode()).hexdigest()[:12]
+
+# Longest alias first, so 'data structures and algorithms' wins over 'data structures'. Boundaries allow
+# the punctuation skills use ('c++', 'c#', 'node.js', '.net').
+_SKILL_PATTERN = re.compile(
+    r'(?<![\w+#.])(' + '|'.join(re.escape(a) for a in sorted(SKILL_ALIASES, key=len, reverse=True)) + r')(?![\w+#]|\.\w)',
+    re.IGNORECASE,
+)
+
+def normalize_skills(text: str) -> List[str]:
+    """Canonical skills mentioned in `text`, in order of first mention"""
+    found = {}
+    for match in _SKILL_PATTERN.finditer(text):
+        found.setdefault(SKILL_ALIASES[match.group(1).lower()], None)
+    return list(found)
@@ -0,0 +1,256 @@
+import asyncio
+import hashlib
+import os
+import re
+import tempfile
+import uuid
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, NamedTuple, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorGridFSBucket
+
+from database import get_database, SERVERLESS
+
+# Resume storage. Uploads are streamed to a temp file while their SHA-256 is
+# computed, then handed to a content-addressed blob store, so identical
+# files are stored once and an upload is never held in worker memory.
+# Downloads stream byte ranges from the store in fixed-size chunks.
+
+# 'local' (a directory shared by every worker) or 'gridfs'; serverless disks are ephemeral
+RESUME_STORE = os.environ.get('RESUME_STORE', 'gridfs' if SERVERLESS else 'local')
+RESUME_STORE_PATH = os.environ.get('RESUME_STORE_PATH', str(Path(__file__).parent / 'uploads' / 'resumes'))
+RESUME_MAX_BYTES = int(os.environ.get('RESUME_MAX_BYTES', 5 * 1024 * 1024))
+RESUME_CHUNK_BYTES = 64 * 1024
+
+# Accepted types and the bytes each file must start with
+RESUME_TYPES = {
+    'application/pdf': b'%PDF-',
+    'application/msword': b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': b'PK\x03\x04',
+}
+RESUME_EXTENSIONS = {
+    'application/pdf': '.pdf',
+    'application/msword': '.doc',
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.document': '.docx',
+}
+
+class ResumeTooLarge(Exception):
+    pass
+
+class InvalidResume(Exception):
+    pass
+
+class SpooledResume(NamedTuple):
+    path: str
+    size: int
+    sha256: str
+
+async def spool_resume(chunks: AsyncIterator[bytes], content_type: str, max_bytes: int = RESUME_MAX_BYTES,
+                       directory: Optional[str] = None) -> SpooledResume:
+    """Stream an upload to a temp file, hashing it and checking its size and type on the way"""
+    signature = RESUME_TYPES.get(content_type)
+    if signature is None:
+        raise InvalidResume('Resume must be a PDF, DOC or DOCX file')
+    digest = hashlib.sha256()
+    size = 0
+    head = b''
+    handle, path = tempfile.mkstemp(prefix='resume_', suffix='.upload', dir=directory)
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ResumeTooLarge(f"Resume exceeds {max_bytes} bytes")
+                if len(head) < len(signature):
+                    head += chunk[:len(signature) - len(head)]
+                digest.update(chunk)
+                out.write(chunk)
+        if head != signature:
+            raise InvalidResume(f"File content is not a valid {RESUME_EXTENSIONS[content_type][1:].upper()}")
+    except BaseException:
+        os.unlink(path)
+        raise
+    return SpooledResume(path, size, digest.hexdigest())
+
+def resume_filename(filename: Optional[str], content_type: str) -> str:
+    """Base name safe to store and send back, with the extension of the stored type"""
+    name = re.sub(r'[\x00-\x1f"\\/]', '', Path(filename or '').name).strip()[:200]
+    extension = RESUME_EXTENSIONS[content_type]
+    stem = name[:-len(extension)] if name.lower().endswith(extension) else name
+    return (stem or 'resume') + extension
+
+_RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def parse_range(header: Optional[str], size: int) -> Optional[Tuple[int, int]]:
+    """Inclusive (start, end) of a single 'bytes=' range, or None to send the whole file
+
+    Raises ValueError when the range cannot be satisfied (416). Multi-range
+    and malformed headers are ignored, as RFC 9110 allows.
+    """
+    match = _RANGE.match((header or '').strip())
+    if not match or match.groups() == ('', ''):
+        return None
+    first, last = match.groups()
+    if not first:  # suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError('Empty suffix range')
+        return max(size - int(last), 0), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or end < start:
+        raise ValueError('Range not satisfiable')
+    return start, end
+
+# ============ Blob Stores ============
+
+# Both stores file blobs under their SHA-256 and share one interface:
+# put(digest, path) consumes a spooled file, read(digest, start, end)
+# yields the inclusive byte range in chunks, and local_path(digest) is a
+# filesystem path to the blob when there is one.
+#
+# Blobs are shared, so deleting one races with an upload of the same
+# content. Uploads reference the digest from the profile *before* put(),
+# and delete_unused(digest, in_use) moves the blob aside before its final
+# in_use() check, restoring it if a reference appeared meanwhile. Either
+# the check sees the new reference, or the upload's put() runs after the
+# blob was moved aside and stores its own copy.
+
+class LocalBlobStore:
+    """Blobs as files under `root`; every worker must see the same directory"""
+
+    def __init__(self, root: str = RESUME_STORE_PATH):
+        self.root = Path(root)
+        self.spool_dir = str(self.root / 'tmp')  # same filesystem, so put() is a rename
+        os.makedirs(self.spool_dir, exist_ok=True)
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / digest
+
+    async def exists(self, digest: str) -> bool:
+        return self._path(digest).exists()
+
+    def local_path(self, digest: str) -> Optional[str]:
+        """Path other processes can open the blob at"""
+        return str(self._path(digest))
+
+    async def put(self, digest: str, path: str) -> bool:
+        """Move a spooled file into the store; False (and the file discarded) if already stored"""
+        target = self._path(digest)
+        if target.exists():
+            os.unlink(path)
+            return False
+        target.parent.mkdir(exist_ok=True)
+        os.replace(path, target)
+        return True
+
+    async def read(self, digest: str, start: int, end: int) -> AsyncIterator[bytes]:
+        with open(self._path(digest), 'rb') as f:
+            f.seek(start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await asyncio.to_thread(f.read, min(RESUME_CHUNK_BYTES, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+
+    async def delete_unused(self, digest: str, in_use: Callable[[], Awaitable[bool]]) -> bool:
+        """Delete the blob unless in_use() reports a reference; True if it was deleted"""
+        if await in_use():
+            return False
+        target = self._path(digest)
+        aside = Path(self.spool_dir) / f"{digest}.{uuid.uuid4().hex[:8]}.deleting"
+        try:
+            os.replace(target, aside)
+        except FileNotFoundError:
+            return False
+        if await in_use():
+            os.replace(aside, target)
+            return False
+        os.unlink(aside)
+        return True
+
+class GridFSBlobStore:
+    """Blobs in a GridFS bucket of the application database, named by their SHA-256
+
+    Files get their own ids, so two concurrent uploads of the same content
+    store two copies instead of colliding on chunk keys; reads use the
+    newest and delete() removes them all.
+    """
+
+    spool_dir = None
+
+    def __init__(self, bucket_name: str = 'resumes', database=None):
+        self.bucket_name = bucket_name
+        self._database = database
+        self._bucket = None
+
+    @property
+    def database(self):
+        if self._database is None:
+            self._database = get_database()
+        return self._database
+
+    @property
+    def bucket(self):
+        if self._bucket is None:
+            self._bucket = AsyncIOMotorGridFSBucket(self.database, bucket_name=self.bucket_name)
+        return self._bucket
+
+    async def _newest(self, digest: str) -> Optional[dict]:
+        return await self.database[f'{self.bucket_name}.files'].find_one(
+            {'filename': digest}, {'_id': 1}, sort=[('uploadDate', -1)])
+
+    async def exists(self, digest: str) -> bool:
+        return await self._newest(digest) is not None
+
+    def local_path(self, digest: str) -> Optional[str]:
+        return None  # readers copy the blob out with read()
+
+    async def put(self, digest: str, path: str) -> bool:
+        try:
+            if await self.exists(digest):
+                return False
+            with open(path, 'rb') as source:
+                await self.bucket.upload_from_stream(digest, source)
+            return True
+        finally:
+            os.unlink(path)
+
+    async def read(self, digest: str, start: int, end: int) -> AsyncIterator[bytes]:
+        stored = await self._newest(digest)
+        if stored is None:
+            raise FileNotFoundError(digest)
+        grid_out = await self.bucket.open_download_stream(stored['_id'])
+        grid_out.seek(start)
+        remaining = end - start + 1
+        while remaining > 0:
+            chunk = await grid_out.read(min(RESUME_CHUNK_BYTES, remaining))
+            if not chunk:
+                break
+            remaining -= len(chunk)
+            yield chunk
+
+    async def delete_unused(self, digest: str, in_use: Callable[[], Awaitable[bool]]) -> bool:
+        if await in_use():
+            return False
+        cursor = self.database[f'{self.bucket_name}.files'].find({'filename': digest}, {'_id': 1})
+        file_ids = [stored['_id'] async for stored in cursor]
+        if not file_ids:
+            return False
+        for file_id in file_ids:
+            await self.bucket.rename(file_id, f"{digest}.deleting")
+        if await in_use():
+            for file_id in file_ids:
+                await self.bucket.rename(file_id, digest)
+            return False
+        for file_id in file_ids:
+            await self.bucket.delete(file_id)
+        return True
+
+def create_blob_store(kind: str = RESUME_STORE):
+    if kind == 'local':
+        return LocalBlobStore()
+    if kind == 'gridfs':
+        return GridFSBlobStore()
+    raise ValueError(f"Unknown RESUME_STORE '{kind}' (expected 'local' or 'gridfs')")
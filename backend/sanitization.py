@@ -0,0 +1,73 @@
+import html
+import os
+import threading
+from functools import lru_cache
+from typing import Annotated, Optional
+
+import bleach
+from pydantic import AfterValidator
+
+# Password Policy
+PASSWORD_MIN_LENGTH = int(os.environ.get('PASSWORD_MIN_LENGTH', 8))
+
+# Distinct marked-up strings whose cleaned form is memoized
+SANITIZE_CACHE_SIZE = int(os.environ.get('SANITIZE_CACHE_SIZE', 4096))
+
+# Rounds of strip-and-unescape before giving up on nested entity encoding
+SANITIZE_MAX_ROUNDS = 4
+
+# bleach.Cleaner keeps parser state between calls, so each thread gets its own
+_local = threading.local()
+
+def _cleaner() -> bleach.Cleaner:
+    cleaner = getattr(_local, 'cleaner', None)
+    if cleaner is None:
+        cleaner = _local.cleaner = bleach.Cleaner(tags=[], strip=True)
+    return cleaner
+
+@lru_cache(maxsize=SANITIZE_CACHE_SIZE)
+def _clean_markup(text: str) -> str:
+    # bleach returns HTML ("AT&T" -> "AT&amp;T"), but the text is stored and rendered as
+    # plain text, so entities are decoded again. Repeat until stable so an encoded tag
+    # ("&lt;script&gt;") is stripped too instead of decoding into markup.
+    cleaner = _cleaner()
+    for _ in range(SANITIZE_MAX_ROUNDS):
+        cleaned = html.unescape(cleaner.clean(text))
+        if cleaned == text:
+            return cleaned
+        text = cleaned
+    return cleaner.clean(text)
+
+def sanitize_input(text: str) -> str:
+    """Strip HTML tags from text input to prevent XSS attacks, leaving plain text as typed"""
+    if not text:
+        return text
+    # Without '<' or '&' there is no tag or entity to strip
+    if '<' not in text and '&' not in text:
+        return text
+    return _clean_markup(text)
+
+# Text fields sanitized during model validation
+SanitizedStr = Annotated[str, AfterValidator(sanitize_input)]
+
+def password_error(password: str, min_length: int = PASSWORD_MIN_LENGTH) -> Optional[str]:
+    """First password policy violation, checked in a single pass"""
+    if len(password) < min_length:
+        return f"Password must be at least {min_length} characters long"
+    has_upper = has_lower = has_digit = False
+    for ch in password:
+        if 'A' <= ch <= 'Z':
+            has_upper = True
+        elif 'a' <= ch <= 'z':
+            has_lower = True
+        elif '0' <= ch <= '9':
+            has_digit = True
+        else:
+            continue
+        if has_upper and has_lower and has_digit:
+            return None
+    if not has_upper:
+        return "Password must contain at least one uppercase letter"
+    if not has_lower:
+        return "Password must contain at least one lowercase letter"
+    return "Password must contain at least one number"
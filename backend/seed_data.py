@@ -6,6 +6,9 @@ import bcrypt
 from dotenv import load_dotenv
 from pathlib import Path
 
+from drive_search import package_fields
+from eligibility import skill_keys
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
@@ -112,6 +115,7 @@ async def seed_database():
             'batch': student_data['batch'],
             'cgpa': student_data['cgpa'],
             'skills': student_data['skills'],
+            'skill_keys': skill_keys(student_data['skills']),
             'resume_url': None
         }
         await db.student_profiles.insert_one(profile)
@@ -210,6 +214,8 @@ async def seed_database():
         drive = {
             'id': drive_id,
             **drive_data,
+            **package_fields(drive_data['package']),
+            'required_skill_keys': skill_keys(drive_data['eligibility']['required_skills']),
             'created_at': datetime.now(timezone.utc).isoformat()
         }
         await db.placement_drives.insert_one(drive)
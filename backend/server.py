@@ -1,33 +1,87 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, UploadFile, File, Request
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, status, Request, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from fastapi.responses import StreamingResponse
+from fastapi.responses import StreamingResponse, JSONResponse, PlainTextResponse, Response
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
 from contextlib import asynccontextmanager
-from slowapi import Limiter, _rate_limit_exceeded_handler
-from slowapi.util import get_remote_address
-from slowapi.errors import RateLimitExceeded
-import bleach
-import re
+from pymongo.errors import ExecutionTimeout, WaitQueueTimeoutError
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, EmailStr, ConfigDict, validator
-from typing import List, Optional
+from typing import Annotated, Dict, List, Literal, Optional
 from datetime import datetime, timezone, timedelta
 import bcrypt
 import jwt
+import time
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
 import io
 import csv
+from urllib.parse import quote
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = None
-db = None
+from database import pool_stats, warm_up, INDEX_MODE
+from storage import create_storage, STORAGE_BACKEND
+from metrics import (
+    registry, MetricsMiddleware, RESUME_UPLOADS, BCRYPT_QUEUE_DEPTH, BCRYPT_IN_FLIGHT, NOTIFICATION_FANOUT,
+)
+from querydebug import QueryDebugMiddleware, QUERY_DEBUG
+from admission import AdmissionController, AdmissionMiddleware
+from ratelimit import RateLimiter, create_store, client_ip, RATE_LIMIT_STORE
+from sanitization import password_error, SanitizedStr, PASSWORD_MIN_LENGTH
+from eligibility import EligibilityCache, ELIGIBILITY_FIELDS
+from drive_search import package_fields, SEARCH_MAX_PAGE_SIZE
+from lifecycle import DriveLifecycleScheduler, DRIVE_SCHEDULER_ENABLED, is_open, today
+from recommend import RecommendationCache, rank_drives
+from notifications import fan_out, broadcast
+from mailer import SMTPPool
+from digest import DigestMailer, DIGEST_ENABLED
+from shortlisting import rank_applicants, DEFAULT_RANKING_WEIGHTS
+from student_import import StudentImporter, ImportTooLarge, detect_format, fail_stale_jobs, spool_upload
+from cascade import DriveDeletionCascade
+from singleflight import SingleFlight
+from resumes import (
+    spool_resume, resume_filename, parse_range, create_blob_store, ResumeTooLarge, InvalidResume, RESUME_MAX_BYTES,
+)
+from resume_extraction import ResumeSkillExtractor
+from application_status import APPLIED, WITHDRAWN, transition_error, status_event, applied_event
+from snapshots import (
+    SnapshotPropagator, student_snapshot, drive_snapshot, snapshot_changed, has_snapshot,
+    STUDENT_SNAPSHOT_FIELDS, DRIVE_SNAPSHOT_FIELDS,
+)
+
+# Storage backend (Mongo client is created on first use; see STORAGE_BACKEND)
+storage = create_storage()
+
+# Deadline expiry and closing reminders (see lifecycle.py)
+drive_scheduler = DriveLifecycleScheduler(storage)
+
+# Unread notifications mailed as one periodic digest per student (see digest.py)
+digest_mailer = DigestMailer(storage, SMTPPool())
+
+# Cached (student, drive) recommendation scores (see recommend.py)
+recommendation_cache = RecommendationCache()
+# Cached per-student eligibility and compiled drive matchers (see eligibility.py)
+eligibility_cache = EligibilityCache()
+# Batched, resumable removal of a deleted drive's data (see cascade.py)
+drive_cascade = DriveDeletionCascade(storage)
+# Background refresh of the student/drive copies embedded in applications (see snapshots.py)
+snapshot_propagator = SnapshotPropagator(storage)
+# Identical concurrent reads share one query (see singleflight.py)
+drive_list_flight = SingleFlight('drive_list')
+drive_flight = SingleFlight('drive')
+analytics_flight = SingleFlight('analytics')
+# Content-addressed resume files, local or GridFS (see resumes.py)
+resume_store = create_blob_store()
+# Skills parsed from uploaded resumes in a process pool (see resume_extraction.py)
+resume_extractor = ResumeSkillExtractor(storage, resume_store)
+
+# Startup timing
+PROCESS_STARTED_AT = time.perf_counter()
+startup_timings = {'index_mode': INDEX_MODE, 'startup_ms': None, 'first_request_ms': None}
 
 # JWT Configuration
 JWT_SECRET = os.environ.get('JWT_SECRET')
@@ -36,78 +90,83 @@ if not JWT_SECRET or JWT_SECRET == 'your-secret-key-change-in-production':
 JWT_ALGORITHM = 'HS256'
 JWT_EXPIRATION_HOURS = int(os.environ.get('JWT_EXPIRATION_HOURS', 24))
 
-# Password Policy
-PASSWORD_MIN_LENGTH = int(os.environ.get('PASSWORD_MIN_LENGTH', 8))
+# Password hashing pool (bcrypt releases the GIL, so threads run in parallel)
+BCRYPT_WORKERS = int(os.environ.get('BCRYPT_WORKERS', os.cpu_count() or 2))
+bcrypt_executor = ThreadPoolExecutor(max_workers=BCRYPT_WORKERS, thread_name_prefix='bcrypt')
+
+# Metrics endpoint protection (optional bearer token)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
 
-# Rate Limiting
-limiter = Limiter(key_func=get_remote_address)
+# Rate Limiting: token buckets in a shared store (see ratelimit.py for RATE_LIMIT_* settings)
+rate_limiter = RateLimiter(create_store())
 
 # Security
 security = HTTPBearer()
 
-# Input Sanitization
-def sanitize_input(text: str) -> str:
-    """Sanitize text input to prevent XSS attacks"""
-    if not text:
-        return text
-    return bleach.clean(text, tags=[], strip=True)
-
+# Input Sanitization (SanitizedStr model fields are cleaned during validation, see sanitization.py)
 def validate_password(password: str) -> None:
     """Validate password strength"""
-    if len(password) < PASSWORD_MIN_LENGTH:
-        raise HTTPException(
-            status_code=400,
-            detail=f"Password must be at least {PASSWORD_MIN_LENGTH} characters long"
-        )
-    if not re.search(r"[A-Z]", password):
-        raise HTTPException(
-            status_code=400,
-            detail="Password must contain at least one uppercase letter"
-        )
-    if not re.search(r"[a-z]", password):
-        raise HTTPException(
-            status_code=400,
-            detail="Password must contain at least one lowercase letter"
-        )
-    if not re.search(r"[0-9]", password):
-        raise HTTPException(
-            status_code=400,
-            detail="Password must contain at least one number"
-        )
+    error = password_error(password, PASSWORD_MIN_LENGTH)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Connect to MongoDB
-    global client, db
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ['DB_NAME']]
-    print(f"✓ Connected to MongoDB: {os.environ['DB_NAME']}")
-    
-    # Create database indexes for performance
-    await db.users.create_index("email", unique=True)
-    await db.users.create_index("id")
-    await db.student_profiles.create_index("user_id", unique=True)
-    await db.student_profiles.create_index("email")
-    await db.placement_drives.create_index("id", unique=True)
-    await db.placement_drives.create_index("deadline")
-    await db.placement_drives.create_index("status")
-    await db.applications.create_index("id", unique=True)
-    await db.applications.create_index("student_id")
-    await db.applications.create_index("drive_id")
-    await db.applications.create_index("status")
-    await db.applications.create_index("applied_at")
-    await db.notifications.create_index("user_id")
-    await db.notifications.create_index("created_at")
-    print("✓ Database indexes created")
+    # Startup: verify indexes against the manifest (see database.INDEXES)
+    started = time.perf_counter()
+    if STORAGE_BACKEND == 'mongo':
+        await warm_up()
+    missing = await storage.prepare()
+    startup_timings['startup_ms'] = round((time.perf_counter() - started) * 1000, 1)
+    print(f"✓ Connected to {STORAGE_BACKEND} storage: {os.environ['DB_NAME']}")
+    print(f"✓ Index check ({INDEX_MODE}) finished in {startup_timings['startup_ms']} ms"
+          + (f", missing: {missing}" if missing else ""))
+    if DRIVE_SCHEDULER_ENABLED:
+        drive_scheduler.start()
+        print(f"✓ Drive lifecycle scheduler running every {drive_scheduler.interval}s")
+    if DIGEST_ENABLED:
+        digest_mailer.start()
+        print(f"✓ Notification digests every {digest_mailer.interval}s via {digest_mailer.pool.host}")
+    print(f"✓ Rate limiting {'enabled' if rate_limiter.enabled else 'disabled'} ({RATE_LIMIT_STORE} store)")
+    resumed = await drive_cascade.resume()
+    if resumed:
+        print(f"✓ Resumed {resumed} drive deletion cascades")
+    pending_extractions = await resume_extractor.resume()
+    if pending_extractions:
+        print(f"✓ Resumed {pending_extractions} resume skill extractions")
+    stale_imports = await fail_stale_jobs(storage)
+    if stale_imports:
+        print(f"✓ Marked {stale_imports} interrupted student imports as failed")
     
     yield
-    # Shutdown: Close MongoDB connection
-    client.close()
+    # Shutdown: Stop the scheduler and close MongoDB connection
+    await drive_scheduler.stop()
+    await digest_mailer.stop()
+    await drive_cascade.stop()
+    await resume_extractor.stop()
+    await snapshot_propagator.drain()
+    await rate_limiter.store.close()
+    storage.close()
     print("✓ MongoDB connection closed")
 
 app = FastAPI(lifespan=lifespan)
-app.state.limiter = limiter
-app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
+
+@app.exception_handler(ExecutionTimeout)
+async def query_timeout_handler(request: Request, exc: ExecutionTimeout):
+    return JSONResponse(status_code=503, content={'detail': 'Query exceeded its time budget'})
+
+@app.exception_handler(WaitQueueTimeoutError)
+async def pool_timeout_handler(request: Request, exc: WaitQueueTimeoutError):
+    return JSONResponse(status_code=503, content={'detail': 'Database connection pool exhausted'})
+
+@app.middleware('http')
+async def record_first_request(request: Request, call_next):
+    response = await call_next(request)
+    if startup_timings['first_request_ms'] is None:
+        startup_timings['first_request_ms'] = round((time.perf_counter() - PROCESS_STARTED_AT) * 1000, 1)
+        logging.getLogger(__name__).info(f"Time to first request: {startup_timings['first_request_ms']} ms")
+    return response
+
 api_router = APIRouter(prefix="/api")
 
 # ============ Models ============
@@ -116,7 +175,7 @@ class UserRegister(BaseModel):
     email: EmailStr
     password: str
     role: str  # 'admin' or 'student'
-    name: str
+    name: SanitizedStr
 
 class UserLogin(BaseModel):
     email: EmailStr
@@ -129,6 +188,13 @@ class TokenResponse(BaseModel):
     name: str
     refresh_token: Optional[str] = None
 
+class ResumeInfo(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+    sha256: str
+    uploaded_at: str
+
 class StudentProfile(BaseModel):
     name: str
     email: str
@@ -136,39 +202,41 @@ class StudentProfile(BaseModel):
     batch: int
     cgpa: float
     skills: List[str]
-    resume_url: Optional[str] = None
+    resume_url: Optional[str] = None  # download URL of the uploaded resume
+    resume: Optional[ResumeInfo] = None
+    resume_skills: Optional[List[str]] = None  # canonical skills found in the resume (None until extracted)
 
 class StudentProfileUpdate(BaseModel):
-    name: Optional[str] = None
-    department: Optional[str] = None
+    name: Optional[SanitizedStr] = None
+    department: Optional[SanitizedStr] = None
     batch: Optional[int] = None
     cgpa: Optional[float] = None
-    skills: Optional[List[str]] = None
+    skills: Optional[List[SanitizedStr]] = None
 
 class EligibilityCriteria(BaseModel):
     min_cgpa: float
-    required_skills: List[str]
-    departments: List[str]
+    required_skills: List[SanitizedStr]
+    departments: List[SanitizedStr]
     batches: List[int]
 
 class PlacementDriveCreate(BaseModel):
-    company_name: str
-    company_domain: str
-    job_role: str
-    package: str
-    location: str
-    job_description: str
+    company_name: SanitizedStr
+    company_domain: SanitizedStr
+    job_role: SanitizedStr
+    package: SanitizedStr
+    location: SanitizedStr
+    job_description: SanitizedStr
     eligibility: EligibilityCriteria
     deadline: str
     status: str = 'active'
 
 class PlacementDriveUpdate(BaseModel):
-    company_name: Optional[str] = None
-    company_domain: Optional[str] = None
-    job_role: Optional[str] = None
-    package: Optional[str] = None
-    location: Optional[str] = None
-    job_description: Optional[str] = None
+    company_name: Optional[SanitizedStr] = None
+    company_domain: Optional[SanitizedStr] = None
+    job_role: Optional[SanitizedStr] = None
+    package: Optional[SanitizedStr] = None
+    location: Optional[SanitizedStr] = None
+    job_description: Optional[SanitizedStr] = None
     eligibility: Optional[EligibilityCriteria] = None
     deadline: Optional[str] = None
     status: Optional[str] = None
@@ -186,12 +254,26 @@ class PlacementDriveResponse(BaseModel):
     deadline: str
     status: str
     created_at: str
+    package_min: Optional[float] = None  # LPA, parsed from package
+    package_max: Optional[float] = None
+    package_band: Optional[str] = None
+
+class RecommendedDriveResponse(PlacementDriveResponse):
+    score: float
+    score_breakdown: Dict[str, float]  # 'skills', 'cgpa', 'urgency' in [0, 1]
+
+class DriveSearchResponse(BaseModel):
+    items: List[PlacementDriveResponse]
+    total: int
+    page: int
+    page_size: int
+    facets: Dict[str, Dict[str, int]]  # facet -> {value: count}
 
 class ApplicationCreate(BaseModel):
     drive_id: str
 
 class ApplicationStatusUpdate(BaseModel):
-    status: str  # 'applied', 'shortlisted', 'interview', 'selected', 'rejected'
+    status: Literal['applied', 'shortlisted', 'interview', 'waitlisted', 'selected', 'rejected']
 
 class ApplicationResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -207,6 +289,32 @@ class ApplicationResponse(BaseModel):
     company_name: Optional[str] = None
     job_role: Optional[str] = None
 
+class ApplicationEventResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    from_status: Optional[str] = None
+    to_status: str
+    at: str
+    duration_seconds: Optional[float] = None  # time spent in from_status
+    actor: Optional[str] = None
+
+class RankedApplicationResponse(ApplicationResponse):
+    score: float
+    score_breakdown: Dict[str, float]  # 'cgpa', 'skills', 'department' in [0, 1]
+
+class RankingWeights(BaseModel):
+    cgpa: float = Field(DEFAULT_RANKING_WEIGHTS['cgpa'], ge=0)
+    skills: float = Field(DEFAULT_RANKING_WEIGHTS['skills'], ge=0)
+    department: float = Field(DEFAULT_RANKING_WEIGHTS['department'], ge=0)
+
+class ShortlistRequest(BaseModel):
+    top_k: int = Field(gt=0)
+    weights: RankingWeights = RankingWeights()
+
+class ShortlistResponse(BaseModel):
+    shortlisted: int
+    application_ids: List[str]
+    cutoff_score: Optional[float] = None
+
 class NotificationResponse(BaseModel):
     model_config = ConfigDict(extra="ignore")
     id: str
@@ -215,6 +323,35 @@ class NotificationResponse(BaseModel):
     read: bool
     created_at: str
 
+class BroadcastAudience(BaseModel):
+    # Each field given narrows the audience; none given is every student
+    departments: List[SanitizedStr] = []
+    batches: List[int] = []
+    min_cgpa: Optional[float] = Field(None, ge=0, le=10)
+    skills: List[SanitizedStr] = []
+
+class BroadcastRequest(BaseModel):
+    message: SanitizedStr = Field(min_length=1, max_length=500)
+    audience: BroadcastAudience = BroadcastAudience()
+
+class BroadcastResponse(BaseModel):
+    broadcast_id: str
+    recipients: int
+
+class ImportJobResponse(BaseModel):
+    model_config = ConfigDict(extra="ignore")
+    id: str
+    status: str  # 'queued', 'running', 'completed', 'failed'
+    format: str
+    bytes: int
+    processed: int = 0
+    created: int = 0
+    failed: int = 0
+    errors: List[dict] = []
+    error: Optional[str] = None  # why a failed job stopped
+    created_at: str
+    finished_at: Optional[str] = None
+
 class AnalyticsResponse(BaseModel):
     total_drives: int
     active_drives: int
@@ -222,6 +359,28 @@ class AnalyticsResponse(BaseModel):
     total_students: int
     department_stats: dict
     status_stats: dict
+    package_band_stats: dict
+
+class ApplicationFunnelResponse(BaseModel):
+    drive_id: Optional[str] = None
+    funnel: Dict[str, int]  # status -> applications that reached it
+    time_in_stage: Dict[str, dict]  # status -> {'transitions', 'avg_hours', 'max_hours'}
+
+class DashboardDriveResponse(PlacementDriveResponse):
+    applied: bool = False
+
+class StudentDashboardResponse(BaseModel):
+    profile: Optional[StudentProfile] = None
+    drives: List[DashboardDriveResponse]
+    applications: List[ApplicationResponse]
+
+class AdminDashboardResponse(BaseModel):
+    drives: List[PlacementDriveResponse]
+    applications: List[ApplicationResponse]
+
+class AdminDriveDashboardResponse(BaseModel):
+    drive: PlacementDriveResponse
+    applications: List[ApplicationResponse]
 
 # ============ Helper Functions ============
 
@@ -231,6 +390,26 @@ def hash_password(password: str) -> str:
 def verify_password(password: str, hashed: str) -> bool:
     return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
 
+async def run_in_bcrypt_pool(fn, *args):
+    """Run a bcrypt call on the hashing pool, tracking queue depth"""
+    BCRYPT_QUEUE_DEPTH.inc()
+
+    def job():
+        BCRYPT_QUEUE_DEPTH.dec()
+        BCRYPT_IN_FLIGHT.inc()
+        try:
+            return fn(*args)
+        finally:
+            BCRYPT_IN_FLIGHT.dec()
+
+    return await asyncio.get_running_loop().run_in_executor(bcrypt_executor, job)
+
+async def hash_password_async(password: str) -> str:
+    return await run_in_bcrypt_pool(hash_password, password)
+
+async def verify_password_async(password: str, hashed: str) -> bool:
+    return await run_in_bcrypt_pool(verify_password, password, hashed)
+
 def create_token(user_id: str, role: str, token_type: str = 'access') -> str:
     """Create JWT token (access or refresh)"""
     if token_type == 'refresh':
@@ -259,11 +438,14 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
         role = payload.get('role')
         if not user_id:
             raise HTTPException(status_code=401, detail='Invalid token')
-        return {'user_id': user_id, 'role': role}
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail='Token expired')
     except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail='Invalid token')
+    
+    # Per-user bucket, so users behind one NAT do not share a limit
+    await rate_limiter.enforce('user', user_id)
+    return {'user_id': user_id, 'role': role}
 
 async def require_admin(current_user: dict = Depends(get_current_user)):
     if current_user['role'] != 'admin':
@@ -275,42 +457,20 @@ async def require_student(current_user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=403, detail='Student access required')
     return current_user
 
-def check_eligibility(profile: dict, criteria: dict) -> bool:
-    # Check CGPA
-    if profile['cgpa'] < criteria['min_cgpa']:
-        return False
-    
-    # Check department
-    if profile['department'] not in criteria['departments']:
-        return False
-    
-    # Check batch
-    if profile['batch'] not in criteria['batches']:
-        return False
-    
-    # Check skills (at least one match)
-    if criteria['required_skills']:
-        student_skills = [s.lower() for s in profile['skills']]
-        required_skills = [s.lower() for s in criteria['required_skills']]
-        if not any(skill in student_skills for skill in required_skills):
-            return False
-    
-    return True
-
 # ============ Auth Routes ============
 
 @api_router.post('/auth/register', response_model=TokenResponse)
-@limiter.limit("5/hour")
 async def register(request: Request, user: UserRegister):
+    await rate_limiter.enforce('register', client_ip(request))
+    
     # Validate password strength
     validate_password(user.password)
     
-    # Sanitize inputs
-    user.name = sanitize_input(user.name)
+    # Name is sanitized by the model (SanitizedStr)
     user.email = user.email.lower().strip()
     
     # Check if user exists
-    existing = await db.users.find_one({'email': user.email}, {'_id': 0})
+    existing = await storage.users.get_by_email(user.email)
     if existing:
         raise HTTPException(status_code=400, detail='Email already registered')
     
@@ -319,12 +479,12 @@ async def register(request: Request, user: UserRegister):
     user_doc = {
         'id': user_id,
         'email': user.email,
-        'password_hash': hash_password(user.password),
+        'password_hash': await hash_password_async(user.password),
         'role': user.role,
         'name': user.name,
         'created_at': datetime.now(timezone.utc).isoformat()
     }
-    await db.users.insert_one(user_doc)
+    await storage.users.insert(user_doc)
     
     # Create student profile if role is student
     if user.role == 'student':
@@ -339,18 +499,20 @@ async def register(request: Request, user: UserRegister):
             'skills': [],
             'resume_url': None
         }
-        await db.student_profiles.insert_one(profile_doc)
+        await storage.profiles.insert(profile_doc)
     
     token = create_token(user_id, user.role)
     refresh_token = create_token(user_id, user.role, 'refresh')
     return TokenResponse(token=token, role=user.role, user_id=user_id, name=user.name, refresh_token=refresh_token)
 
 @api_router.post('/auth/login', response_model=TokenResponse)
-@limiter.limit("10/minute")
 async def login(request: Request, credentials: UserLogin):
     credentials.email = credentials.email.lower().strip()
-    user = await db.users.find_one({'email': credentials.email}, {'_id': 0})
-    if not user or not verify_password(credentials.password, user['password_hash']):
+    # Tight per-account limit against guessing, loose per-IP limit for shared campus NATs
+    await rate_limiter.enforce('login', f"{client_ip(request)}:{credentials.email}")
+    await rate_limiter.enforce('login_ip', client_ip(request))
+    user = await storage.users.get_by_email(credentials.email)
+    if not user or not await verify_password_async(credentials.password, user['password_hash']):
         raise HTTPException(status_code=401, detail='Invalid credentials')
     
     token = create_token(user['id'], user['role'])
@@ -361,9 +523,9 @@ class RefreshTokenRequest(BaseModel):
     refresh_token: str
 
 @api_router.post('/auth/refresh', response_model=TokenResponse)
-@limiter.limit("20/minute")
 async def refresh_token(request: Request, data: RefreshTokenRequest):
     """Refresh access token using refresh token"""
+    await rate_limiter.enforce('refresh', client_ip(request))
     try:
         payload = jwt.decode(data.refresh_token, JWT_SECRET, algorithms=[JWT_ALGORITHM])
         
@@ -378,7 +540,7 @@ async def refresh_token(request: Request, data: RefreshTokenRequest):
             raise HTTPException(status_code=401, detail='Invalid token')
         
         # Verify user still exists
-        user = await db.users.find_one({'id': user_id}, {'_id': 0})
+        user = await storage.users.get(user_id)
         if not user:
             raise HTTPException(status_code=401, detail='User not found')
         
@@ -402,7 +564,7 @@ async def refresh_token(request: Request, data: RefreshTokenRequest):
 
 @api_router.get('/profile', response_model=StudentProfile)
 async def get_profile(current_user: dict = Depends(require_student)):
-    profile = await db.student_profiles.find_one({'user_id': current_user['user_id']}, {'_id': 0})
+    profile = await storage.profiles.get_by_user(current_user['user_id'])
     if not profile:
         raise HTTPException(status_code=404, detail='Profile not found')
     return StudentProfile(**profile)
@@ -413,14 +575,203 @@ async def update_profile(updates: StudentProfileUpdate, current_user: dict = Dep
     if not update_data:
         raise HTTPException(status_code=400, detail='No updates provided')
     
-    await db.student_profiles.update_one(
-        {'user_id': current_user['user_id']},
-        {'$set': update_data}
-    )
+    previous = await storage.profiles.get_by_user(current_user['user_id'])
+    if not previous:
+        raise HTTPException(status_code=404, detail='Profile not found')
+    profile = await storage.profiles.update(current_user['user_id'], update_data)
+    if not profile:
+        raise HTTPException(status_code=404, detail='Profile not found')
+    recommendation_cache.invalidate_student(current_user['user_id'])
+    if snapshot_changed(previous, profile, STUDENT_SNAPSHOT_FIELDS):
+        snapshot_propagator.student_changed(current_user['user_id'])
     
-    profile = await db.student_profiles.find_one({'user_id': current_user['user_id']}, {'_id': 0})
+    # Re-check only open drives whose outcome the changed fields can flip
+    if any(previous.get(f) != profile.get(f) for f in ELIGIBILITY_FIELDS):
+        await notify_newly_eligible(previous, profile)
     return StudentProfile(**profile)
 
+async def notify_newly_eligible(previous: dict, profile: dict) -> None:
+    drives = await storage.drives.list_all(open_on=today())
+    gained, _ = eligibility_cache.apply_profile_change(previous, profile, drives)
+    if not gained:
+        return
+    applied = {a['drive_id'] for a in await storage.applications.list_by_student(profile['user_id'])}
+    now = datetime.now(timezone.utc)
+    notifications = [{
+        'id': f"notif_{now.timestamp()}_{drive['id']}_{profile['user_id']}",
+        'user_id': profile['user_id'],
+        'drive_id': drive['id'],
+        'message': f"You are now eligible for: {drive['company_name']} - {drive['job_role']}",
+        'read': False,
+        'created_at': now.isoformat()
+    } for drive in gained if drive['id'] not in applied]
+    await fan_out(storage, notifications, source='profile_update')
+
+# ============ Student Import Routes ============
+
+# Running imports, referenced so the tasks are not garbage collected mid-run
+import_tasks = set()
+
+@api_router.post('/students/import', response_model=ImportJobResponse, status_code=202)
+async def import_students(request: Request, format: Optional[str] = None, current_user: dict = Depends(require_admin)):
+    """Bulk-create students from a raw CSV or NDJSON request body
+
+    Columns/keys: email, name, password, department, batch, cgpa, skills
+    (';' separated in CSV). Rows are processed in the background; poll
+    GET /students/import/{job_id} for progress and per-row errors.
+    """
+    fmt = detect_format(request.headers.get('content-type'), format)
+    if not fmt:
+        raise HTTPException(status_code=415, detail='Upload must be text/csv or application/x-ndjson')
+    try:
+        path, size = await spool_upload(request.stream())
+    except ImportTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    job = {
+        'id': f"import_{datetime.now(timezone.utc).timestamp()}",
+        'status': 'queued',
+        'format': fmt,
+        'bytes': size,
+        'processed': 0,
+        'created': 0,
+        'failed': 0,
+        'errors': [],
+        'created_by': current_user['user_id'],
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'updated_at': datetime.now(timezone.utc).isoformat(),
+        'finished_at': None
+    }
+    await storage.import_jobs.insert(job)
+
+    importer = StudentImporter(storage, job['id'], hash_password_async)
+    task = asyncio.create_task(importer.run(path, fmt))
+    import_tasks.add(task)
+    task.add_done_callback(import_tasks.discard)
+    return ImportJobResponse(**job)
+
+@api_router.get('/students/import/{job_id}', response_model=ImportJobResponse)
+async def get_import_job(job_id: str, current_user: dict = Depends(require_admin)):
+    job = await storage.import_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail='Import job not found')
+    if job['status'] in ('queued', 'running') and await fail_stale_jobs(storage):
+        # Its worker stopped after this instance started, so the startup check missed it
+        job = await storage.import_jobs.get(job_id)
+    return ImportJobResponse(**job)
+
+# ============ Resume Routes ============
+
+@api_router.put('/profile/resume', response_model=StudentProfile)
+async def upload_resume(
+    request: Request,
+    filename: Annotated[Optional[str], Query(max_length=255)] = None,
+    current_user: dict = Depends(require_student),
+):
+    """Upload the student's resume as the raw request body (PDF, DOC or DOCX), replacing any previous one"""
+    declared = request.headers.get('content-length')
+    if declared and declared.isdigit() and int(declared) > RESUME_MAX_BYTES:
+        RESUME_UPLOADS.inc(result='too_large')
+        raise HTTPException(status_code=413, detail=f"Resume exceeds {RESUME_MAX_BYTES} bytes")
+    profile = await storage.profiles.get_by_user(current_user['user_id'])
+    if not profile:
+        raise HTTPException(status_code=404, detail='Profile not found')
+
+    content_type = (request.headers.get('content-type') or '').split(';')[0].strip().lower()
+    try:
+        spooled = await spool_resume(request.stream(), content_type, directory=resume_store.spool_dir)
+    except ResumeTooLarge as e:
+        RESUME_UPLOADS.inc(result='too_large')
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidResume as e:
+        RESUME_UPLOADS.inc(result='invalid')
+        raise HTTPException(status_code=415, detail=str(e))
+
+    resume = {
+        'filename': resume_filename(filename, content_type),
+        'content_type': content_type,
+        'size': spooled.size,
+        'sha256': spooled.sha256,
+        'uploaded_at': datetime.now(timezone.utc).isoformat()
+    }
+    # Reference the blob before storing it, so a concurrent release of the same
+    # content either sees this profile or is followed by our put() (see resumes.py)
+    try:
+        updated = await storage.profiles.update(current_user['user_id'], {
+            'resume': resume,
+            'resume_url': f"/api/students/{current_user['user_id']}/resume",
+            'resume_skills': None,
+        })
+    except Exception:
+        os.unlink(spooled.path)
+        raise
+    try:
+        stored = await resume_store.put(spooled.sha256, spooled.path)
+    except Exception:
+        await storage.profiles.update(current_user['user_id'], {
+            field: profile.get(field) for field in ('resume', 'resume_url', 'resume_skills')})
+        raise
+    RESUME_UPLOADS.inc(result='stored' if stored else 'deduplicated')
+    resume_extractor.submit(current_user['user_id'], resume)
+    previous = profile.get('resume')
+    if previous and previous['sha256'] != spooled.sha256:
+        await release_resume(previous['sha256'])
+    return StudentProfile(**updated)
+
+@api_router.delete('/profile/resume', response_model=StudentProfile)
+async def delete_resume(current_user: dict = Depends(require_student)):
+    profile = await storage.profiles.get_by_user(current_user['user_id'])
+    if not profile or not profile.get('resume'):
+        raise HTTPException(status_code=404, detail='Resume not found')
+    updated = await storage.profiles.update(
+        current_user['user_id'], {'resume': None, 'resume_url': None, 'resume_skills': None})
+    await release_resume(profile['resume']['sha256'])
+    return StudentProfile(**updated)
+
+async def release_resume(sha256: str) -> None:
+    """Delete a resume file once no profile references it (identical uploads share one file)"""
+    async def in_use() -> bool:
+        return await storage.profiles.count_by_resume(sha256) > 0
+    await resume_store.delete_unused(sha256, in_use)
+
+@api_router.get('/students/{user_id}/resume')
+async def download_resume(user_id: str, request: Request, current_user: dict = Depends(get_current_user)):
+    """Stream a student's resume to admins or the student; honours a single byte Range and If-None-Match"""
+    if current_user['role'] != 'admin' and current_user['user_id'] != user_id:
+        raise HTTPException(status_code=403, detail='Not allowed to view this resume')
+    profile = await storage.profiles.get_by_user(user_id)
+    resume = profile.get('resume') if profile else None
+    if not resume or not await resume_store.exists(resume['sha256']):
+        raise HTTPException(status_code=404, detail='Resume not found')
+
+    size = resume['size']
+    headers = {
+        'Accept-Ranges': 'bytes',
+        'ETag': f'"{resume["sha256"]}"',
+        'Cache-Control': 'private, no-cache',
+        'Content-Disposition': f"inline; filename*=UTF-8''{quote(resume['filename'])}",
+    }
+    if request.headers.get('if-none-match') == headers['ETag']:
+        return Response(status_code=304, headers=headers)
+    try:
+        byte_range = parse_range(request.headers.get('range'), size)
+    except ValueError:
+        return Response(status_code=416, headers={'Content-Range': f'bytes */{size}'})
+
+    status_code = 200
+    start, end = 0, size - 1
+    if byte_range:
+        status_code = 206
+        start, end = byte_range
+        headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    headers['Content-Length'] = str(end - start + 1)
+    return StreamingResponse(
+        resume_store.read(resume['sha256'], start, end),
+        status_code=status_code,
+        media_type=resume['content_type'],
+        headers=headers,
+    )
+
 # ============ Placement Drive Routes ============
 
 @api_router.post('/drives', response_model=PlacementDriveResponse)
@@ -429,13 +780,13 @@ async def create_drive(drive: PlacementDriveCreate, current_user: dict = Depends
     drive_doc = {
         'id': drive_id,
         **drive.model_dump(),
+        **package_fields(drive.package),
         'created_at': datetime.now(timezone.utc).isoformat()
     }
-    await db.placement_drives.insert_one(drive_doc)
+    await storage.drives.insert(drive_doc)
     
     # Create notifications for eligible students
-    students = await db.student_profiles.find({}, {'_id': 0}).to_list(None)
-    eligible_students = [s for s in students if check_eligibility(s, drive.eligibility.model_dump())]
+    eligible_students = await storage.profiles.list_eligible(drive.eligibility.model_dump())
     
     notifications = []
     for student in eligible_students:
@@ -443,31 +794,100 @@ async def create_drive(drive: PlacementDriveCreate, current_user: dict = Depends
         notifications.append({
             'id': notif_id,
             'user_id': student['user_id'],
+            'drive_id': drive_doc['id'],
             'message': f"New placement drive: {drive.company_name} - {drive.job_role}",
             'read': False,
             'created_at': datetime.now(timezone.utc).isoformat()
         })
     
-    if notifications:
-        await db.notifications.insert_many(notifications)
+    await fan_out(storage, notifications, source='drive_created')
     
     return PlacementDriveResponse(**drive_doc)
 
+async def list_drives(min_package: Optional[float] = None, max_package: Optional[float] = None,
+                      open_on: Optional[str] = None) -> List[dict]:
+    """storage.drives.list_all, coalesced across concurrent requests (the result is shared: do not mutate)"""
+    return await drive_list_flight.do(
+        (min_package, max_package, open_on),
+        lambda: storage.drives.list_all(min_package=min_package, max_package=max_package, open_on=open_on),
+    )
+
 @api_router.get('/drives', response_model=List[PlacementDriveResponse])
-async def get_drives(current_user: dict = Depends(get_current_user)):
-    drives = await db.placement_drives.find({}, {'_id': 0}).to_list(None)
+async def get_drives(
+    min_package: Annotated[Optional[float], Query(ge=0)] = None,
+    max_package: Annotated[Optional[float], Query(ge=0)] = None,
+    current_user: dict = Depends(get_current_user),
+):
+    # Students only see drives that are still open
+    open_on = today() if current_user['role'] == 'student' else None
+    drives = await list_drives(min_package=min_package, max_package=max_package, open_on=open_on)
     
     # Filter by eligibility for students
     if current_user['role'] == 'student':
-        profile = await db.student_profiles.find_one({'user_id': current_user['user_id']}, {'_id': 0})
+        profile = await storage.profiles.get_by_user(current_user['user_id'])
         if profile:
-            drives = [d for d in drives if check_eligibility(profile, d['eligibility'])]
+            drives = eligibility_cache.eligible(profile, drives)
     
     return [PlacementDriveResponse(**d) for d in drives]
 
+@api_router.post('/drives/lifecycle/run')
+async def run_drive_lifecycle(current_user: dict = Depends(require_admin)):
+    """Close expired drives and send closing reminders now (for cron-driven deployments)"""
+    return await drive_scheduler.run_once()
+
+@api_router.get('/drives/recommended', response_model=List[RecommendedDriveResponse])
+async def get_recommended_drives(
+    limit: Annotated[int, Query(ge=1, le=SEARCH_MAX_PAGE_SIZE)] = 10,
+    current_user: dict = Depends(require_student),
+):
+    """Open drives the student is eligible for, best match first"""
+    profile = await storage.profiles.get_by_user(current_user['user_id'])
+    if not profile:
+        raise HTTPException(status_code=404, detail='Profile not found')
+    
+    drives = await list_drives(open_on=today())
+    eligible = eligibility_cache.eligible(profile, drives)
+    ranked = rank_drives(profile, eligible, recommendation_cache, datetime.now(timezone.utc).date(), limit)
+    return [RecommendedDriveResponse(**d) for d in ranked]
+
+@api_router.get('/drives/search', response_model=DriveSearchResponse)
+async def search_drives(
+    q: Optional[str] = None,
+    domain: Optional[str] = None,
+    location: Optional[str] = None,
+    package_band: Optional[str] = None,
+    status: Optional[str] = None,
+    min_package: Annotated[Optional[float], Query(ge=0)] = None,
+    max_package: Annotated[Optional[float], Query(ge=0)] = None,
+    sort: Literal['relevance', 'deadline', 'package'] = 'relevance',
+    page: Annotated[int, Query(ge=1)] = 1,
+    page_size: Annotated[int, Query(ge=1, le=SEARCH_MAX_PAGE_SIZE)] = 20,
+    current_user: dict = Depends(get_current_user),
+):
+    """Full-text drive search with facet counts; students only see drives they are eligible for"""
+    filters = {'company_domain': domain, 'location': location, 'package_band': package_band, 'status': status}
+    filters = {field: value for field, value in filters.items() if value}
+    profile = open_on = None
+    if current_user['role'] == 'student':
+        profile = await storage.profiles.get_by_user(current_user['user_id'])
+        open_on = today()
+
+    result = await storage.drives.search(
+        text=(q or '').strip() or None, filters=filters, profile=profile, sort=sort,
+        skip=(page - 1) * page_size, limit=page_size,
+        min_package=min_package, max_package=max_package, open_on=open_on,
+    )
+    return DriveSearchResponse(
+        items=[PlacementDriveResponse(**d) for d in result['items']],
+        total=result['total'],
+        page=page,
+        page_size=page_size,
+        facets=result['facets'],
+    )
+
 @api_router.get('/drives/{drive_id}', response_model=PlacementDriveResponse)
 async def get_drive(drive_id: str, current_user: dict = Depends(get_current_user)):
-    drive = await db.placement_drives.find_one({'id': drive_id}, {'_id': 0})
+    drive = await drive_flight.do(drive_id, lambda: storage.drives.get(drive_id))
     if not drive:
         raise HTTPException(status_code=404, detail='Drive not found')
     return PlacementDriveResponse(**drive)
@@ -477,189 +897,290 @@ async def update_drive(drive_id: str, updates: PlacementDriveUpdate, current_use
     update_data = {k: v for k, v in updates.model_dump().items() if v is not None}
     if not update_data:
         raise HTTPException(status_code=400, detail='No updates provided')
+    if 'package' in update_data:
+        update_data.update(package_fields(update_data['package']))
     
-    result = await db.placement_drives.update_one(
-        {'id': drive_id},
-        {'$set': update_data}
-    )
-    
-    if result.matched_count == 0:
+    drive = await storage.drives.update(drive_id, update_data)
+    if not drive:
         raise HTTPException(status_code=404, detail='Drive not found')
-    
-    drive = await db.placement_drives.find_one({'id': drive_id}, {'_id': 0})
+    recommendation_cache.invalidate_drive(drive_id)
+    if any(field in update_data for field in DRIVE_SNAPSHOT_FIELDS.values()):
+        snapshot_propagator.drive_changed(drive_id)
     return PlacementDriveResponse(**drive)
 
-@api_router.delete('/drives/{drive_id}')
+@api_router.delete('/drives/{drive_id}', status_code=202)
 async def delete_drive(drive_id: str, current_user: dict = Depends(require_admin)):
-    result = await db.placement_drives.delete_one({'id': drive_id})
-    if result.deleted_count == 0:
+    """Hide the drive now; its applications, events and notifications are removed in the background"""
+    if not await storage.drives.soft_delete(drive_id, datetime.now(timezone.utc).isoformat()):
         raise HTTPException(status_code=404, detail='Drive not found')
+    recommendation_cache.invalidate_drive(drive_id)
+    eligibility_cache.forget_drive(drive_id)
     
-    # Delete associated applications
-    await db.applications.delete_many({'drive_id': drive_id})
-    
-    return {'message': 'Drive deleted successfully'}
+    drive_cascade.start(drive_id)
+    return {'message': 'Drive deleted successfully', 'drive_id': drive_id}
+
+@api_router.post('/drives/cascade/run')
+async def run_drive_cascades(current_user: dict = Depends(require_admin)):
+    """Finish pending drive deletion cascades now (for cron-driven deployments)"""
+    finished = await drive_cascade.run_pending()
+    return {'drives': len(finished), 'deleted': finished}
 
 # ============ Application Routes ============
 
+async def without_deleted_drives(apps: List[dict]) -> List[dict]:
+    """Hide applications to drives that are deleted but whose cascade has not removed them yet"""
+    if not apps:
+        return apps
+    deleted = {drive['id'] for drive in await storage.drives.list_deleted()}
+    return [app for app in apps if app['drive_id'] not in deleted] if deleted else apps
+
+async def with_snapshots(apps: List[dict], budget: str = 'default') -> List[dict]:
+    """Applications carry their own student/drive snapshot; only older documents need a lookup"""
+    legacy = [app for app in apps if not has_snapshot(app)]
+    if legacy:
+        drives, profiles = await asyncio.gather(
+            storage.drives.get_many((app['drive_id'] for app in legacy), budget=budget),
+            storage.profiles.get_many_by_user((app['student_id'] for app in legacy), budget=budget),
+        )
+        for app in legacy:
+            if app['drive_id'] in drives:
+                app.update(drive_snapshot(drives[app['drive_id']]))
+            if app['student_id'] in profiles:
+                app.update(student_snapshot(profiles[app['student_id']]))
+    return apps
+
 @api_router.post('/applications', response_model=ApplicationResponse)
 async def apply_to_drive(application: ApplicationCreate, current_user: dict = Depends(require_student)):
     # Check if already applied
-    existing = await db.applications.find_one({
-        'student_id': current_user['user_id'],
-        'drive_id': application.drive_id
-    }, {'_id': 0})
+    existing = await storage.applications.find_for_student(current_user['user_id'], application.drive_id)
     
     if existing:
         raise HTTPException(status_code=400, detail='Already applied to this drive')
     
-    # Check if drive exists
-    drive = await db.placement_drives.find_one({'id': application.drive_id}, {'_id': 0})
+    # Check if drive exists (the profile is fetched alongside for the snapshot)
+    drive, profile = await asyncio.gather(
+        storage.drives.get(application.drive_id),
+        storage.profiles.get_by_user(current_user['user_id']),
+    )
     if not drive:
         raise HTTPException(status_code=404, detail='Drive not found')
+    if not is_open(drive, today()):
+        raise HTTPException(status_code=400, detail='Applications for this drive are closed')
     
-    app_id = f"app_{datetime.now(timezone.utc).timestamp()}"
+    now = datetime.now(timezone.utc)
+    app_id = f"app_{now.timestamp()}"
     app_doc = {
         'id': app_id,
         'student_id': current_user['user_id'],
         'drive_id': application.drive_id,
-        'status': 'applied',
-        'applied_at': datetime.now(timezone.utc).isoformat()
+        'status': APPLIED,
+        'applied_at': now.isoformat(),
+        'status_changed_at': now.isoformat(),
+        **drive_snapshot(drive),
+        **student_snapshot(profile or {}),
     }
-    await db.applications.insert_one(app_doc)
+    await storage.applications.insert(app_doc)
+    await storage.application_events.insert_many([applied_event(app_doc, current_user['user_id'])])
     
     return ApplicationResponse(**app_doc)
 
 @api_router.get('/applications', response_model=List[ApplicationResponse])
 async def get_applications(current_user: dict = Depends(get_current_user)):
     if current_user['role'] == 'student':
-        apps = await db.applications.find({'student_id': current_user['user_id']}, {'_id': 0}).to_list(None)
+        apps = await storage.applications.list_by_student(current_user['user_id'])
     else:
-        apps = await db.applications.find({}, {'_id': 0}).to_list(None)
+        apps = await storage.applications.list_all()
     
-    # Enrich with drive and student details
-    for app in apps:
-        drive = await db.placement_drives.find_one({'id': app['drive_id']}, {'_id': 0})
-        if drive:
-            app['company_name'] = drive['company_name']
-            app['job_role'] = drive['job_role']
-        
-        profile = await db.student_profiles.find_one({'user_id': app['student_id']}, {'_id': 0})
-        if profile:
-            app['student_name'] = profile['name']
-            app['student_email'] = profile['email']
-            app['student_department'] = profile['department']
-            app['student_cgpa'] = profile['cgpa']
-    
-    return [ApplicationResponse(**a) for a in apps]
+    return [ApplicationResponse(**a) for a in await with_snapshots(await without_deleted_drives(apps))]
 
 @api_router.get('/applications/drive/{drive_id}', response_model=List[ApplicationResponse])
 async def get_drive_applications(drive_id: str, current_user: dict = Depends(require_admin)):
-    apps = await db.applications.find({'drive_id': drive_id}, {'_id': 0}).to_list(None)
+    apps = await without_deleted_drives(await storage.applications.list_by_drive(drive_id))
+    return [ApplicationResponse(**a) for a in await with_snapshots(apps)]
+
+async def ranked_applicants(drive_id: str, weights: RankingWeights, top_k: Optional[int] = None,
+                            status: Optional[str] = None) -> List[dict]:
+    drive = await storage.drives.get(drive_id)
+    if not drive:
+        raise HTTPException(status_code=404, detail='Drive not found')
+    apps = await storage.applications.list_by_drive(drive_id)
+    if status:
+        apps = [a for a in apps if a['status'] == status]
+    profiles = await storage.profiles.get_many_by_user(app['student_id'] for app in apps)
+    ranked = rank_applicants(apps, profiles, drive['eligibility'], weights.model_dump(), top_k)
+    for app in ranked:
+        profile = profiles[app['student_id']]
+        app['student_name'] = profile['name']
+        app['student_email'] = profile['email']
+        app['student_department'] = profile['department']
+        app['student_cgpa'] = profile['cgpa']
+        app['company_name'] = drive['company_name']
+        app['job_role'] = drive['job_role']
+    return ranked
+
+def ranking_weights(
+    cgpa: Annotated[float, Query(ge=0)] = DEFAULT_RANKING_WEIGHTS['cgpa'],
+    skills: Annotated[float, Query(ge=0)] = DEFAULT_RANKING_WEIGHTS['skills'],
+    department: Annotated[float, Query(ge=0)] = DEFAULT_RANKING_WEIGHTS['department'],
+) -> RankingWeights:
+    """RankingWeights from query parameters, so a ranking previews a weighted shortlist"""
+    return RankingWeights(cgpa=cgpa, skills=skills, department=department)
+
+@api_router.get('/drives/{drive_id}/ranking', response_model=List[RankedApplicationResponse])
+async def get_drive_ranking(
+    drive_id: str,
+    limit: Annotated[Optional[int], Query(ge=1)] = None,
+    status: Optional[str] = None,
+    weights: RankingWeights = Depends(ranking_weights),
+    current_user: dict = Depends(require_admin),
+):
+    """Applicants of a drive ordered by CGPA, required-skill coverage and department match
+
+    Weights (?cgpa=&skills=&department=) default to those of the shortlist
+    endpoint; pass the same ones to preview the order it will use.
+    """
+    return [RankedApplicationResponse(**a) for a in await ranked_applicants(drive_id, weights, limit, status)]
+
+@api_router.post('/drives/{drive_id}/shortlist', response_model=ShortlistResponse)
+async def auto_shortlist(drive_id: str, request: ShortlistRequest, current_user: dict = Depends(require_admin)):
+    """Shortlist the top-K 'applied' applicants in one bulk write"""
+    top = await ranked_applicants(drive_id, request.weights, request.top_k, status=APPLIED)
+    now = datetime.now(timezone.utc)
+    moved = set(await storage.applications.update_status_many(
+        [app['id'] for app in top], APPLIED, 'shortlisted', now.isoformat()))
+    # Applications whose status changed after ranking were left alone: no event, no notification
+    top = [app for app in top if app['id'] in moved]
+    app_ids = [app['id'] for app in top]
+    await storage.application_events.insert_many(
+        [status_event(app, 'shortlisted', now, current_user['user_id']) for app in top])
     
-    # Enrich with student details
-    for app in apps:
-        profile = await db.student_profiles.find_one({'user_id': app['student_id']}, {'_id': 0})
-        if profile:
-            app['student_name'] = profile['name']
-            app['student_email'] = profile['email']
-            app['student_department'] = profile['department']
-            app['student_cgpa'] = profile['cgpa']
+    notifications = [{
+        'id': f"notif_{now.timestamp()}_{app['id']}",
+        'user_id': app['student_id'],
+        'drive_id': drive_id,
+        'message': f"Application status updated: {app['company_name']} - shortlisted",
+        'read': False,
+        'created_at': now.isoformat()
+    } for app in top]
+    await fan_out(storage, notifications, source='auto_shortlist')
     
-    return [ApplicationResponse(**a) for a in apps]
+    return ShortlistResponse(
+        shortlisted=len(app_ids),
+        application_ids=app_ids,
+        cutoff_score=top[-1]['score'] if top else None,
+    )
 
 @api_router.put('/applications/{app_id}/status', response_model=ApplicationResponse)
 async def update_application_status(app_id: str, update: ApplicationStatusUpdate, current_user: dict = Depends(require_admin)):
-    result = await db.applications.update_one(
-        {'id': app_id},
-        {'$set': {'status': update.status}}
-    )
-    
-    if result.matched_count == 0:
+    app = await storage.applications.get(app_id)
+    if not app:
         raise HTTPException(status_code=404, detail='Application not found')
+    if app['status'] == update.status:
+        return ApplicationResponse(**app)
+    error = transition_error(app['status'], update.status)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
     
-    # Create notification for student
-    app = await db.applications.find_one({'id': app_id}, {'_id': 0})
-    drive = await db.placement_drives.find_one({'id': app['drive_id']}, {'_id': 0})
+    # Conditional on the status read above, so concurrent updates cannot both apply
+    now = datetime.now(timezone.utc)
+    event = status_event(app, update.status, now, current_user['user_id'])
+    app = await storage.applications.update_status(app_id, app['status'], update.status, now.isoformat())
+    if not app:
+        raise HTTPException(status_code=409, detail='Application status changed concurrently, please retry')
+    await storage.application_events.insert_many([event])
+    app = (await with_snapshots([app]))[0]
     
-    notif_id = f"notif_{datetime.now(timezone.utc).timestamp()}"
+    # Create notification for student
+    notif_id = f"notif_{now.timestamp()}"
     notif_doc = {
         'id': notif_id,
         'user_id': app['student_id'],
-        'message': f"Application status updated: {drive['company_name']} - {update.status}",
+        'drive_id': app['drive_id'],
+        'message': f"Application status updated: {app.get('company_name')} - {update.status}",
         'read': False,
-        'created_at': datetime.now(timezone.utc).isoformat()
+        'created_at': now.isoformat()
     }
-    await db.notifications.insert_one(notif_doc)
+    await storage.notifications.insert(notif_doc)
+    NOTIFICATION_FANOUT.observe(1, source='status_update')
     
-    app = await db.applications.find_one({'id': app_id}, {'_id': 0})
     return ApplicationResponse(**app)
 
+@api_router.get('/applications/{app_id}/timeline', response_model=List[ApplicationEventResponse])
+async def get_application_timeline(app_id: str, current_user: dict = Depends(get_current_user)):
+    """Status changes of one application, oldest first"""
+    events = await storage.application_events.list_for_application(app_id)
+    if current_user['role'] == 'student':
+        events = [e for e in events if e['student_id'] == current_user['user_id']]
+    if not events:
+        raise HTTPException(status_code=404, detail='Application not found')
+    return [ApplicationEventResponse(**e) for e in events]
+
 @api_router.delete('/applications/{app_id}')
 async def withdraw_application(app_id: str, current_user: dict = Depends(require_student)):
-    result = await db.applications.delete_one({
-        'id': app_id,
-        'student_id': current_user['user_id']
-    })
-    
-    if result.deleted_count == 0:
+    app = await storage.applications.get(app_id)
+    if not app or not await storage.applications.delete_for_student(app_id, current_user['user_id']):
         raise HTTPException(status_code=404, detail='Application not found')
     
+    # The application is deleted; its timeline keeps the withdrawal
+    event = status_event(app, WITHDRAWN, datetime.now(timezone.utc), current_user['user_id'])
+    await storage.application_events.insert_many([event])
+    
     return {'message': 'Application withdrawn successfully'}
 
 # ============ Notification Routes ============
 
 @api_router.get('/notifications', response_model=List[NotificationResponse])
 async def get_notifications(current_user: dict = Depends(get_current_user)):
-    notifs = await db.notifications.find(
-        {'user_id': current_user['user_id']},
-        {'_id': 0}
-    ).sort('created_at', -1).to_list(50)
+    notifs = await storage.notifications.list_for_user(current_user['user_id'], limit=50)
     
     return [NotificationResponse(**n) for n in notifs]
 
 @api_router.put('/notifications/{notif_id}/read')
 async def mark_notification_read(notif_id: str, current_user: dict = Depends(get_current_user)):
-    result = await db.notifications.update_one(
-        {'id': notif_id, 'user_id': current_user['user_id']},
-        {'$set': {'read': True}}
-    )
-    
-    if result.matched_count == 0:
+    if not await storage.notifications.mark_read(notif_id, current_user['user_id']):
         raise HTTPException(status_code=404, detail='Notification not found')
     
     return {'message': 'Notification marked as read'}
 
 @api_router.put('/notifications/read-all')
 async def mark_all_notifications_read(current_user: dict = Depends(get_current_user)):
-    await db.notifications.update_many(
-        {'user_id': current_user['user_id']},
-        {'$set': {'read': True}}
-    )
+    await storage.notifications.mark_all_read(current_user['user_id'])
     return {'message': 'All notifications marked as read'}
 
+@api_router.post('/notifications/broadcast', response_model=BroadcastResponse)
+async def broadcast_notification(request: BroadcastRequest, current_user: dict = Depends(require_admin)):
+    """Notify every student matching the audience (departments, batches, minimum CGPA, skills)"""
+    now = datetime.now(timezone.utc)
+    broadcast_id = f"broadcast_{now.timestamp()}"
+    recipients = await broadcast(storage, broadcast_id, request.message, request.audience.model_dump(), now)
+    return BroadcastResponse(broadcast_id=broadcast_id, recipients=recipients)
+
+@api_router.post('/notifications/digest/run')
+async def run_notification_digest(current_user: dict = Depends(require_admin)):
+    """Email pending digests now (for cron-driven deployments)"""
+    if not digest_mailer.pool.configured:
+        raise HTTPException(status_code=503, detail='Email is not configured (set SMTP_HOST)')
+    return await digest_mailer.run_once()
+
 # ============ Analytics Routes ============
 
 @api_router.get('/analytics', response_model=AnalyticsResponse)
 async def get_analytics(current_user: dict = Depends(require_admin)):
-    total_drives = await db.placement_drives.count_documents({})
-    active_drives = await db.placement_drives.count_documents({'status': 'active'})
-    total_applications = await db.applications.count_documents({})
-    total_students = await db.student_profiles.count_documents({})
-    
-    # Department stats
-    students = await db.student_profiles.find({}, {'_id': 0}).to_list(None)
-    dept_stats = {}
-    for student in students:
-        dept = student.get('department', 'Unknown')
-        dept_stats[dept] = dept_stats.get(dept, 0) + 1
-    
-    # Status stats
-    apps = await db.applications.find({}, {'_id': 0}).to_list(None)
-    status_stats = {}
-    for app in apps:
-        status = app.get('status', 'unknown')
-        status_stats[status] = status_stats.get(status, 0) + 1
+    # Admins loading the dashboard together share one set of scans
+    return await analytics_flight.do('analytics', compute_analytics)
+
+async def compute_analytics() -> AnalyticsResponse:
+    (total_drives, active_drives, total_applications, total_students,
+     dept_stats, status_stats, band_stats) = await asyncio.gather(
+        storage.drives.count(budget='analytics'),
+        storage.drives.count(status='active', budget='analytics'),
+        storage.applications.count(budget='analytics'),
+        storage.profiles.count(budget='analytics'),
+        # Department and status stats are grouped by the store, not scanned here
+        storage.profiles.department_counts(),
+        storage.applications.status_counts(),
+        storage.drives.package_band_stats(),
+    )
     
     return AnalyticsResponse(
         total_drives=total_drives,
@@ -667,24 +1188,73 @@ async def get_analytics(current_user: dict = Depends(require_admin)):
         total_applications=total_applications,
         total_students=total_students,
         department_stats=dept_stats,
-        status_stats=status_stats
+        status_stats=status_stats,
+        package_band_stats=band_stats
+    )
+
+@api_router.get('/analytics/funnel', response_model=ApplicationFunnelResponse)
+async def get_application_funnel(drive_id: Optional[str] = None, current_user: dict = Depends(require_admin)):
+    """Stage funnel and time-in-stage, aggregated from status events (optionally for one drive)"""
+    funnel, time_in_stage = await asyncio.gather(
+        storage.application_events.funnel(drive_id),
+        storage.application_events.stage_durations(drive_id),
+    )
+    return ApplicationFunnelResponse(drive_id=drive_id, funnel=funnel, time_in_stage=time_in_stage)
+
+# ============ Dashboard Routes ============
+
+# Each dashboard view used to issue two requests (drives + applications), each
+# repeating auth and the profile lookup. These run the same queries concurrently
+# behind one request and return a single payload.
+
+@api_router.get('/dashboard/student', response_model=StudentDashboardResponse)
+async def get_student_dashboard(current_user: dict = Depends(require_student)):
+    """Open eligible drives flagged with whether the student applied, plus their applications"""
+    profile, drives, apps = await asyncio.gather(
+        storage.profiles.get_by_user(current_user['user_id']),
+        list_drives(open_on=today()),
+        storage.applications.list_by_student(current_user['user_id']),
+    )
+    if profile:
+        drives = eligibility_cache.eligible(profile, drives)
+    
+    apps = await without_deleted_drives(apps)
+    applied = {app['drive_id'] for app in apps}
+    return StudentDashboardResponse(
+        profile=StudentProfile(**profile) if profile else None,
+        drives=[DashboardDriveResponse(**d, applied=d['id'] in applied) for d in drives],
+        applications=[ApplicationResponse(**a) for a in await with_snapshots(apps)],
+    )
+
+@api_router.get('/dashboard/admin', response_model=AdminDashboardResponse)
+async def get_admin_dashboard(current_user: dict = Depends(require_admin)):
+    drives, apps = await asyncio.gather(
+        storage.drives.list_all(),
+        storage.applications.list_all(),
+    )
+    return AdminDashboardResponse(
+        drives=[PlacementDriveResponse(**d) for d in drives],
+        applications=[ApplicationResponse(**a) for a in await with_snapshots(await without_deleted_drives(apps))],
+    )
+
+@api_router.get('/dashboard/admin/drive/{drive_id}', response_model=AdminDriveDashboardResponse)
+async def get_admin_drive_dashboard(drive_id: str, current_user: dict = Depends(require_admin)):
+    drive, apps = await asyncio.gather(
+        storage.drives.get(drive_id),
+        storage.applications.list_by_drive(drive_id),
+    )
+    if not drive:
+        raise HTTPException(status_code=404, detail='Drive not found')
+    return AdminDriveDashboardResponse(
+        drive=PlacementDriveResponse(**drive),
+        applications=[ApplicationResponse(**a) for a in await with_snapshots(apps)],
     )
 
 # ============ CSV Export Route ============
 
 @api_router.get('/export/applications/{drive_id}')
 async def export_applications(drive_id: str, current_user: dict = Depends(require_admin)):
-    apps = await db.applications.find({'drive_id': drive_id}, {'_id': 0}).to_list(None)
-    
-    # Enrich with student details
-    for app in apps:
-        profile = await db.student_profiles.find_one({'user_id': app['student_id']}, {'_id': 0})
-        if profile:
-            app['student_name'] = profile['name']
-            app['student_email'] = profile['email']
-            app['student_department'] = profile['department']
-            app['student_cgpa'] = profile['cgpa']
-            app['student_skills'] = ', '.join(profile['skills'])
+    apps = await with_snapshots(await storage.applications.list_by_drive(drive_id, budget='export'), budget='export')
     
     # Create CSV
     output = io.StringIO()
@@ -699,7 +1269,7 @@ async def export_applications(drive_id: str, current_user: dict = Depends(requir
             'student_email': app.get('student_email', ''),
             'student_department': app.get('student_department', ''),
             'student_cgpa': app.get('student_cgpa', ''),
-            'student_skills': app.get('student_skills', ''),
+            'student_skills': ', '.join(app.get('student_skills') or []),
             'status': app.get('status', ''),
             'applied_at': app.get('applied_at', '')
         })
@@ -718,20 +1288,37 @@ async def health_check():
     """Health check endpoint for container orchestration"""
     try:
         # Check database connection
-        await db.command('ping')
+        await storage.ping()
         return {
             'status': 'healthy',
             'database': 'connected',
+            'pool': pool_stats.snapshot(),
+            'startup': startup_timings,
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
     except Exception as e:
         raise HTTPException(status_code=503, detail=f'Service unavailable: {str(e)}')
 
+# ============ Metrics Route ============
+
+@app.get('/metrics')
+async def metrics(request: Request):
+    """Prometheus scrape endpoint"""
+    if METRICS_TOKEN and request.headers.get('authorization') != f'Bearer {METRICS_TOKEN}':
+        raise HTTPException(status_code=401, detail='Invalid metrics token')
+    return PlainTextResponse(registry.render(), media_type='text/plain; version=0.0.4')
+
 # ============ Root Endpoint ============
 
 
 app.include_router(api_router)
 
+# Inside MetricsMiddleware, so shed requests and queueing time are measured
+app.add_middleware(AdmissionMiddleware, controller=AdmissionController())
+app.add_middleware(MetricsMiddleware)
+if QUERY_DEBUG:
+    app.add_middleware(QueryDebugMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_credentials=True,
@@ -0,0 +1,40 @@
+import heapq
+from typing import Dict, List, Optional
+
+from recommend import skill_set
+
+# Applicant ranking for a drive. Scores are computed column-wise over the
+# applicant list (one pass per feature, then a weighted sum), and top-K
+# selection uses a heap instead of sorting every applicant.
+
+DEFAULT_RANKING_WEIGHTS = {'cgpa': 0.5, 'skills': 0.4, 'department': 0.1}
+
+def feature_columns(profiles: List[dict], criteria: dict) -> Dict[str, List[float]]:
+    """Per-applicant features in [0, 1]: CGPA, required-skill coverage, department match"""
+    required = skill_set(criteria.get('required_skills'))
+    departments = set(criteria.get('departments') or [])
+    cgpa = [min(max(p.get('cgpa', 0.0), 0.0), 10.0) / 10 for p in profiles]
+    if required:
+        skills = [len(required & skill_set(p.get('skills'))) / len(required) for p in profiles]
+    else:
+        skills = [1.0] * len(profiles)
+    department = [1.0 if p.get('department') in departments else 0.0 for p in profiles]
+    return {'cgpa': cgpa, 'skills': skills, 'department': department}
+
+def rank_applicants(apps: List[dict], profiles: Dict[str, dict], criteria: dict,
+                    weights: Optional[Dict[str, float]] = None, top_k: Optional[int] = None) -> List[dict]:
+    """Applications with 'score' and 'score_breakdown', best first (ties: earliest applied)"""
+    weights = {**DEFAULT_RANKING_WEIGHTS, **(weights or {})}
+    scored = [a for a in apps if a['student_id'] in profiles]
+    columns = feature_columns([profiles[a['student_id']] for a in scored], criteria)
+    names = list(columns)
+    totals = [sum(weights[n] * v for n, v in zip(names, row)) for row in zip(*(columns[n] for n in names))]
+
+    order = range(len(scored))
+    key = lambda i: (-totals[i], scored[i]['applied_at'])
+    best = heapq.nsmallest(top_k, order, key=key) if top_k is not None else sorted(order, key=key)
+    return [{
+        **scored[i],
+        'score': round(totals[i], 4),
+        'score_breakdown': {n: round(columns[n][i], 4) for n in names},
+    } for i in best]
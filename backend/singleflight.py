@@ -0,0 +1,37 @@
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable
+
+from metrics import SINGLEFLIGHT_CALLS
+
+# Request coalescing. Identical reads that arrive while one is already in
+# flight wait for it and share its result instead of issuing their own
+# query, so a burst of dashboards after a drive announcement costs one
+# find() rather than hundreds. Nothing is kept once the call finishes: a
+# caller never sees data older than a request that was running when it
+# arrived. Shared results must be treated as read-only.
+
+class SingleFlight:
+    def __init__(self, name: str):
+        self.name = name
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable]):
+        """Run `fn()` unless a call for `key` is in flight, in which case share its result"""
+        task = self._calls.get(key)
+        if task is None:
+            SINGLEFLIGHT_CALLS.inc(flight=self.name, result='leader')
+            # A task, so a disconnecting caller does not cancel the query for the others
+            task = self._calls[key] = asyncio.create_task(fn())
+            task.add_done_callback(lambda t: self._finished(key, t))
+        else:
+            SINGLEFLIGHT_CALLS.inc(flight=self.name, result='shared')
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()  # retrieved here in case every waiter went away
+
+    def in_flight(self) -> int:
+        return len(self._calls)
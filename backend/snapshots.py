@@ -0,0 +1,93 @@
+import asyncio
+import logging
+from typing import Iterable, Optional
+
+from metrics import SNAPSHOT_REFRESHES
+
+logger = logging.getLogger(__name__)
+
+# Applications embed a copy of the student and drive fields shown in listings
+# and exports, so reading them needs no joins. The copies are written by
+# apply_to_drive and refreshed in the background when a profile or drive edit
+# changes one of the source fields.
+
+# Application field -> source profile / drive field
+STUDENT_SNAPSHOT_FIELDS = {
+    'student_name': 'name',
+    'student_email': 'email',
+    'student_department': 'department',
+    'student_cgpa': 'cgpa',
+    'student_skills': 'skills',
+}
+DRIVE_SNAPSHOT_FIELDS = {
+    'company_name': 'company_name',
+    'job_role': 'job_role',
+}
+SNAPSHOT_FIELDS = (*STUDENT_SNAPSHOT_FIELDS, *DRIVE_SNAPSHOT_FIELDS)
+
+def student_snapshot(profile: dict) -> dict:
+    return {field: profile.get(source) for field, source in STUDENT_SNAPSHOT_FIELDS.items()}
+
+def drive_snapshot(drive: dict) -> dict:
+    return {field: drive.get(source) for field, source in DRIVE_SNAPSHOT_FIELDS.items()}
+
+def snapshot_changed(previous: dict, current: dict, fields: dict) -> bool:
+    return any(previous.get(source) != current.get(source) for source in fields.values())
+
+def has_snapshot(app: dict) -> bool:
+    """False for applications written before snapshots were embedded"""
+    return all(field in app for field in SNAPSHOT_FIELDS)
+
+class SnapshotPropagator:
+    """Refreshes embedded snapshots after profile or drive edits, off the request path
+
+    Edits arriving while a refresh is running are coalesced into the next one,
+    and each refresh re-reads the current source documents, so the last write wins.
+    """
+
+    def __init__(self, storage):
+        self.storage = storage
+        self._students = {}  # dicts as insertion-ordered sets of pending ids
+        self._drives = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def student_changed(self, user_id: str) -> None:
+        self._students[user_id] = None
+        self._schedule()
+
+    def drive_changed(self, drive_id: str) -> None:
+        self._drives[drive_id] = None
+        self._schedule()
+
+    def _schedule(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self) -> None:
+        while self._students or self._drives:
+            student_ids, self._students = list(self._students), {}
+            drive_ids, self._drives = list(self._drives), {}
+            try:
+                await self.refresh(student_ids, drive_ids)
+            except Exception:
+                logger.exception('Application snapshot refresh failed')
+
+    async def refresh(self, student_ids: Iterable[str], drive_ids: Iterable[str]) -> int:
+        """Rewrite the snapshots of the given students' and drives' applications in one bulk write"""
+        profiles, drives = await asyncio.gather(
+            self.storage.profiles.get_many_by_user(student_ids),
+            self.storage.drives.get_many(drive_ids),
+        )
+        updates = [('student_id', user_id, student_snapshot(p)) for user_id, p in profiles.items()]
+        updates += [('drive_id', drive_id, drive_snapshot(d)) for drive_id, d in drives.items()]
+        if not updates:
+            return 0
+        changed = await self.storage.applications.refresh_snapshots(updates)
+        SNAPSHOT_REFRESHES.inc(len(profiles), source='profile')
+        SNAPSHOT_REFRESHES.inc(len(drives), source='drive')
+        return changed
+
+    async def drain(self) -> None:
+        """Wait for pending refreshes (shutdown and tests)"""
+        while self._task is not None and not self._task.done():
+            await self._task
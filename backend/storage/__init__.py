@@ -0,0 +1,24 @@
+import os
+
+from storage.base import (
+    Storage, UserRepository, ProfileRepository, DriveRepository, ApplicationRepository,
+    NotificationRepository, ImportJobRepository,
+)
+from storage.memory import MemoryStorage
+from storage.mongo import MongoStorage
+
+# 'mongo' for deployments, 'memory' for tests and micro-benchmarks
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
+
+def create_storage(backend: str = None) -> Storage:
+    backend = backend or STORAGE_BACKEND
+    if backend == 'memory':
+        return MemoryStorage()
+    if backend == 'mongo':
+        return MongoStorage()
+    raise ValueError(f"Unknown STORAGE_BACKEND: {backend}")
+
+__all__ = [
+    'Storage', 'UserRepository', 'ProfileRepository', 'DriveRepository', 'ApplicationRepository',
+    'NotificationRepository', 'ImportJobRepository', 'MemoryStorage', 'MongoStorage', 'create_storage', 'STORAGE_BACKEND',
+]
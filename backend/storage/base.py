@@ -0,0 +1,309 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+# Repository interfaces used by the API routes. Every method returns plain
+# dicts shaped like the stored documents (without Mongo's `_id`). The
+# `budget` argument names a query time budget from database.QUERY_BUDGETS_MS;
+# 'analytics' and 'export' reads may be served by a secondary.
+
+class UserRepository(ABC):
+    @abstractmethod
+    async def get(self, user_id: str, budget: str = 'auth') -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_by_email(self, email: str, budget: str = 'auth') -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, docs: List[dict]) -> Dict[int, str]:
+        """Unordered bulk insert; returns {index in docs: error} for rejected documents"""
+
+    @abstractmethod
+    async def existing_emails(self, emails: Iterable[str]) -> Set[str]:
+        ...
+
+    @abstractmethod
+    async def delete_many(self, user_ids: List[str]) -> int:
+        ...
+
+class ProfileRepository(ABC):
+    @abstractmethod
+    async def get_by_user(self, user_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_many_by_user(self, user_ids: Iterable[str], budget: str = 'default') -> Dict[str, dict]:
+        """Profiles keyed by user_id, fetched in a single query"""
+
+    @abstractmethod
+    async def list_all(self, budget: str = 'default') -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def list_eligible(self, criteria: dict, budget: str = 'default') -> List[dict]:
+        """Profiles that satisfy a drive's eligibility criteria"""
+
+    @abstractmethod
+    async def list_audience(self, audience: dict) -> List[str]:
+        """User ids of the profiles in a broadcast audience (see notifications.matches_audience)"""
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, docs: List[dict]) -> Dict[int, str]:
+        """Unordered bulk insert; returns {index in docs: error} for rejected documents"""
+
+    @abstractmethod
+    async def update(self, user_id: str, fields: dict) -> Optional[dict]:
+        """Apply `fields` and return the updated profile (None if missing)"""
+
+    @abstractmethod
+    async def count(self, budget: str = 'default') -> int:
+        ...
+
+    @abstractmethod
+    async def department_counts(self, budget: str = 'analytics') -> Dict[str, int]:
+        ...
+
+    @abstractmethod
+    async def count_by_resume(self, sha256: str) -> int:
+        """Profiles whose uploaded resume is the blob with this hash"""
+
+    @abstractmethod
+    async def set_resume_skills(self, user_id: str, sha256: str, skills: List[str]) -> bool:
+        """Store skills extracted from a resume, unless the profile's resume has changed since"""
+
+    @abstractmethod
+    async def list_pending_resume_skills(self) -> List[dict]:
+        """Profiles with an uploaded resume whose skills have not been extracted yet"""
+
+class DriveRepository(ABC):
+    @abstractmethod
+    async def get(self, drive_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def get_many(self, drive_ids: Iterable[str], budget: str = 'default') -> Dict[str, dict]:
+        """Drives keyed by id, fetched in a single query"""
+
+    @abstractmethod
+    async def list_all(self, min_package: Optional[float] = None, max_package: Optional[float] = None,
+                       open_on: Optional[str] = None) -> List[dict]:
+        """All drives, optionally limited to a package range in LPA and to
+        drives still open on the `open_on` date (see lifecycle.is_open)"""
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def update(self, drive_id: str, fields: dict) -> Optional[dict]:
+        """Apply `fields` and return the updated drive (None if missing)"""
+
+    @abstractmethod
+    async def soft_delete(self, drive_id: str, deleted_at: str) -> bool:
+        """Hide the drive from every read; the deletion cascade removes it with delete()"""
+
+    @abstractmethod
+    async def list_deleted(self) -> List[dict]:
+        """Soft-deleted drives whose cascade has not finished"""
+
+    @abstractmethod
+    async def delete(self, drive_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def count(self, status: Optional[str] = None, budget: str = 'default') -> int:
+        ...
+
+    @abstractmethod
+    async def close_expired(self, today: str, closed_at: str) -> int:
+        """Close every non-closed drive whose deadline is before `today`"""
+
+    @abstractmethod
+    async def claim_reminder(self, deadline: str, claimed_at: str) -> Optional[dict]:
+        """Atomically mark one open drive with this deadline as reminded and
+        return it, or None once every such drive has been claimed"""
+
+    @abstractmethod
+    async def search(self, text: Optional[str] = None, filters: Optional[dict] = None,
+                     profile: Optional[dict] = None, sort: str = 'relevance',
+                     skip: int = 0, limit: int = 20,
+                     min_package: Optional[float] = None, max_package: Optional[float] = None,
+                     open_on: Optional[str] = None) -> dict:
+        """Drives matching `text`, equality `filters` and the package range,
+        restricted to those the student `profile` is eligible for (and that
+        are open on `open_on`, when given). Returns
+        {'items', 'total', 'facets'} where facets maps each
+        drive_search.SEARCH_FACETS name to {value: count}."""
+
+    @abstractmethod
+    async def package_band_stats(self, budget: str = 'analytics') -> Dict[str, dict]:
+        """{band: {'drives', 'avg_package_min', 'max_package'}}"""
+
+class ApplicationRepository(ABC):
+    @abstractmethod
+    async def get(self, app_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def find_for_student(self, student_id: str, drive_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def list_by_student(self, student_id: str) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def list_by_drive(self, drive_id: str, budget: str = 'default') -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def list_all(self) -> List[dict]:
+        ...
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def update_status(self, app_id: str, from_status: str, status: str, changed_at: str) -> Optional[dict]:
+        """Move from `from_status` to `status`; returns the updated application, or None if it
+        is missing or no longer in `from_status` (a concurrent change)"""
+
+    @abstractmethod
+    async def update_status_many(self, app_ids: List[str], from_status: str, status: str, changed_at: str) -> List[str]:
+        """update_status for several applications in one write; returns the ids actually moved"""
+
+    @abstractmethod
+    async def refresh_snapshots(self, updates: List[Tuple[str, str, dict]]) -> int:
+        """Apply (key field, key value, snapshot fields) updates in one bulk write; returns documents changed"""
+
+    @abstractmethod
+    async def delete_for_student(self, app_id: str, student_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def delete_by_drive(self, drive_id: str, limit: Optional[int] = None) -> int:
+        """Delete up to `limit` of the drive's applications; returns the number deleted"""
+
+    @abstractmethod
+    async def count(self, budget: str = 'default') -> int:
+        ...
+
+    @abstractmethod
+    async def status_counts(self, budget: str = 'analytics') -> Dict[str, int]:
+        ...
+
+class NotificationRepository(ABC):
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def insert_many(self, docs: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    async def list_for_user(self, user_id: str, limit: int = 50) -> List[dict]:
+        """Newest first"""
+
+    @abstractmethod
+    async def mark_read(self, notif_id: str, user_id: str) -> bool:
+        ...
+
+    @abstractmethod
+    async def mark_all_read(self, user_id: str) -> None:
+        ...
+
+    @abstractmethod
+    async def delete_by_drive(self, drive_id: str, limit: Optional[int] = None) -> int:
+        """Delete up to `limit` notifications about the drive; returns the number deleted"""
+
+    @abstractmethod
+    async def claim_for_digest(self, digest_id: str, since: str, until: str) -> int:
+        """Tag unread notifications created in [since, until] and not in any digest yet; returns the number claimed"""
+
+    @abstractmethod
+    async def digest_summaries(self, digest_id: str, max_messages: int) -> List[dict]:
+        """Per recipient of a digest: {'user_id', 'count', 'messages' (newest `max_messages`)}"""
+
+    @abstractmethod
+    async def release_digest(self, digest_id: str, user_ids: Iterable[str]) -> None:
+        """Return these users' notifications to the next digest (their email was not sent)"""
+
+class ApplicationEventRepository(ABC):
+    @abstractmethod
+    async def insert_many(self, docs: List[dict]) -> None:
+        ...
+
+    @abstractmethod
+    async def list_for_application(self, application_id: str) -> List[dict]:
+        """Oldest first"""
+
+    @abstractmethod
+    async def funnel(self, drive_id: Optional[str] = None, budget: str = 'analytics') -> Dict[str, int]:
+        """Applications that ever reached each status"""
+
+    @abstractmethod
+    async def delete_by_drive(self, drive_id: str, limit: Optional[int] = None) -> int:
+        ...
+
+    @abstractmethod
+    async def stage_durations(self, drive_id: Optional[str] = None, budget: str = 'analytics') -> Dict[str, dict]:
+        """Per status left: {'transitions', 'avg_hours', 'max_hours'}"""
+
+class ImportJobRepository(ABC):
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def insert(self, doc: dict) -> None:
+        ...
+
+    @abstractmethod
+    async def update(self, job_id: str, fields: dict, errors: Optional[List[dict]] = None, max_errors: int = 1000) -> None:
+        """Set `fields` and append row errors, keeping at most `max_errors`"""
+
+    @abstractmethod
+    async def fail_stale(self, updated_before: str, fields: dict) -> int:
+        """Set `fields` on queued/running jobs last updated before `updated_before`; returns the count"""
+
+class ResumeExtractionRepository(ABC):
+    @abstractmethod
+    async def get(self, sha256: str) -> Optional[dict]:
+        ...
+
+    @abstractmethod
+    async def save(self, doc: dict) -> None:
+        """Insert or replace the extraction for doc['sha256']"""
+
+class Storage(ABC):
+    users: UserRepository
+    profiles: ProfileRepository
+    drives: DriveRepository
+    applications: ApplicationRepository
+    notifications: NotificationRepository
+    application_events: ApplicationEventRepository
+    import_jobs: ImportJobRepository
+    resume_extractions: ResumeExtractionRepository
+
+    @abstractmethod
+    async def ping(self) -> None:
+        """Raise if the backing store is unreachable"""
+
+    @abstractmethod
+    async def prepare(self) -> dict:
+        """Startup hook (index check); returns anything missing"""
+
+    @abstractmethod
+    def close(self) -> None:
+        ...
@@ -0,0 +1,533 @@
+import copy
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional
+from pymongo.errors import DuplicateKeyError
+
+from drive_search import SEARCH_FACETS, UNSPECIFIED, search_terms, relevance, in_package_range
+from eligibility import check_eligibility
+from lifecycle import CLOSED, is_open
+from notifications import matches_audience
+from storage.base import (
+    Storage, UserRepository, ProfileRepository, DriveRepository, ApplicationRepository,
+    NotificationRepository, ApplicationEventRepository, ImportJobRepository, ResumeExtractionRepository,
+)
+
+# Process-local storage for tests and micro-benchmarks. Documents live in
+# dicts keyed by their primary id with secondary hash indexes mirroring the
+# Mongo index manifest, so lookups stay O(1) and list queries are
+# proportional to the result size. Returned documents are copies.
+
+class MemoryRepository:
+    def __init__(self):
+        self._docs: Dict[str, dict] = {}
+
+    @staticmethod
+    def _copy(doc: Optional[dict]) -> Optional[dict]:
+        return copy.deepcopy(doc) if doc is not None else None
+
+    def _copies(self, keys) -> List[dict]:
+        return [copy.deepcopy(self._docs[key]) for key in keys if key in self._docs]
+
+    @staticmethod
+    def _index_add(index: dict, key, doc_key) -> None:
+        index[key][doc_key] = None  # dict as an insertion-ordered set
+
+    @staticmethod
+    def _index_remove(index: dict, key, doc_key) -> None:
+        bucket = index.get(key)
+        if bucket is not None:
+            bucket.pop(doc_key, None)
+            if not bucket:
+                del index[key]
+
+async def insert_each(repository, docs: List[dict]) -> Dict[int, str]:
+    """Unordered insert_many semantics: keep going past rejected documents"""
+    errors = {}
+    for index, doc in enumerate(docs):
+        try:
+            await repository.insert(doc)
+        except DuplicateKeyError:
+            errors[index] = 'Duplicate key'
+    return errors
+
+class MemoryUserRepository(MemoryRepository, UserRepository):
+    def __init__(self):
+        super().__init__()
+        self._by_email: Dict[str, str] = {}
+
+    async def get(self, user_id, budget='auth'):
+        return self._copy(self._docs.get(user_id))
+
+    async def get_by_email(self, email, budget='auth'):
+        return self._copy(self._docs.get(self._by_email.get(email)))
+
+    async def insert(self, doc):
+        if doc['email'] in self._by_email:
+            raise DuplicateKeyError(f"duplicate key: email {doc['email']}")
+        self._docs[doc['id']] = copy.deepcopy(doc)
+        self._by_email[doc['email']] = doc['id']
+
+    async def insert_many(self, docs):
+        return await insert_each(self, docs)
+
+    async def existing_emails(self, emails):
+        return {email for email in emails if email in self._by_email}
+
+    async def delete_many(self, user_ids):
+        deleted = 0
+        for user_id in user_ids:
+            doc = self._docs.pop(user_id, None)
+            if doc is not None:
+                self._by_email.pop(doc['email'], None)
+                deleted += 1
+        return deleted
+
+class MemoryProfileRepository(MemoryRepository, ProfileRepository):
+    # Primary key is user_id, matching the unique index in the manifest
+
+    async def get_by_user(self, user_id):
+        return self._copy(self._docs.get(user_id))
+
+    async def get_many_by_user(self, user_ids, budget='default'):
+        return {user_id: self._copy(self._docs[user_id]) for user_id in set(user_ids) if user_id in self._docs}
+
+    async def list_all(self, budget='default'):
+        return self._copies(self._docs)
+
+    async def list_eligible(self, criteria, budget='default'):
+        return [copy.deepcopy(p) for p in self._docs.values() if check_eligibility(p, criteria)]
+
+    async def list_audience(self, audience):
+        return [p['user_id'] for p in self._docs.values() if matches_audience(p, audience)]
+
+    async def insert(self, doc):
+        if doc['user_id'] in self._docs:
+            raise DuplicateKeyError(f"duplicate key: user_id {doc['user_id']}")
+        self._docs[doc['user_id']] = copy.deepcopy(doc)
+
+    async def insert_many(self, docs):
+        return await insert_each(self, docs)
+
+    async def update(self, user_id, fields):
+        profile = self._docs.get(user_id)
+        if profile is None:
+            return None
+        profile.update(copy.deepcopy(fields))
+        return self._copy(profile)
+
+    async def count(self, budget='default'):
+        return len(self._docs)
+
+    async def department_counts(self, budget='analytics'):
+        return dict(Counter(p.get('department', 'Unknown') for p in self._docs.values()))
+
+    async def count_by_resume(self, sha256):
+        return sum(1 for p in self._docs.values() if (p.get('resume') or {}).get('sha256') == sha256)
+
+    async def set_resume_skills(self, user_id, sha256, skills):
+        profile = self._docs.get(user_id)
+        if profile is None or (profile.get('resume') or {}).get('sha256') != sha256:
+            return False
+        profile['resume_skills'] = list(skills)
+        return True
+
+    async def list_pending_resume_skills(self):
+        return [copy.deepcopy(p) for p in self._docs.values() if p.get('resume') and p.get('resume_skills') is None]
+
+class MemoryDriveRepository(MemoryRepository, DriveRepository):
+    def __init__(self):
+        super().__init__()
+        self._by_status: Dict[str, dict] = defaultdict(dict)
+        self._deleted: Dict[str, dict] = {}  # soft-deleted, awaiting their cascade
+
+    async def get(self, drive_id):
+        return self._copy(self._docs.get(drive_id))
+
+    async def get_many(self, drive_ids, budget='default'):
+        return {drive_id: self._copy(self._docs[drive_id]) for drive_id in set(drive_ids) if drive_id in self._docs}
+
+    async def list_all(self, min_package=None, max_package=None, open_on=None):
+        if min_package is None and max_package is None and not open_on:
+            return self._copies(self._docs)
+        return [
+            copy.deepcopy(d) for d in self._docs.values()
+            if in_package_range(d, min_package, max_package) and (not open_on or is_open(d, open_on))
+        ]
+
+    async def insert(self, doc):
+        if doc['id'] in self._docs:
+            raise DuplicateKeyError(f"duplicate key: id {doc['id']}")
+        self._docs[doc['id']] = copy.deepcopy(doc)
+        self._index_add(self._by_status, doc.get('status'), doc['id'])
+
+    async def update(self, drive_id, fields):
+        drive = self._docs.get(drive_id)
+        if drive is None:
+            return None
+        self._index_remove(self._by_status, drive.get('status'), drive_id)
+        drive.update(copy.deepcopy(fields))
+        self._index_add(self._by_status, drive.get('status'), drive_id)
+        return self._copy(drive)
+
+    async def soft_delete(self, drive_id, deleted_at):
+        drive = self._docs.pop(drive_id, None)
+        if drive is None:
+            return False
+        self._index_remove(self._by_status, drive.get('status'), drive_id)
+        drive['deleted_at'] = deleted_at
+        self._deleted[drive_id] = drive
+        return True
+
+    async def list_deleted(self):
+        return copy.deepcopy(list(self._deleted.values()))
+
+    async def delete(self, drive_id):
+        if self._deleted.pop(drive_id, None) is not None:
+            return True
+        drive = self._docs.pop(drive_id, None)
+        if drive is None:
+            return False
+        self._index_remove(self._by_status, drive.get('status'), drive_id)
+        return True
+
+    async def count(self, status=None, budget='default'):
+        if status is None:
+            return len(self._docs)
+        return len(self._by_status.get(status, ()))
+
+    async def close_expired(self, today, closed_at):
+        expired = [d for d in self._docs.values() if d.get('status') != CLOSED and d.get('deadline', '') < today]
+        for drive in expired:
+            await self.update(drive['id'], {'status': CLOSED, 'closed_at': closed_at})
+        return len(expired)
+
+    async def claim_reminder(self, deadline, claimed_at):
+        for drive in self._docs.values():
+            if drive.get('deadline') == deadline and drive.get('status') != CLOSED and 'reminder_sent_at' not in drive:
+                drive['reminder_sent_at'] = claimed_at
+                return self._copy(drive)
+        return None
+
+    async def search(self, text=None, filters=None, profile=None, sort='relevance', skip=0, limit=20,
+                     min_package=None, max_package=None, open_on=None):
+        filters = filters or {}
+        keys = self._by_status.get(filters['status'], ()) if 'status' in filters else self._docs
+        terms = search_terms(text) if text else []
+        matches = []
+        for key in keys:
+            drive = self._docs[key]
+            if any(drive.get(field) != value for field, value in filters.items()):
+                continue
+            if not in_package_range(drive, min_package, max_package):
+                continue
+            if open_on and not is_open(drive, open_on):
+                continue
+            if profile and not check_eligibility(profile, drive['eligibility']):
+                continue
+            score = relevance(drive, terms) if terms else 0.0
+            if terms and not score:
+                continue
+            matches.append((score, drive))
+
+        if terms and sort == 'relevance':
+            matches.sort(key=lambda m: (-m[0], m[1].get('deadline', '')))
+        elif sort == 'package':
+            matches.sort(key=lambda m: (-(m[1].get('package_max') or -1), -(m[1].get('package_min') or -1), m[1]['id']))
+        else:
+            matches.sort(key=lambda m: (m[1].get('deadline', ''), m[1]['id']))
+        facets = {
+            name: dict(Counter(drive.get(field) or UNSPECIFIED for _, drive in matches))
+            for name, field in SEARCH_FACETS.items()
+        }
+        return {
+            'items': [copy.deepcopy(drive) for _, drive in matches[skip:skip + limit]],
+            'total': len(matches),
+            'facets': facets,
+        }
+
+    async def package_band_stats(self, budget='analytics'):
+        stats = {}
+        for drive in self._docs.values():
+            band = stats.setdefault(drive.get('package_band') or UNSPECIFIED, {'drives': 0, 'mins': [], 'max_package': None})
+            band['drives'] += 1
+            if drive.get('package_min') is not None:
+                band['mins'].append(drive['package_min'])
+            if drive.get('package_max') is not None:
+                band['max_package'] = max(band['max_package'] or 0, drive['package_max'])
+        return {
+            name: {
+                'drives': band['drives'],
+                'avg_package_min': round(sum(band['mins']) / len(band['mins']), 2) if band['mins'] else None,
+                'max_package': band['max_package'],
+            }
+            for name, band in stats.items()
+        }
+
+class MemoryApplicationRepository(MemoryRepository, ApplicationRepository):
+    def __init__(self):
+        super().__init__()
+        self._by_student: Dict[str, dict] = defaultdict(dict)
+        self._by_drive: Dict[str, dict] = defaultdict(dict)
+        self._by_pair: Dict[tuple, str] = {}
+
+    async def get(self, app_id):
+        return self._copy(self._docs.get(app_id))
+
+    async def find_for_student(self, student_id, drive_id):
+        return self._copy(self._docs.get(self._by_pair.get((student_id, drive_id))))
+
+    async def list_by_student(self, student_id):
+        return self._copies(self._by_student.get(student_id, ()))
+
+    async def list_by_drive(self, drive_id, budget='default'):
+        return self._copies(self._by_drive.get(drive_id, ()))
+
+    async def list_all(self):
+        return self._copies(self._docs)
+
+    async def insert(self, doc):
+        if doc['id'] in self._docs:
+            raise DuplicateKeyError(f"duplicate key: id {doc['id']}")
+        self._docs[doc['id']] = copy.deepcopy(doc)
+        self._index_add(self._by_student, doc['student_id'], doc['id'])
+        self._index_add(self._by_drive, doc['drive_id'], doc['id'])
+        self._by_pair[(doc['student_id'], doc['drive_id'])] = doc['id']
+
+    def _remove(self, app_id: str) -> None:
+        doc = self._docs.pop(app_id)
+        self._index_remove(self._by_student, doc['student_id'], app_id)
+        self._index_remove(self._by_drive, doc['drive_id'], app_id)
+        self._by_pair.pop((doc['student_id'], doc['drive_id']), None)
+
+    async def update_status(self, app_id, from_status, status, changed_at):
+        doc = self._docs.get(app_id)
+        if doc is None or doc['status'] != from_status:
+            return None
+        doc.update(status=status, status_changed_at=changed_at)
+        return self._copy(doc)
+
+    async def update_status_many(self, app_ids, from_status, status, changed_at):
+        moved = []
+        for app_id in app_ids:
+            doc = self._docs.get(app_id)
+            if doc is not None and doc['status'] == from_status and from_status != status:
+                doc.update(status=status, status_changed_at=changed_at)
+                moved.append(app_id)
+        return moved
+
+    async def refresh_snapshots(self, updates):
+        indexes = {'student_id': self._by_student, 'drive_id': self._by_drive}
+        changed = 0
+        for field, value, snapshot in updates:
+            for app_id in indexes[field].get(value, ()):
+                doc = self._docs[app_id]
+                if any(doc.get(k) != v for k, v in snapshot.items()):
+                    doc.update(copy.deepcopy(snapshot))
+                    changed += 1
+        return changed
+
+    async def delete_for_student(self, app_id, student_id):
+        doc = self._docs.get(app_id)
+        if doc is None or doc['student_id'] != student_id:
+            return False
+        self._remove(app_id)
+        return True
+
+    async def delete_by_drive(self, drive_id, limit=None):
+        app_ids = list(self._by_drive.get(drive_id, ()))[:limit]
+        for app_id in app_ids:
+            self._remove(app_id)
+        return len(app_ids)
+
+    async def count(self, budget='default'):
+        return len(self._docs)
+
+    async def status_counts(self, budget='analytics'):
+        return dict(Counter(a.get('status', 'unknown') for a in self._docs.values()))
+
+class MemoryNotificationRepository(MemoryRepository, NotificationRepository):
+    def __init__(self):
+        super().__init__()
+        self._by_user: Dict[str, dict] = defaultdict(dict)
+        self._by_drive: Dict[str, dict] = defaultdict(dict)
+        self._by_digest: Dict[str, dict] = defaultdict(dict)
+        self._undigested: Dict[str, None] = {}
+
+    async def insert(self, doc):
+        if doc['id'] in self._docs:
+            raise DuplicateKeyError(f"duplicate key: id {doc['id']}")
+        self._docs[doc['id']] = copy.deepcopy(doc)
+        self._index_add(self._by_user, doc['user_id'], doc['id'])
+        if doc.get('drive_id'):
+            self._index_add(self._by_drive, doc['drive_id'], doc['id'])
+        if doc.get('digest_id'):
+            self._index_add(self._by_digest, doc['digest_id'], doc['id'])
+        else:
+            self._undigested[doc['id']] = None
+
+    async def insert_many(self, docs):
+        for doc in docs:
+            await self.insert(doc)
+
+    async def list_for_user(self, user_id, limit=50):
+        notifs = self._copies(self._by_user.get(user_id, ()))
+        notifs.sort(key=lambda n: n['created_at'], reverse=True)
+        return notifs[:limit]
+
+    async def mark_read(self, notif_id, user_id):
+        doc = self._docs.get(notif_id)
+        if doc is None or doc['user_id'] != user_id:
+            return False
+        doc['read'] = True
+        return True
+
+    async def mark_all_read(self, user_id):
+        for notif_id in self._by_user.get(user_id, ()):
+            self._docs[notif_id]['read'] = True
+
+    async def delete_by_drive(self, drive_id, limit=None):
+        notif_ids = list(self._by_drive.get(drive_id, ()))[:limit]
+        for notif_id in notif_ids:
+            doc = self._docs.pop(notif_id)
+            self._index_remove(self._by_user, doc['user_id'], notif_id)
+            self._index_remove(self._by_drive, drive_id, notif_id)
+            self._undigested.pop(notif_id, None)
+            if doc.get('digest_id'):
+                self._index_remove(self._by_digest, doc['digest_id'], notif_id)
+        return len(notif_ids)
+
+    async def claim_for_digest(self, digest_id, since, until):
+        claimed = 0
+        for notif_id in list(self._undigested):
+            doc = self._docs[notif_id]
+            if doc['read']:
+                del self._undigested[notif_id]  # read stays read, so it is never claimed
+            elif since <= doc['created_at'] <= until:
+                del self._undigested[notif_id]
+                doc['digest_id'] = digest_id
+                self._index_add(self._by_digest, digest_id, notif_id)
+                claimed += 1
+        return claimed
+
+    async def digest_summaries(self, digest_id, max_messages):
+        by_user = defaultdict(list)
+        for notif_id in self._by_digest.get(digest_id, ()):
+            doc = self._docs[notif_id]
+            by_user[doc['user_id']].append(doc)
+        summaries = []
+        for user_id, docs in by_user.items():
+            docs.sort(key=lambda n: n['created_at'], reverse=True)
+            summaries.append({'user_id': user_id, 'count': len(docs),
+                              'messages': [n['message'] for n in docs[:max_messages]]})
+        return summaries
+
+    async def release_digest(self, digest_id, user_ids):
+        user_ids = set(user_ids)
+        for notif_id in list(self._by_digest.get(digest_id, ())):
+            doc = self._docs[notif_id]
+            if doc['user_id'] in user_ids:
+                del doc['digest_id']
+                self._index_remove(self._by_digest, digest_id, notif_id)
+                self._undigested[notif_id] = None
+
+class MemoryApplicationEventRepository(MemoryRepository, ApplicationEventRepository):
+    def __init__(self):
+        super().__init__()
+        self._by_application: Dict[str, dict] = defaultdict(dict)
+        self._by_drive: Dict[str, dict] = defaultdict(dict)
+
+    async def insert_many(self, docs):
+        for doc in docs:
+            if doc['id'] in self._docs:
+                raise DuplicateKeyError(f"duplicate key: id {doc['id']}")
+            self._docs[doc['id']] = copy.deepcopy(doc)
+            self._index_add(self._by_application, doc['application_id'], doc['id'])
+            self._index_add(self._by_drive, doc['drive_id'], doc['id'])
+
+    def _events(self, drive_id):
+        keys = self._by_drive.get(drive_id, ()) if drive_id else self._docs
+        return (self._docs[key] for key in keys)
+
+    async def delete_by_drive(self, drive_id, limit=None):
+        event_ids = list(self._by_drive.get(drive_id, ()))[:limit]
+        for event_id in event_ids:
+            doc = self._docs.pop(event_id)
+            self._index_remove(self._by_application, doc['application_id'], event_id)
+            self._index_remove(self._by_drive, drive_id, event_id)
+        return len(event_ids)
+
+    async def list_for_application(self, application_id):
+        events = self._copies(self._by_application.get(application_id, ()))
+        events.sort(key=lambda e: e['at'])
+        return events
+
+    async def funnel(self, drive_id=None, budget='analytics'):
+        reached = defaultdict(set)
+        for event in self._events(drive_id):
+            reached[event['to_status']].add(event['application_id'])
+        return {status: len(apps) for status, apps in reached.items()}
+
+    async def stage_durations(self, drive_id=None, budget='analytics'):
+        durations = defaultdict(list)
+        for event in self._events(drive_id):
+            if event['from_status'] is not None:
+                durations[event['from_status']].append(event['duration_seconds'])
+        return {
+            stage: {
+                'transitions': len(seconds),
+                'avg_hours': round(sum(seconds) / len(seconds) / 3600, 2),
+                'max_hours': round(max(seconds) / 3600, 2),
+            }
+            for stage, seconds in durations.items()
+        }
+
+class MemoryImportJobRepository(MemoryRepository, ImportJobRepository):
+    async def get(self, job_id):
+        return self._copy(self._docs.get(job_id))
+
+    async def insert(self, doc):
+        self._docs[doc['id']] = copy.deepcopy(doc)
+
+    async def update(self, job_id, fields, errors=None, max_errors=1000):
+        job = self._docs.get(job_id)
+        if job is None:
+            return
+        job.update(copy.deepcopy(fields))
+        if errors:
+            job['errors'] = (job.get('errors', []) + copy.deepcopy(errors))[:max_errors]
+
+    async def fail_stale(self, updated_before, fields):
+        stale = [job for job in self._docs.values() if job['status'] in ('queued', 'running')
+                 and job.get('updated_at', job['created_at']) < updated_before]
+        for job in stale:
+            job.update(copy.deepcopy(fields))
+        return len(stale)
+
+class MemoryResumeExtractionRepository(MemoryRepository, ResumeExtractionRepository):
+    # Primary key is the content hash
+
+    async def get(self, sha256):
+        return self._copy(self._docs.get(sha256))
+
+    async def save(self, doc):
+        self._docs[doc['sha256']] = copy.deepcopy(doc)
+
+class MemoryStorage(Storage):
+    def __init__(self):
+        self.users = MemoryUserRepository()
+        self.profiles = MemoryProfileRepository()
+        self.drives = MemoryDriveRepository()
+        self.applications = MemoryApplicationRepository()
+        self.notifications = MemoryNotificationRepository()
+        self.application_events = MemoryApplicationEventRepository()
+        self.import_jobs = MemoryImportJobRepository()
+        self.resume_extractions = MemoryResumeExtractionRepository()
+
+    async def ping(self):
+        return None
+
+    async def prepare(self):
+        return {}
+
+    def close(self):
+        return None
@@ -0,0 +1,491 @@
+from typing import Dict, Iterable, List, Optional
+from pymongo import ReturnDocument, UpdateMany
+from pymongo.errors import BulkWriteError
+
+from database import (
+    LazyDatabase, get_database, get_reporting_database, close_client, prepare_indexes, query_budget,
+)
+from drive_search import SEARCH_FACETS, UNSPECIFIED, package_range_query
+from eligibility import eligibility_query, eligible_profiles_query, skill_keys
+from lifecycle import CLOSED, open_query
+from notifications import audience_query
+from storage.base import (
+    Storage, UserRepository, ProfileRepository, DriveRepository, ApplicationRepository,
+    NotificationRepository, ApplicationEventRepository, ImportJobRepository, ResumeExtractionRepository,
+)
+
+NO_ID = {'_id': 0}
+
+# Soft-deleted drives stay stored until their deletion cascade finishes
+NOT_DELETED = {'deleted_at': {'$exists': False}}
+
+def live(query: dict) -> dict:
+    return {**query, **NOT_DELETED}
+
+def with_skill_keys(doc: dict) -> dict:
+    """Profile document or update plus the lower-cased skills audience/eligibility queries match on"""
+    return {**doc, 'skill_keys': skill_keys(doc['skills'])} if 'skills' in doc else dict(doc)
+
+def with_required_skill_keys(doc: dict) -> dict:
+    """Drive document or update plus its lower-cased required skills"""
+    if 'eligibility' not in doc:
+        return dict(doc)
+    return {**doc, 'required_skill_keys': skill_keys(doc['eligibility']['required_skills'])}
+
+# Budgets whose reads go to the reporting (secondary-preferred) database
+REPORTING_BUDGETS = {'analytics', 'export'}
+
+class MongoRepository:
+    collection_name = ''
+
+    def __init__(self, db, reporting_db):
+        self._db = db
+        self._reporting_db = reporting_db
+
+    @property
+    def collection(self):
+        return self._db[self.collection_name]
+
+    def reads(self, budget: str = 'default'):
+        """Collection to read from for the given budget"""
+        source = self._reporting_db if budget in REPORTING_BUDGETS else self._db
+        return source[self.collection_name]
+
+    async def find_one(self, query: dict, budget: str = 'default') -> Optional[dict]:
+        return await self.reads(budget).find_one(query, NO_ID, max_time_ms=query_budget(budget))
+
+    async def find(self, query: dict, budget: str = 'default', limit: Optional[int] = None, sort=None) -> List[dict]:
+        cursor = self.reads(budget).find(query, NO_ID).max_time_ms(query_budget(budget))
+        if sort:
+            cursor = cursor.sort(*sort)
+        return await cursor.to_list(limit)
+
+    async def count_documents(self, query: dict, budget: str = 'default') -> int:
+        return await self.reads(budget).count_documents(query, maxTimeMS=query_budget(budget))
+
+    async def group_counts(self, field: str, budget: str = 'analytics', default: str = 'unknown') -> Dict[str, int]:
+        pipeline = [{'$group': {'_id': {'$ifNull': [f'${field}', default]}, 'count': {'$sum': 1}}}]
+        cursor = self.reads(budget).aggregate(pipeline, maxTimeMS=query_budget(budget))
+        return {row['_id']: row['count'] async for row in cursor}
+
+    async def insert_many_unordered(self, docs: List[dict]) -> Dict[int, str]:
+        if not docs:
+            return {}
+        try:
+            await self.collection.insert_many([dict(d) for d in docs], ordered=False)
+        except BulkWriteError as e:
+            return {
+                error['index']: 'Duplicate key' if error.get('code') == 11000 else error.get('errmsg', 'Write failed')
+                for error in e.details.get('writeErrors', [])
+            }
+        return {}
+
+    async def delete_batch(self, query: dict, limit: Optional[int] = None) -> int:
+        """Delete matching documents, at most `limit` per call so large deletes run in bounded batches"""
+        if limit is None:
+            result = await self.collection.delete_many(query)
+            return result.deleted_count
+        cursor = self.collection.find(query, {'_id': 1}).limit(limit)
+        ids = [doc['_id'] async for doc in cursor]
+        if not ids:
+            return 0
+        result = await self.collection.delete_many({'_id': {'$in': ids}})
+        return result.deleted_count
+
+    async def update_returning(self, query: dict, fields: dict) -> Optional[dict]:
+        return await self.collection.find_one_and_update(
+            query, {'$set': fields}, projection=NO_ID, return_document=ReturnDocument.AFTER,
+        )
+
+class MongoUserRepository(MongoRepository, UserRepository):
+    collection_name = 'users'
+
+    async def get(self, user_id, budget='auth'):
+        return await self.find_one({'id': user_id}, budget)
+
+    async def get_by_email(self, email, budget='auth'):
+        return await self.find_one({'email': email}, budget)
+
+    async def insert(self, doc):
+        await self.collection.insert_one(dict(doc))
+
+    async def insert_many(self, docs):
+        return await self.insert_many_unordered(docs)
+
+    async def existing_emails(self, emails):
+        emails = list(set(emails))
+        if not emails:
+            return set()
+        cursor = self.collection.find({'email': {'$in': emails}}, {'_id': 0, 'email': 1})
+        return {doc['email'] async for doc in cursor.max_time_ms(query_budget())}
+
+    async def delete_many(self, user_ids):
+        if not user_ids:
+            return 0
+        result = await self.collection.delete_many({'id': {'$in': list(user_ids)}})
+        return result.deleted_count
+
+class MongoProfileRepository(MongoRepository, ProfileRepository):
+    collection_name = 'student_profiles'
+
+    async def get_by_user(self, user_id):
+        return await self.find_one({'user_id': user_id})
+
+    async def get_many_by_user(self, user_ids, budget='default'):
+        ids = list(set(user_ids))
+        if not ids:
+            return {}
+        return {p['user_id']: p for p in await self.find({'user_id': {'$in': ids}}, budget)}
+
+    async def list_all(self, budget='default'):
+        return await self.find({}, budget)
+
+    async def list_eligible(self, criteria, budget='default'):
+        return await self.find(eligible_profiles_query(criteria), budget)
+
+    async def list_audience(self, audience):
+        cursor = self.collection.find(audience_query(audience), {'_id': 0, 'user_id': 1})
+        return [doc['user_id'] async for doc in cursor.max_time_ms(query_budget())]
+
+    async def insert(self, doc):
+        await self.collection.insert_one(with_skill_keys(doc))
+
+    async def insert_many(self, docs):
+        return await self.insert_many_unordered([with_skill_keys(doc) for doc in docs])
+
+    async def update(self, user_id, fields):
+        return await self.update_returning({'user_id': user_id}, with_skill_keys(fields))
+
+    async def count(self, budget='default'):
+        return await self.count_documents({}, budget)
+
+    async def department_counts(self, budget='analytics'):
+        return await self.group_counts('department', budget, default='Unknown')
+
+    async def count_by_resume(self, sha256):
+        return await self.count_documents({'resume.sha256': sha256})
+
+    async def set_resume_skills(self, user_id, sha256, skills):
+        result = await self.collection.update_one(
+            {'user_id': user_id, 'resume.sha256': sha256}, {'$set': {'resume_skills': skills}})
+        return result.matched_count > 0
+
+    async def list_pending_resume_skills(self):
+        return await self.find({'resume.sha256': {'$exists': True}, 'resume_skills': None})
+
+class MongoDriveRepository(MongoRepository, DriveRepository):
+    collection_name = 'placement_drives'
+
+    async def get(self, drive_id):
+        return await self.find_one(live({'id': drive_id}))
+
+    async def get_many(self, drive_ids, budget='default'):
+        ids = list(set(drive_ids))
+        if not ids:
+            return {}
+        return {d['id']: d for d in await self.find(live({'id': {'$in': ids}}), budget)}
+
+    async def list_all(self, min_package=None, max_package=None, open_on=None):
+        query = package_range_query(min_package, max_package)
+        if open_on:
+            query = {'$and': [query, open_query(open_on)]} if query else open_query(open_on)
+        return await self.find(live(query))
+
+    async def insert(self, doc):
+        await self.collection.insert_one(with_required_skill_keys(doc))
+
+    async def update(self, drive_id, fields):
+        return await self.update_returning(live({'id': drive_id}), with_required_skill_keys(fields))
+
+    async def soft_delete(self, drive_id, deleted_at):
+        result = await self.collection.update_one(live({'id': drive_id}), {'$set': {'deleted_at': deleted_at}})
+        return result.modified_count > 0
+
+    async def list_deleted(self):
+        return await self.find({'deleted_at': {'$exists': True}})
+
+    async def delete(self, drive_id):
+        result = await self.collection.delete_one({'id': drive_id})
+        return result.deleted_count > 0
+
+    async def count(self, status=None, budget='default'):
+        return await self.count_documents(live({'status': status} if status else {}), budget)
+
+    async def close_expired(self, today, closed_at):
+        result = await self.collection.update_many(
+            live({'status': {'$ne': CLOSED}, 'deadline': {'$lt': today}}),
+            {'$set': {'status': CLOSED, 'closed_at': closed_at}},
+        )
+        return result.modified_count
+
+    async def claim_reminder(self, deadline, claimed_at):
+        return await self.collection.find_one_and_update(
+            live({'deadline': deadline, 'status': {'$ne': CLOSED}, 'reminder_sent_at': {'$exists': False}}),
+            {'$set': {'reminder_sent_at': claimed_at}},
+            projection=NO_ID, return_document=ReturnDocument.AFTER,
+        )
+
+    async def search(self, text=None, filters=None, profile=None, sort='relevance', skip=0, limit=20,
+                     min_package=None, max_package=None, open_on=None):
+        clauses = [NOT_DELETED] + [{field: value} for field, value in (filters or {}).items()]
+        package_range = package_range_query(min_package, max_package)
+        if package_range:
+            clauses.append(package_range)
+        if open_on:
+            clauses.append(open_query(open_on))
+        if profile:
+            clauses.append(eligibility_query(profile))
+        query = {'$and': clauses}
+        if text:
+            query['$text'] = {'$search': text}
+
+        pipeline = [{'$match': query}]
+        if text and sort == 'relevance':
+            pipeline.append({'$addFields': {'_score': {'$meta': 'textScore'}}})
+            order = {'_score': -1, 'deadline': 1}
+        elif sort == 'package':
+            order = {'package_max': -1, 'package_min': -1, 'id': 1}
+        else:
+            order = {'deadline': 1, 'id': 1}
+        facets = {
+            name: [{'$group': {'_id': {'$ifNull': [f'${field}', UNSPECIFIED]}, 'count': {'$sum': 1}}}]
+            for name, field in SEARCH_FACETS.items()
+        }
+        pipeline.append({'$facet': {
+            'items': [{'$sort': order}, {'$skip': skip}, {'$limit': limit}, {'$project': {'_id': 0, '_score': 0}}],
+            'total': [{'$count': 'count'}],
+            **facets,
+        }})
+
+        cursor = self.reads().aggregate(pipeline, maxTimeMS=query_budget())
+        result = (await cursor.to_list(1))[0]
+        return {
+            'items': result['items'],
+            'total': result['total'][0]['count'] if result['total'] else 0,
+            'facets': {name: {row['_id']: row['count'] for row in result[name]} for name in SEARCH_FACETS},
+        }
+
+    async def package_band_stats(self, budget='analytics'):
+        pipeline = [{'$match': NOT_DELETED}, {'$group': {
+            '_id': {'$ifNull': ['$package_band', UNSPECIFIED]},
+            'drives': {'$sum': 1},
+            'avg_package_min': {'$avg': '$package_min'},
+            'max_package': {'$max': '$package_max'},
+        }}]
+        cursor = self.reads(budget).aggregate(pipeline, maxTimeMS=query_budget(budget))
+        return {
+            row['_id']: {
+                'drives': row['drives'],
+                'avg_package_min': round(row['avg_package_min'], 2) if row['avg_package_min'] is not None else None,
+                'max_package': row['max_package'],
+            }
+            async for row in cursor
+        }
+
+class MongoApplicationRepository(MongoRepository, ApplicationRepository):
+    collection_name = 'applications'
+
+    async def get(self, app_id):
+        return await self.find_one({'id': app_id})
+
+    async def find_for_student(self, student_id, drive_id):
+        return await self.find_one({'student_id': student_id, 'drive_id': drive_id})
+
+    async def list_by_student(self, student_id):
+        return await self.find({'student_id': student_id})
+
+    async def list_by_drive(self, drive_id, budget='default'):
+        return await self.find({'drive_id': drive_id}, budget)
+
+    async def list_all(self):
+        return await self.find({})
+
+    async def insert(self, doc):
+        await self.collection.insert_one(dict(doc))
+
+    async def update_status(self, app_id, from_status, status, changed_at):
+        return await self.update_returning(
+            {'id': app_id, 'status': from_status}, {'status': status, 'status_changed_at': changed_at})
+
+    async def update_status_many(self, app_ids, from_status, status, changed_at):
+        if not app_ids:
+            return []
+        result = await self.collection.update_many(
+            {'id': {'$in': list(app_ids)}, 'status': from_status},
+            {'$set': {'status': status, 'status_changed_at': changed_at}})
+        if not result.modified_count:
+            return []
+        # Applications changed since they were read were skipped by the status condition;
+        # read back from the primary which ones this write moved
+        cursor = self.collection.find({'id': {'$in': list(app_ids)}, 'status': status, 'status_changed_at': changed_at},
+                                      {'_id': 0, 'id': 1})
+        return [doc['id'] async for doc in cursor]
+
+    async def refresh_snapshots(self, updates):
+        if not updates:
+            return 0
+        requests = [UpdateMany({field: value}, {'$set': snapshot}) for field, value, snapshot in updates]
+        result = await self.collection.bulk_write(requests, ordered=False)
+        return result.modified_count
+
+    async def delete_for_student(self, app_id, student_id):
+        result = await self.collection.delete_one({'id': app_id, 'student_id': student_id})
+        return result.deleted_count > 0
+
+    async def delete_by_drive(self, drive_id, limit=None):
+        return await self.delete_batch({'drive_id': drive_id}, limit)
+
+    async def count(self, budget='default'):
+        return await self.count_documents({}, budget)
+
+    async def status_counts(self, budget='analytics'):
+        return await self.group_counts('status', budget)
+
+class MongoNotificationRepository(MongoRepository, NotificationRepository):
+    collection_name = 'notifications'
+
+    async def insert(self, doc):
+        await self.collection.insert_one(dict(doc))
+
+    async def insert_many(self, docs):
+        if docs:
+            await self.collection.insert_many([dict(d) for d in docs], ordered=False)
+
+    async def list_for_user(self, user_id, limit=50):
+        return await self.find({'user_id': user_id}, limit=limit, sort=('created_at', -1))
+
+    async def mark_read(self, notif_id, user_id):
+        result = await self.collection.update_one({'id': notif_id, 'user_id': user_id}, {'$set': {'read': True}})
+        return result.matched_count > 0
+
+    async def mark_all_read(self, user_id):
+        await self.collection.update_many({'user_id': user_id}, {'$set': {'read': True}})
+
+    async def delete_by_drive(self, drive_id, limit=None):
+        return await self.delete_batch({'drive_id': drive_id}, limit)
+
+    async def claim_for_digest(self, digest_id, since, until):
+        # One update_many: each notification lands in exactly one digest, even with several instances
+        result = await self.collection.update_many(
+            {'digest_id': None, 'read': False, 'created_at': {'$gte': since, '$lte': until}},
+            {'$set': {'digest_id': digest_id}},
+        )
+        return result.modified_count
+
+    async def digest_summaries(self, digest_id, max_messages):
+        pipeline = [
+            {'$match': {'digest_id': digest_id}},
+            {'$sort': {'created_at': -1}},
+            {'$group': {'_id': '$user_id', 'count': {'$sum': 1}, 'messages': {'$push': '$message'}}},
+            {'$project': {'_id': 0, 'user_id': '$_id', 'count': 1, 'messages': {'$slice': ['$messages', max_messages]}}},
+        ]
+        cursor = self.collection.aggregate(pipeline, maxTimeMS=query_budget('export'))
+        return [row async for row in cursor]
+
+    async def release_digest(self, digest_id, user_ids):
+        ids = list(user_ids)
+        if ids:
+            await self.collection.update_many(
+                {'digest_id': digest_id, 'user_id': {'$in': ids}}, {'$unset': {'digest_id': ''}})
+
+class MongoApplicationEventRepository(MongoRepository, ApplicationEventRepository):
+    collection_name = 'application_events'
+
+    async def insert_many(self, docs):
+        if docs:
+            await self.collection.insert_many([dict(d) for d in docs], ordered=False)
+
+    async def list_for_application(self, application_id):
+        return await self.find({'application_id': application_id}, sort=('at', 1))
+
+    async def funnel(self, drive_id=None, budget='analytics'):
+        pipeline = [
+            {'$match': {'drive_id': drive_id} if drive_id else {}},
+            {'$group': {'_id': {'status': '$to_status', 'application': '$application_id'}}},
+            {'$group': {'_id': '$_id.status', 'count': {'$sum': 1}}},
+        ]
+        cursor = self.reads(budget).aggregate(pipeline, maxTimeMS=query_budget(budget))
+        return {row['_id']: row['count'] async for row in cursor}
+
+    async def delete_by_drive(self, drive_id, limit=None):
+        return await self.delete_batch({'drive_id': drive_id}, limit)
+
+    async def stage_durations(self, drive_id=None, budget='analytics'):
+        match = {'from_status': {'$ne': None}}
+        if drive_id:
+            match['drive_id'] = drive_id
+        pipeline = [
+            {'$match': match},
+            {'$group': {
+                '_id': '$from_status',
+                'transitions': {'$sum': 1},
+                'avg_seconds': {'$avg': '$duration_seconds'},
+                'max_seconds': {'$max': '$duration_seconds'},
+            }},
+        ]
+        cursor = self.reads(budget).aggregate(pipeline, maxTimeMS=query_budget(budget))
+        return {
+            row['_id']: {
+                'transitions': row['transitions'],
+                'avg_hours': round(row['avg_seconds'] / 3600, 2),
+                'max_hours': round(row['max_seconds'] / 3600, 2),
+            }
+            async for row in cursor
+        }
+
+class MongoImportJobRepository(MongoRepository, ImportJobRepository):
+    collection_name = 'import_jobs'
+
+    async def get(self, job_id):
+        return await self.find_one({'id': job_id})
+
+    async def insert(self, doc):
+        await self.collection.insert_one(dict(doc))
+
+    async def update(self, job_id, fields, errors=None, max_errors=1000):
+        update = {'$set': fields}
+        if errors:
+            update['$push'] = {'errors': {'$each': errors, '$slice': max_errors}}
+        await self.collection.update_one({'id': job_id}, update)
+
+    async def fail_stale(self, updated_before, fields):
+        result = await self.collection.update_many({
+            'status': {'$in': ['queued', 'running']},
+            '$or': [
+                {'updated_at': {'$lt': updated_before}},
+                # Jobs written before updated_at was recorded
+                {'updated_at': {'$exists': False}, 'created_at': {'$lt': updated_before}},
+            ],
+        }, {'$set': fields})
+        return result.modified_count
+
+class MongoResumeExtractionRepository(MongoRepository, ResumeExtractionRepository):
+    collection_name = 'resume_extractions'
+
+    async def get(self, sha256):
+        return await self.find_one({'sha256': sha256})
+
+    async def save(self, doc):
+        await self.collection.replace_one({'sha256': doc['sha256']}, dict(doc), upsert=True)
+
+class MongoStorage(Storage):
+    def __init__(self):
+        self.db = LazyDatabase(get_database)
+        self.reporting_db = LazyDatabase(get_reporting_database)
+        self.users = MongoUserRepository(self.db, self.reporting_db)
+        self.profiles = MongoProfileRepository(self.db, self.reporting_db)
+        self.drives = MongoDriveRepository(self.db, self.reporting_db)
+        self.applications = MongoApplicationRepository(self.db, self.reporting_db)
+        self.notifications = MongoNotificationRepository(self.db, self.reporting_db)
+        self.application_events = MongoApplicationEventRepository(self.db, self.reporting_db)
+        self.import_jobs = MongoImportJobRepository(self.db, self.reporting_db)
+        self.resume_extractions = MongoResumeExtractionRepository(self.db, self.reporting_db)
+
+    async def ping(self):
+        await self.db.command('ping')
+
+    async def prepare(self):
+        return await prepare_indexes(get_database())
+
+    def close(self):
+        close_client()
@@ -0,0 +1,244 @@
+import asyncio
+import csv
+import json
+import logging
+import os
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Awaitable, Callable, Iterator, List, Optional, Tuple
+
+from pydantic import BaseModel, EmailStr, Field, ValidationError, field_validator
+
+from sanitization import SanitizedStr, password_error
+
+logger = logging.getLogger(__name__)
+
+# Import Configuration
+IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 500))
+IMPORT_MAX_BYTES = int(os.environ.get('IMPORT_MAX_BYTES', 20 * 1024 * 1024))
+IMPORT_MAX_ERRORS = int(os.environ.get('IMPORT_MAX_ERRORS', 1000))
+# A queued/running job not updated for this long lost its worker (restart or crash)
+IMPORT_STALE_SECONDS = int(os.environ.get('IMPORT_STALE_SECONDS', 600))
+
+IMPORT_FORMATS = {
+    'text/csv': 'csv',
+    'application/csv': 'csv',
+    'application/x-ndjson': 'ndjson',
+    'application/ndjson': 'ndjson',
+    'application/jsonl': 'ndjson',
+}
+
+class ImportTooLarge(Exception):
+    pass
+
+class StudentImportRow(BaseModel):
+    email: EmailStr
+    name: SanitizedStr = Field(min_length=1)
+    password: str
+    department: SanitizedStr = ''
+    batch: int = 0
+    cgpa: float = Field(default=0.0, ge=0, le=10)
+    skills: List[SanitizedStr] = []
+
+    @field_validator('skills', mode='before')
+    @classmethod
+    def split_skills(cls, value):
+        # CSV cells carry skills as "Python; SQL" (';' or '|' separated)
+        if isinstance(value, str):
+            value = value.replace('|', ';').split(';')
+        return [s.strip() for s in value or [] if s and s.strip()]
+
+    @field_validator('department', 'batch', 'cgpa', mode='before')
+    @classmethod
+    def blank_as_default(cls, value, info):
+        if value == '' and info.field_name != 'department':
+            return cls.model_fields[info.field_name].default
+        return value
+
+def detect_format(content_type: Optional[str], requested: Optional[str] = None) -> Optional[str]:
+    if requested:
+        return requested if requested in ('csv', 'ndjson') else None
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    return IMPORT_FORMATS.get(media_type)
+
+async def spool_upload(chunks: AsyncIterator[bytes], max_bytes: int = IMPORT_MAX_BYTES) -> Tuple[str, int]:
+    """Stream the request body to a temp file without holding it in memory"""
+    size = 0
+    handle, path = tempfile.mkstemp(prefix='student_import_', suffix='.upload')
+    try:
+        with os.fdopen(handle, 'wb') as out:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise ImportTooLarge(f"Upload exceeds {max_bytes} bytes")
+                out.write(chunk)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, size
+
+def iter_rows(path: str, fmt: str) -> Iterator[Tuple[int, object]]:
+    """Yield (row number, raw row dict or parse error) one row at a time"""
+    with open(path, newline='', encoding='utf-8-sig', errors='replace') as f:
+        if fmt == 'csv':
+            reader = csv.DictReader(f)
+            if reader.fieldnames:
+                reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+            for number, row in enumerate(reader, start=1):
+                yield number, {k: (v or '').strip() for k, v in row.items() if k}
+        else:
+            number = 0
+            for line in f:
+                if not line.strip():
+                    continue
+                number += 1
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    yield number, e
+                    continue
+                yield number, row if isinstance(row, dict) else ValueError('Row is not a JSON object')
+
+def iter_batches(rows: Iterator[Tuple[int, object]], size: int) -> Iterator[List[Tuple[int, object]]]:
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def row_error(number: int, email: Optional[str], error: str) -> dict:
+    return {'row': number, 'email': email, 'error': error}
+
+def describe_validation_error(e: ValidationError) -> str:
+    return '; '.join(f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors())
+
+class StudentImporter:
+    """Validates, hashes and writes one upload in batches, recording progress on the job"""
+
+    def __init__(self, storage, job_id: str, hash_password: Callable[[str], Awaitable[str]],
+                 batch_size: int = IMPORT_BATCH_SIZE):
+        self.storage = storage
+        self.job_id = job_id
+        self.hash_password = hash_password
+        self.batch_size = batch_size
+        self.seen_emails = set()
+        self.progress = {'processed': 0, 'created': 0, 'failed': 0}
+
+    def validate(self, number: int, raw) -> Tuple[Optional[StudentImportRow], Optional[dict]]:
+        if isinstance(raw, Exception):
+            return None, row_error(number, None, f"Unparseable row: {raw}")
+        email = str(raw.get('email') or '').lower().strip() or None
+        try:
+            row = StudentImportRow(**{**raw, 'email': email})
+        except ValidationError as e:
+            return None, row_error(number, email, describe_validation_error(e))
+        weak = password_error(row.password)
+        if weak:
+            return None, row_error(number, row.email, weak)
+        if row.email in self.seen_emails:
+            return None, row_error(number, row.email, 'Duplicate email in upload')
+        self.seen_emails.add(row.email)
+        return row, None
+
+    async def process_batch(self, batch: List[Tuple[int, object]]) -> List[dict]:
+        errors = []
+        valid = []
+        for number, raw in batch:
+            row, error = self.validate(number, raw)
+            if error:
+                errors.append(error)
+            else:
+                valid.append((number, row))
+
+        existing = await self.storage.users.existing_emails(row.email for _, row in valid)
+        for number, row in valid:
+            if row.email in existing:
+                errors.append(row_error(number, row.email, 'Email already registered'))
+        valid = [(number, row) for number, row in valid if row.email not in existing]
+
+        # Hashes for the whole batch run concurrently on the bcrypt pool
+        hashes = await asyncio.gather(*(self.hash_password(row.password) for _, row in valid))
+
+        now = datetime.now(timezone.utc)
+        users, profiles = [], []
+        for (number, row), password_hash in zip(valid, hashes):
+            user_id = f"user_{now.timestamp()}_{uuid.uuid4().hex[:8]}"
+            users.append({
+                'id': user_id,
+                'email': row.email,
+                'password_hash': password_hash,
+                'role': 'student',
+                'name': row.name,
+                'created_at': now.isoformat()
+            })
+            profiles.append({
+                'id': f"profile_{user_id}",
+                'user_id': user_id,
+                'name': row.name,
+                'email': row.email,
+                'department': row.department,
+                'batch': row.batch,
+                'cgpa': row.cgpa,
+                'skills': row.skills,
+                'resume_url': None
+            })
+
+        user_errors = await self.storage.users.insert_many(users)
+        for index, error in user_errors.items():
+            errors.append(row_error(valid[index][0], users[index]['email'], error))
+        written = [i for i in range(len(users)) if i not in user_errors]
+        try:
+            profile_errors = await self.storage.profiles.insert_many([profiles[i] for i in written])
+        except Exception:
+            await self.storage.users.delete_many([users[i]['id'] for i in written])
+            raise
+        # A user without a profile would block re-importing the row ("Email already registered")
+        await self.storage.users.delete_many([users[written[position]]['id'] for position in profile_errors])
+        for position, error in profile_errors.items():
+            index = written[position]
+            errors.append(row_error(valid[index][0], users[index]['email'], f"Profile not created: {error}"))
+        created = len(written) - len(profile_errors)
+
+        self.progress['processed'] += len(batch)
+        self.progress['created'] += created
+        self.progress['failed'] += len(batch) - created
+        errors.sort(key=lambda e: e['row'])
+        return errors
+
+    async def update_job(self, fields: dict, errors: Optional[List[dict]] = None) -> None:
+        # updated_at doubles as the heartbeat fail_stale_jobs checks
+        fields = {**fields, 'updated_at': datetime.now(timezone.utc).isoformat()}
+        await self.storage.import_jobs.update(self.job_id, fields, errors=errors, max_errors=IMPORT_MAX_ERRORS)
+
+    async def run(self, path: str, fmt: str) -> None:
+        await self.update_job({'status': 'running'})
+        batches = iter_batches(iter_rows(path, fmt), self.batch_size)
+        try:
+            # File reads and CSV/JSON parsing run on a worker thread, a batch at a time
+            while (batch := await asyncio.to_thread(next, batches, None)) is not None:
+                errors = await self.process_batch(batch)
+                await self.update_job(dict(self.progress), errors=errors)
+            status = 'completed'
+        except Exception as e:
+            logger.exception(f"Student import {self.job_id} failed")
+            await self.update_job({'error': str(e)})
+            status = 'failed'
+        finally:
+            os.unlink(path)
+        await self.update_job({
+            'status': status,
+            'finished_at': datetime.now(timezone.utc).isoformat(),
+        })
+
+async def fail_stale_jobs(storage, stale_after: int = IMPORT_STALE_SECONDS) -> int:
+    """Mark imports whose worker went away (restart, crash) as failed; they cannot be resumed"""
+    now = datetime.now(timezone.utc)
+    return await storage.import_jobs.fail_stale((now - timedelta(seconds=stale_after)).isoformat(), {
+        'status': 'failed',
+        'error': 'Import was interrupted by a server restart; upload the file again',
+        'finished_at': now.isoformat(),
+    })
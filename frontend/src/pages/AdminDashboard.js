@@ -40,6 +40,7 @@ const Sidebar = ({ active }) => {
     { id: 'overview', label: 'Overview', icon: LayoutDashboard, path: '/admin' },
     { id: 'drives', label: 'Placement Drives', icon: Briefcase, path: '/admin/drives' },
     { id: 'shortlist', label: 'Bulk Status Update', icon: Upload, path: '/admin/shortlist' },
+    { id: 'broadcast', label: 'Broadcast', icon: Bell, path: '/admin/broadcast' },
     { id: 'analytics', label: 'Analytics', icon: BarChart3, path: '/admin/analytics' }
   ];
 
@@ -109,12 +110,9 @@ const Overview = () => {
 
   const fetchData = async () => {
     try {
-      const [drivesRes, appsRes] = await Promise.all([
-        axios.get(`${API_URL}/drives`),
-        axios.get(`${API_URL}/applications`)
-      ]);
-      setDrives(drivesRes.data);
-      setApplications(appsRes.data);
+      const response = await axios.get(`${API_URL}/dashboard/admin`);
+      setDrives(response.data.drives);
+      setApplications(response.data.applications);
     } catch (error) {
       toast.error('Failed to fetch data');
     } finally {
@@ -279,12 +277,9 @@ const AllApplicants = () => {
 
   const fetchData = async () => {
     try {
-      const [appsRes, drivesRes] = await Promise.all([
-        axios.get(`${API_URL}/applications`),
-        axios.get(`${API_URL}/drives`)
-      ]);
-      setApplications(appsRes.data);
-      setDrives(drivesRes.data);
+      const response = await axios.get(`${API_URL}/dashboard/admin`);
+      setApplications(response.data.applications);
+      setDrives(response.data.drives);
     } catch (error) {
       toast.error('Failed to fetch data');
     } finally {
@@ -939,12 +934,9 @@ const Applicants = () => {
 
   const fetchData = async () => {
     try {
-      const [driveRes, appsRes] = await Promise.all([
-        axios.get(`${API_URL}/drives/${driveId}`),
-        axios.get(`${API_URL}/applications/drive/${driveId}`)
-      ]);
-      setDrive(driveRes.data);
-      setApplications(appsRes.data);
+      const response = await axios.get(`${API_URL}/dashboard/admin/drive/${driveId}`);
+      setDrive(response.data.drive);
+      setApplications(response.data.applications);
     } catch (error) {
       toast.error('Failed to fetch applicants');
     } finally {
@@ -963,11 +955,11 @@ const Applicants = () => {
       toast.success('Status updated successfully');
       fetchData();
     } catch (error) {
-      toast.error('Failed to update status');
+      toast.error(error.response?.data?.detail || 'Failed to update status');
     }
   };
 
-  const statusOptions = ['applied', 'shortlisted', 'interview', 'selected', 'rejected'];
+  const statusOptions = ['applied', 'shortlisted', 'interview', 'waitlisted', 'selected', 'rejected'];
 
   if (loading) {
     return (
@@ -1459,6 +1451,112 @@ const UploadShortlist = () => {
   );
 };
 
+const splitList = (value) => value.split(',').map((item) => item.trim()).filter(Boolean);
+
+const Broadcast = () => {
+  const [loading, setLoading] = useState(false);
+  const [form, setForm] = useState({ message: '', departments: '', batches: '', min_cgpa: '', skills: '' });
+
+  const handleSubmit = async (e) => {
+    e.preventDefault();
+    const audience = {
+      departments: splitList(form.departments),
+      batches: splitList(form.batches).map(Number).filter(Number.isInteger),
+      skills: splitList(form.skills)
+    };
+    if (form.min_cgpa !== '') {
+      audience.min_cgpa = parseFloat(form.min_cgpa);
+    }
+
+    setLoading(true);
+    try {
+      const response = await axios.post(`${API_URL}/notifications/broadcast`, { message: form.message, audience });
+      toast.success(`Notification sent to ${response.data.recipients} students`);
+      setForm({ ...form, message: '' });
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to send notification');
+    } finally {
+      setLoading(false);
+    }
+  };
+
+  return (
+    <div className="space-y-6">
+      <div>
+        <h2 className="text-3xl font-bold tracking-tight mb-2">Broadcast</h2>
+        <p className="text-muted-foreground">Notify students by department, batch, CGPA or skills</p>
+      </div>
+
+      <Card className="max-w-2xl">
+        <CardHeader>
+          <CardTitle>New Notification</CardTitle>
+          <CardDescription>Leave a filter empty to include every student. Unread notifications are also emailed in the next digest.</CardDescription>
+        </CardHeader>
+        <CardContent>
+          <form onSubmit={handleSubmit} className="space-y-4">
+            <div>
+              <Label htmlFor="broadcast-message">Message *</Label>
+              <Textarea
+                id="broadcast-message"
+                value={form.message}
+                onChange={(e) => setForm({ ...form, message: e.target.value })}
+                maxLength={500}
+                required
+                data-testid="broadcast-message"
+              />
+            </div>
+            <div className="grid grid-cols-1 md:grid-cols-2 gap-4">
+              <div>
+                <Label htmlFor="broadcast-departments">Departments</Label>
+                <Input
+                  id="broadcast-departments"
+                  placeholder="CSE, ECE"
+                  value={form.departments}
+                  onChange={(e) => setForm({ ...form, departments: e.target.value })}
+                />
+              </div>
+              <div>
+                <Label htmlFor="broadcast-batches">Batches</Label>
+                <Input
+                  id="broadcast-batches"
+                  placeholder="2025, 2026"
+                  value={form.batches}
+                  onChange={(e) => setForm({ ...form, batches: e.target.value })}
+                />
+              </div>
+              <div>
+                <Label htmlFor="broadcast-cgpa">Minimum CGPA</Label>
+                <Input
+                  id="broadcast-cgpa"
+                  type="number"
+                  step="0.01"
+                  min="0"
+                  max="10"
+                  value={form.min_cgpa}
+                  onChange={(e) => setForm({ ...form, min_cgpa: e.target.value })}
+                />
+              </div>
+              <div>
+                <Label htmlFor="broadcast-skills">Skills (any of)</Label>
+                <Input
+                  id="broadcast-skills"
+                  placeholder="Python, Java"
+                  value={form.skills}
+                  onChange={(e) => setForm({ ...form, skills: e.target.value })}
+                />
+              </div>
+            </div>
+            <Button type="submit" disabled={loading || !form.message.trim()} data-testid="broadcast-submit">
+              {loading ? 'Sending...' : 'Send Notification'}
+              <Bell className="w-4 h-4 ml-2" />
+            </Button>
+          </form>
+        </CardContent>
+      </Card>
+    </div>
+  );
+};
+
 export default function AdminDashboard() {
   const location = useLocation();
   const path = location.pathname;
@@ -1470,6 +1568,8 @@ export default function AdminDashboard() {
     activeTab = 'shortlist';
   } else if (path.includes('/analytics')) {
     activeTab = 'analytics';
+  } else if (path.includes('/broadcast')) {
+    activeTab = 'broadcast';
   }
 
   return (
@@ -1483,6 +1583,7 @@ export default function AdminDashboard() {
           <Route path="/all-applicants" element={<AllApplicants />} />
           <Route path="/shortlist" element={<UploadShortlist />} />
           <Route path="/analytics" element={<Analytics />} />
+          <Route path="/broadcast" element={<Broadcast />} />
         </Routes>
       </main>
     </div>
@@ -33,6 +33,7 @@ import {
 } from 'lucide-react';
 
 const API_URL = process.env.REACT_APP_BACKEND_URL + '/api';
+const RESUME_MAX_BYTES = 5 * 1024 * 1024;
 
 const Sidebar = ({ active }) => {
   const { user, logout } = useAuth();
@@ -137,12 +138,9 @@ const AvailableDrives = () => {
 
   const fetchData = async () => {
     try {
-      const [drivesRes, appsRes] = await Promise.all([
-        axios.get(`${API_URL}/drives`),
-        axios.get(`${API_URL}/applications`)
-      ]);
-      setDrives(drivesRes.data);
-      setApplications(appsRes.data);
+      const response = await axios.get(`${API_URL}/dashboard/student`);
+      setDrives(response.data.drives);
+      setApplications(response.data.applications);
     } catch (error) {
       toast.error('Failed to fetch drives');
     } finally {
@@ -161,7 +159,7 @@ const AvailableDrives = () => {
     }
   };
 
-  const appliedDriveIds = applications.map(app => app.drive_id);
+  const appliedDriveIds = drives.filter(drive => drive.applied).map(drive => drive.id);
   
   // Get unique locations for filter
   const locations = [...new Set(drives.map(d => d.location))];
@@ -195,7 +193,7 @@ const AvailableDrives = () => {
     });
 
   const appliedCount = applications.length;
-  const availableCount = drives.length - appliedCount;
+  const availableCount = drives.length - appliedDriveIds.length;
 
   if (loading) {
     return (
@@ -871,6 +869,7 @@ const Profile = () => {
   const [editing, setEditing] = useState(false);
   const [formData, setFormData] = useState({});
   const [activeTab, setActiveTab] = useState('personal');
+  const [uploadingResume, setUploadingResume] = useState(false);
 
   useEffect(() => {
     fetchProfile();
@@ -910,7 +909,7 @@ const Profile = () => {
     const fields = [
       profile.name, profile.email, profile.department, profile.batch, profile.cgpa,
       profile.phone, profile.dob, profile.gender, profile.address, profile.bio,
-      profile.linkedin, profile.github, profile.resume_link,
+      profile.linkedin, profile.github, profile.resume_link || profile.resume,
       profile.tenth_marks, profile.twelfth_marks,
       profile.skills?.length > 0, profile.languages?.length > 0,
       profile.certifications?.length > 0, profile.projects?.length > 0
@@ -919,6 +918,79 @@ const Profile = () => {
     return Math.round((completed / fields.length) * 100);
   };
 
+  const handleResumeUpload = async (e) => {
+    const file = e.target.files[0];
+    e.target.value = '';
+    if (!file) return;
+    if (file.size > RESUME_MAX_BYTES) {
+      toast.error('Resume must be 5 MB or smaller');
+      return;
+    }
+    setUploadingResume(true);
+    try {
+      // Sent as the raw body so the server can stream it to storage
+      const response = await axios.put(`${API_URL}/profile/resume`, file, {
+        headers: { 'Content-Type': file.type || 'application/octet-stream' },
+        params: { filename: file.name }
+      });
+      setProfile(response.data);
+      setFormData((current) => ({
+        ...current,
+        resume: response.data.resume,
+        resume_url: response.data.resume_url,
+        resume_skills: null
+      }));
+      toast.success('Resume uploaded');
+      pollResumeSkills();
+    } catch (error) {
+      toast.error(error.response?.data?.detail || 'Failed to upload resume');
+    } finally {
+      setUploadingResume(false);
+    }
+  };
+
+  // Skills are extracted from the resume in the background after upload
+  const pollResumeSkills = async (attempt = 0) => {
+    if (attempt >= 10) return;
+    await new Promise((resolve) => setTimeout(resolve, 1500));
+    try {
+      const response = await axios.get(`${API_URL}/profile`);
+      if (response.data.resume_skills === null) {
+        pollResumeSkills(attempt + 1);
+        return;
+      }
+      setProfile((current) => ({ ...current, resume_skills: response.data.resume_skills }));
+      setFormData((current) => ({ ...current, resume_skills: response.data.resume_skills }));
+    } catch (error) {
+      // Suggestions are optional; they appear on the next profile load
+    }
+  };
+
+  const handleResumeDelete = async () => {
+    try {
+      const response = await axios.delete(`${API_URL}/profile/resume`);
+      setProfile(response.data);
+      setFormData((current) => ({ ...current, resume: null, resume_url: null, resume_skills: null }));
+      toast.success('Resume removed');
+    } catch (error) {
+      toast.error('Failed to remove resume');
+    }
+  };
+
+  const handleResumeDownload = async () => {
+    try {
+      const response = await axios.get(`${process.env.REACT_APP_BACKEND_URL}${profile.resume_url}`, { responseType: 'blob' });
+      const url = window.URL.createObjectURL(response.data);
+      const link = document.createElement('a');
+      link.href = url;
+      link.download = profile.resume.filename;
+      link.click();
+      window.URL.revokeObjectURL(url);
+    } catch (error) {
+      toast.error('Failed to download resume');
+    }
+  };
+
   const handleSubmit = async (e) => {
     e.preventDefault();
     setLoading(true);
@@ -1262,6 +1334,26 @@ const Profile = () => {
                       {(!formData.skills || formData.skills.length === 0) && (
                         <p className="text-sm text-muted-foreground">No skills added yet. Add skills like Python, JavaScript, React, etc.</p>
                       )}
+                      {formData.resume_skills?.some((skill) => !formData.skills?.some((s) => s.toLowerCase() === skill.toLowerCase())) && (
+                        <div className="space-y-2" data-testid="resume-skill-suggestions">
+                          <p className="text-sm text-muted-foreground">Found in your resume (click to add):</p>
+                          <div className="flex flex-wrap gap-2">
+                            {formData.resume_skills
+                              .filter((skill) => !formData.skills?.some((s) => s.toLowerCase() === skill.toLowerCase()))
+                              .map((skill) => (
+                                <Badge
+                                  key={skill}
+                                  variant="outline"
+                                  className="px-3 py-1 text-sm cursor-pointer hover:bg-muted"
+                                  onClick={() => setFormData({ ...formData, skills: [...(formData.skills || []), skill] })}
+                                >
+                                  <Plus className="w-3 h-3 mr-1" />
+                                  {skill}
+                                </Badge>
+                              ))}
+                          </div>
+                        </div>
+                      )}
                     </div>
                   </div>
 
@@ -1375,6 +1467,25 @@ const Profile = () => {
                       data-testid="resume-link-input"
                     />
                   </div>
+                  <div className="space-y-2">
+                    <Label htmlFor="resume_file">Upload Resume (PDF, DOC or DOCX, max 5 MB)</Label>
+                    <Input
+                      id="resume_file"
+                      type="file"
+                      accept=".pdf,.doc,.docx,application/pdf,application/msword,application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+                      onChange={handleResumeUpload}
+                      disabled={uploadingResume}
+                      data-testid="resume-file-input"
+                    />
+                    {formData.resume && (
+                      <div className="flex items-center justify-between text-sm text-muted-foreground">
+                        <span>{formData.resume.filename} ({Math.ceil(formData.resume.size / 1024)} KB)</span>
+                        <Button type="button" variant="ghost" size="sm" onClick={handleResumeDelete} data-testid="resume-delete-button">
+                          <Trash2 className="w-4 h-4" />
+                        </Button>
+                      </div>
+                    )}
+                  </div>
                 </div>
               </div>
 
@@ -1664,6 +1775,22 @@ const Profile = () => {
                       </div>
                     </a>
                   )}
+                  {profile?.resume && (
+                    <button
+                      type="button"
+                      onClick={handleResumeDownload}
+                      className="flex items-center gap-3 p-3 rounded-lg border hover:bg-muted transition-colors text-left"
+                      data-testid="resume-download-button"
+                    >
+                      <div className="w-10 h-10 rounded-full bg-green-500 flex items-center justify-center text-white">
+                        <Upload className="w-5 h-5" />
+                      </div>
+                      <div>
+                        <p className="text-sm font-medium">Uploaded Resume</p>
+                        <p className="text-xs text-muted-foreground">{profile.resume.filename} →</p>
+                      </div>
+                    </button>
+                  )}
                   {profile?.resume_link && (
                     <a 
                       href={profile.resume_link} 
@@ -1681,7 +1808,7 @@ const Profile = () => {
                     </a>
                   )}
                 </div>
-                {!profile?.linkedin && !profile?.github && !profile?.portfolio && !profile?.resume_link && (
+                {!profile?.linkedin && !profile?.github && !profile?.portfolio && !profile?.resume_link && !profile?.resume && (
                   <p className="text-muted-foreground text-sm">No links added yet</p>
                 )}
               </div>
@@ -0,0 +1,102 @@
+import asyncio
+import itertools
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent / 'backend'
+sys.path.insert(0, str(BACKEND_DIR))
+
+# The suite runs on the in-memory store and needs no MongoDB, Redis or SMTP
+# server. Set before server.py is imported (its settings are read at import).
+os.environ['STORAGE_BACKEND'] = 'memory'
+os.environ.setdefault('JWT_SECRET', 'test-secret-' + 'x' * 52)
+os.environ.setdefault('DB_NAME', 'placement_flow_test')
+os.environ['RATE_LIMIT_STORE'] = 'memory'
+os.environ['RATE_LIMIT_ENABLED'] = 'false'
+os.environ['DRIVE_SCHEDULER_ENABLED'] = 'false'
+os.environ['DIGEST_ENABLED'] = 'false'
+os.environ['RESUME_STORE'] = 'local'
+os.environ['RESUME_STORE_PATH'] = tempfile.mkdtemp(prefix='placement_flow_resumes_')
+os.environ['RESUME_EXTRACT_WORKERS'] = '0'
+
+from drive_search import package_fields  # noqa: E402
+from storage.memory import MemoryStorage  # noqa: E402
+
+_ids = itertools.count(1)
+
+def drive_doc(**overrides) -> dict:
+    """A stored placement drive, as create_drive writes it"""
+    drive = {
+        'id': f"drive_{next(_ids)}",
+        'company_name': 'Acme',
+        'company_domain': 'Tech',
+        'job_role': 'SDE',
+        'package': '12-15 LPA',
+        'location': 'Pune',
+        'job_description': 'Build things',
+        'eligibility': {'min_cgpa': 7.0, 'required_skills': ['Python'], 'departments': ['CSE'], 'batches': [2025]},
+        'deadline': '2099-01-01',
+        'created_at': '2025-01-01T00:00:00+00:00',
+    }
+    drive.update(overrides)
+    return {**drive, **package_fields(drive['package'])}
+
+def profile_doc(user_id: str, **overrides) -> dict:
+    profile = {
+        'id': f"profile_{user_id}",
+        'user_id': user_id,
+        'name': f"Student {user_id}",
+        'email': f"{user_id}@college.edu",
+        'department': 'CSE',
+        'batch': 2025,
+        'cgpa': 8.0,
+        'skills': ['Python'],
+        'resume_url': None,
+    }
+    profile.update(overrides)
+    return profile
+
+@pytest.fixture
+def anyio_backend():
+    return 'asyncio'
+
+@pytest.fixture
+def storage():
+    return MemoryStorage()
+
+@pytest.fixture(scope='session')
+def client():
+    from fastapi.testclient import TestClient
+    import server
+    with TestClient(server.app) as test_client:
+        yield test_client
+
+@pytest.fixture
+def api(client):
+    """The TestClient over an empty store"""
+    import server
+    server.storage.__init__()
+    return client
+
+@pytest.fixture
+def admin(api):
+    return add_user('admin')
+
+@pytest.fixture
+def student(api):
+    return add_user('student')
+
+def add_user(role: str, **profile) -> dict:
+    """Store a user (and a student's profile) directly, skipping bcrypt; returns its id and auth headers"""
+    import server
+    user_id = f"user_{next(_ids)}"
+    user = {'id': user_id, 'email': f"{user_id}@college.edu", 'password_hash': '', 'role': role,
+            'name': f"User {user_id}", 'created_at': '2025-01-01T00:00:00+00:00'}
+    asyncio.run(server.storage.users.insert(user))
+    if role == 'student':
+        asyncio.run(server.storage.profiles.insert(profile_doc(user_id, **profile)))
+    return {'user_id': user_id, 'headers': {'Authorization': f"Bearer {server.create_token(user_id, role)}"}}
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import jwt
+import pytest
+
+from admission import ADMISSION_RULES, AdmissionController, AdmissionMiddleware, PriorityClass
+
+pytestmark = pytest.mark.anyio
+
+def classes(interactive_limit=10, heavy_limit=1, heavy_queue=1, heavy_timeout=0.2) -> dict:
+    return {
+        'interactive': PriorityClass('interactive', 0, interactive_limit, 100, 5),
+        'heavy': PriorityClass('heavy', 1, heavy_limit, heavy_queue, heavy_timeout),
+    }
+
+def bearer(role: str) -> dict:
+    return {'Authorization': f"Bearer {jwt.encode({'role': role}, 'unverified-' + 'x' * 32, algorithm='HS256')}"}
+
+class GatedApp:
+    """ASGI app whose requests block until the gate opens"""
+
+    def __init__(self):
+        self.gate = asyncio.Event()
+        self.started = 0
+
+    async def __call__(self, scope, receive, send):
+        self.started += 1
+        if scope['path'].startswith('/api/analytics'):  # only the heavy route is slow
+            await self.gate.wait()
+        await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+        await send({'type': 'http.response.body', 'body': b'ok'})
+
+def client_for(app) -> httpx.AsyncClient:
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url='http://test')
+
+async def until(condition) -> None:
+    for _ in range(200):
+        if condition():
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError('condition not reached')
+
+def test_classify():
+    controller = AdmissionController(classes=classes())
+
+    def classified(method, path, headers=()):
+        scope = {'method': method, 'path': path,
+                 'headers': [(k.lower().encode(), v.encode()) for k, v in dict(headers).items()]}
+        priority_class, r = controller.classify(scope)
+        return priority_class.name, r.name if r else None
+
+    assert classified('GET', '/api/analytics/funnel') == ('heavy', 'analytics')
+    assert classified('GET', '/api/drives/d1/ranking') == ('heavy', 'ranking')
+    assert classified('POST', '/api/notifications/broadcast') == ('heavy', 'notification_bulk')
+    assert classified('GET', '/api/applications', bearer('admin')) == ('heavy', 'all_applications')
+    assert classified('GET', '/api/applications', bearer('student')) == ('interactive', None)
+    assert classified('POST', '/api/applications') == ('interactive', None)
+
+async def test_heavy_routes_are_shed_while_interactive_ones_get_through():
+    app = GatedApp()
+    middleware = AdmissionMiddleware(app, AdmissionController(classes=classes()), enabled=True)
+    async with client_for(middleware) as client:
+        running = asyncio.create_task(client.get('/api/analytics'))  # takes the only heavy slot
+        await until(lambda: app.started == 1)
+        queued = asyncio.create_task(client.get('/api/analytics'))  # fills the heavy queue
+        await until(lambda: middleware.controller._queued['heavy'] == 1)
+
+        shed = await client.get('/api/analytics')
+        assert shed.status_code == 503
+        assert shed.headers['Retry-After'] == '1'
+        assert shed.json() == {'detail': 'Server is busy, please retry shortly'}
+
+        # Student traffic is unaffected by the saturated heavy class
+        assert (await client.get('/api/drives')).status_code == 200
+        assert (await client.get('/health')).status_code == 200  # exempt
+
+        timed_out = await queued
+        assert timed_out.status_code == 503 and 'Retry-After' in timed_out.headers
+        app.gate.set()
+        assert (await running).status_code == 200
+    assert middleware.controller.in_flight == 0
+
+async def test_waiters_are_admitted_by_priority():
+    controller = AdmissionController(rules=ADMISSION_RULES, classes=classes(heavy_limit=5, heavy_queue=5),
+                                     max_in_flight=1)
+    interactive, heavy = controller.classes['interactive'], controller.classes['heavy']
+    await controller.acquire(interactive, None)
+
+    order = []
+    async def request(priority_class):
+        await controller.acquire(priority_class, None)
+        order.append(priority_class.name)
+        controller.release(priority_class, None)
+
+    waiting = [asyncio.create_task(request(heavy))]
+    await until(lambda: controller._queued['heavy'] == 1)
+    waiting.append(asyncio.create_task(request(interactive)))
+    await until(lambda: controller._queued['interactive'] == 1)
+
+    controller.release(interactive, None)
+    await asyncio.gather(*waiting)
+    assert order == ['interactive', 'heavy']  # queued later, served first
+    assert controller.in_flight == 0
@@ -0,0 +1,86 @@
+from tests.conftest import add_user
+
+DRIVE = {
+    'company_name': 'Acme',
+    'company_domain': 'Tech',
+    'job_role': 'SDE',
+    'package': '12-15 LPA',
+    'location': 'Pune',
+    'job_description': 'Build things',
+    'eligibility': {'min_cgpa': 7.0, 'required_skills': ['python'], 'departments': ['CSE'], 'batches': [2025]},
+    'deadline': '2099-01-01',
+}
+
+def create_drive(api, admin, **overrides):
+    response = api.post('/api/drives', json={**DRIVE, **overrides}, headers=admin['headers'])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_register_and_login(api):
+    user = {'email': 'New.Student@College.edu', 'password': 'Passw0rd!', 'role': 'student', 'name': 'New'}
+    response = api.post('/api/auth/register', json=user)
+    assert response.status_code == 200, response.text
+    assert response.json()['role'] == 'student'
+
+    assert api.post('/api/auth/register', json=user).status_code == 400
+    login = api.post('/api/auth/login', json={'email': 'new.student@college.edu', 'password': 'Passw0rd!'})
+    assert login.status_code == 200
+    headers = {'Authorization': f"Bearer {login.json()['token']}"}
+    assert api.get('/api/profile', headers=headers).json()['email'] == 'new.student@college.edu'
+    assert api.post('/api/auth/login', json={'email': user['email'], 'password': 'wrong'}).status_code == 401
+
+def test_routes_require_auth_and_role(api, student):
+    assert api.get('/api/drives').status_code in (401, 403)
+    assert api.post('/api/drives', json=DRIVE, headers=student['headers']).status_code == 403
+
+def test_drive_is_listed_only_for_eligible_students(api, admin, student):
+    ineligible = add_user('student', cgpa=6.0)
+    drive = create_drive(api, admin)
+    assert [d['id'] for d in api.get('/api/drives', headers=student['headers']).json()] == [drive['id']]
+    assert api.get('/api/drives', headers=ineligible['headers']).json() == []
+    # Eligible students are notified of the new drive
+    notifications = api.get('/api/notifications', headers=student['headers']).json()
+    assert [n['message'] for n in notifications] == ['New placement drive: Acme - SDE']
+    assert api.get('/api/notifications', headers=ineligible['headers']).json() == []
+
+def test_apply_and_update_status(api, admin, student):
+    drive = create_drive(api, admin)
+    response = api.post('/api/applications', json={'drive_id': drive['id']}, headers=student['headers'])
+    assert response.status_code == 200, response.text
+    application = response.json()
+    assert application['status'] == 'applied'
+    assert api.post('/api/applications', json={'drive_id': drive['id']},
+                    headers=student['headers']).status_code == 400
+
+    response = api.put(f"/api/applications/{application['id']}/status", json={'status': 'shortlisted'},
+                       headers=admin['headers'])
+    assert response.status_code == 200
+    assert response.json()['status'] == 'shortlisted'
+    timeline = api.get(f"/api/applications/{application['id']}/timeline", headers=student['headers']).json()
+    assert [(e['from_status'], e['to_status']) for e in timeline] == [(None, 'applied'), ('applied', 'shortlisted')]
+
+def test_apply_to_missing_or_closed_drive(api, admin, student):
+    assert api.post('/api/applications', json={'drive_id': 'missing'}, headers=student['headers']).status_code == 404
+    drive = create_drive(api, admin, deadline='2020-01-01')
+    assert api.post('/api/applications', json={'drive_id': drive['id']}, headers=student['headers']).status_code == 400
+
+def test_profile_update_notifies_newly_eligible_drives(api, admin):
+    student = add_user('student', cgpa=6.5)
+    create_drive(api, admin)
+    assert api.get('/api/notifications', headers=student['headers']).json() == []
+    response = api.put('/api/profile', json={'cgpa': 8.5}, headers=student['headers'])
+    assert response.status_code == 200
+    messages = [n['message'] for n in api.get('/api/notifications', headers=student['headers']).json()]
+    assert messages == ['You are now eligible for: Acme - SDE']
+
+def test_notifications_read(api, admin, student):
+    create_drive(api, admin)
+    create_drive(api, admin, job_role='Analyst')
+    notifications = api.get('/api/notifications', headers=student['headers']).json()
+    other = add_user('student')
+    assert api.put(f"/api/notifications/{notifications[0]['id']}/read",
+                   headers=other['headers']).status_code == 404
+    assert api.put(f"/api/notifications/{notifications[0]['id']}/read",
+                   headers=student['headers']).status_code == 200
+    assert api.put('/api/notifications/read-all', headers=student['headers']).status_code == 200
+    assert all(n['read'] for n in api.get('/api/notifications', headers=student['headers']).json())
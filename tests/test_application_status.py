@@ -0,0 +1,58 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from application_status import applied_event, status_event, transition_error
+from tests.test_api import create_drive
+
+@pytest.mark.parametrize('current, new', [
+    ('applied', 'shortlisted'),
+    ('applied', 'selected'),  # stages may be skipped
+    ('waitlisted', 'shortlisted'),
+])
+def test_allowed_transitions(current, new):
+    assert transition_error(current, new) is None
+
+@pytest.mark.parametrize('current, new', [
+    ('shortlisted', 'applied'),
+    ('interview', 'shortlisted'),
+    ('selected', 'rejected'),  # final
+    ('rejected', 'rejected'),
+    ('applied', 'hired'),
+])
+def test_rejected_transitions(current, new):
+    assert transition_error(current, new) == f"Cannot move an application from '{current}' to '{new}'"
+
+def test_status_event_records_time_in_previous_stage():
+    app = {'id': 'app_1', 'student_id': 's1', 'drive_id': 'd1', 'status': 'shortlisted',
+           'applied_at': '2025-01-01T00:00:00+00:00', 'status_changed_at': '2025-01-02T00:00:00+00:00'}
+    event = status_event(app, 'interview', datetime(2025, 1, 2, 6, tzinfo=timezone.utc), actor='admin_1')
+    assert (event['from_status'], event['to_status'], event['actor']) == ('shortlisted', 'interview', 'admin_1')
+    assert event['entered_at'] == '2025-01-02T00:00:00+00:00'
+    assert event['duration_seconds'] == 6 * 3600
+
+    del app['status_changed_at']  # applications predating events fall back to applied_at
+    assert status_event(app, 'interview', datetime(2025, 1, 2, tzinfo=timezone.utc))['duration_seconds'] == 86400
+    assert applied_event(app)['to_status'] == 'applied'
+
+def test_status_updates_feed_the_funnel(api, admin, student):
+    drive = create_drive(api, admin)
+    app_id = api.post('/api/applications', json={'drive_id': drive['id']}, headers=student['headers']).json()['id']
+    status = f"/api/applications/{app_id}/status"
+    for new_status in ('shortlisted', 'selected'):
+        assert api.put(status, json={'status': new_status}, headers=admin['headers']).status_code == 200
+    response = api.put(status, json={'status': 'rejected'}, headers=admin['headers'])
+    assert response.status_code == 400
+    assert response.json()['detail'] == "Cannot move an application from 'selected' to 'rejected'"
+
+    funnel = api.get('/api/analytics/funnel', params={'drive_id': drive['id']}, headers=admin['headers']).json()
+    assert funnel['funnel'] == {'applied': 1, 'shortlisted': 1, 'selected': 1}
+    assert set(funnel['time_in_stage']) == {'applied', 'shortlisted'}
+
+def test_withdrawal_is_kept_in_the_timeline(api, admin, student):
+    drive = create_drive(api, admin)
+    app_id = api.post('/api/applications', json={'drive_id': drive['id']}, headers=student['headers']).json()['id']
+    assert api.delete(f"/api/applications/{app_id}", headers=student['headers']).status_code == 200
+    assert api.get('/api/applications', headers=student['headers']).json() == []
+    timeline = api.get(f"/api/applications/{app_id}/timeline", headers=admin['headers']).json()
+    assert [e['to_status'] for e in timeline] == ['applied', 'withdrawn']
@@ -0,0 +1,92 @@
+import asyncio
+
+import pytest
+
+from application_status import applied_event
+from cascade import DriveDeletionCascade
+from tests.conftest import drive_doc
+
+async def add_drive_with_applications(storage, count: int) -> dict:
+    drive = drive_doc()
+    await storage.drives.insert(drive)
+    for i in range(count):
+        app = {'id': f"{drive['id']}_app_{i}", 'student_id': f"s{i}", 'drive_id': drive['id'], 'status': 'applied',
+               'applied_at': '2025-01-01T00:00:00+00:00'}
+        await storage.applications.insert(app)
+        await storage.application_events.insert_many([applied_event(app)])
+        await storage.notifications.insert({'id': f"{app['id']}_notif", 'user_id': app['student_id'],
+                                            'drive_id': drive['id'], 'message': 'New drive', 'read': False,
+                                            'created_at': '2025-01-01T00:00:00+00:00'})
+    return drive
+
+async def assert_removed(storage, drive_id: str) -> None:
+    assert await storage.applications.list_by_drive(drive_id) == []
+    assert await storage.application_events.funnel(drive_id) == {}
+    assert await storage.notifications.list_for_user('s0') == []
+    assert await storage.drives.list_deleted() == []
+
+@pytest.mark.anyio
+async def test_cascade_deletes_in_batches(storage):
+    drive = await add_drive_with_applications(storage, 5)
+    await storage.drives.soft_delete(drive['id'], '2025-01-02T00:00:00+00:00')
+    deleted = await DriveDeletionCascade(storage, batch_size=2, pause=0).run(drive['id'])
+    assert deleted == {'applications': 5, 'application_events': 5, 'notifications': 5}
+    await assert_removed(storage, drive['id'])
+
+@pytest.mark.anyio
+async def test_resume_finishes_interrupted_cascades(storage):
+    kept = await add_drive_with_applications(storage, 1)
+    deleted = [await add_drive_with_applications(storage, 3) for _ in range(2)]
+    for drive in deleted:
+        await storage.drives.soft_delete(drive['id'], '2025-01-02T00:00:00+00:00')
+
+    cascade = DriveDeletionCascade(storage, batch_size=2, pause=0)
+    assert await cascade.resume() == 2
+    await cascade.drain()
+    for drive in deleted:
+        assert await storage.applications.list_by_drive(drive['id']) == []
+    assert await storage.drives.list_deleted() == []
+    assert len(await storage.applications.list_by_drive(kept['id'])) == 1
+
+@pytest.mark.anyio
+async def test_cancelled_cascade_is_resumable(storage):
+    drive = await add_drive_with_applications(storage, 6)
+    await storage.drives.soft_delete(drive['id'], '2025-01-02T00:00:00+00:00')
+    cascade = DriveDeletionCascade(storage, batch_size=2, pause=0.05)
+    cascade.start(drive['id'])
+    await asyncio.sleep(0.01)
+    await cascade.stop()  # shutdown mid-cascade
+    assert [d['id'] for d in await storage.drives.list_deleted()] == [drive['id']]
+
+    remaining = len(await storage.applications.list_by_drive(drive['id']))
+    assert 0 < remaining < 6
+    finished = await cascade.run_pending()
+    assert finished[drive['id']]['applications'] == remaining
+    await assert_removed(storage, drive['id'])
+
+def test_deleted_drive_is_hidden_and_cascade_endpoint_finishes_it(api, admin, student):
+    import server
+    response = api.post('/api/drives', json={
+        'company_name': 'Acme', 'company_domain': 'Tech', 'job_role': 'SDE', 'package': '10 LPA',
+        'location': 'Pune', 'job_description': 'Build things', 'deadline': '2099-01-01',
+        'eligibility': {'min_cgpa': 7.0, 'required_skills': [], 'departments': ['CSE'], 'batches': [2025]},
+    }, headers=admin['headers'])
+    drive_id = response.json()['id']
+    assert api.post('/api/applications', json={'drive_id': drive_id}, headers=student['headers']).status_code == 200
+
+    # Soft delete only, as on serverless where the background cascade never runs
+    asyncio.run(server.storage.drives.soft_delete(drive_id, '2025-01-02T00:00:00+00:00'))
+    assert api.get(f"/api/drives/{drive_id}", headers=admin['headers']).status_code == 404
+    # Its applications are hidden before the cascade removes them
+    assert api.get('/api/applications', headers=student['headers']).json() == []
+    assert api.get('/api/applications', headers=admin['headers']).json() == []
+    assert api.get(f"/api/applications/drive/{drive_id}", headers=admin['headers']).json() == []
+    assert api.get('/api/dashboard/student', headers=student['headers']).json()['applications'] == []
+    assert api.get('/api/dashboard/admin', headers=admin['headers']).json()['applications'] == []
+
+    assert api.post('/api/drives/cascade/run', headers=student['headers']).status_code == 403
+    response = api.post('/api/drives/cascade/run', headers=admin['headers'])
+    assert response.status_code == 200
+    assert response.json()['deleted'][drive_id]['applications'] == 1
+    assert api.get('/api/applications', headers=student['headers']).json() == []
+    assert asyncio.run(server.storage.drives.list_deleted()) == []
@@ -0,0 +1,69 @@
+from tests.conftest import add_user
+from tests.test_api import DRIVE, create_drive
+
+def apply(api, student, drive) -> dict:
+    response = api.post('/api/applications', json={'drive_id': drive['id']}, headers=student['headers'])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def test_student_dashboard_flags_applied_drives(api, admin, student):
+    applied = create_drive(api, admin, company_name='Acme')
+    other = create_drive(api, admin, company_name='Globex', deadline='2099-02-01')
+    application = apply(api, student, applied)
+
+    response = api.get('/api/dashboard/student', headers=student['headers'])
+    assert response.status_code == 200, response.text
+    dashboard = response.json()
+    assert dashboard['profile'] == api.get('/api/profile', headers=student['headers']).json()
+    assert {d['id']: d['applied'] for d in dashboard['drives']} == {applied['id']: True, other['id']: False}
+    assert [(a['id'], a['company_name'], a['student_name']) for a in dashboard['applications']] == [
+        (application['id'], 'Acme', f"Student {student['user_id']}")
+    ]
+
+    # The same data the two separate requests return
+    listed = api.get('/api/drives', headers=student['headers']).json()
+    assert [{k: v for k, v in d.items() if k != 'applied'} for d in dashboard['drives']] == listed
+    assert dashboard['applications'] == api.get('/api/applications', headers=student['headers']).json()
+
+def test_student_dashboard_leaves_out_closed_and_ineligible_drives(api, admin, student):
+    open_drive = create_drive(api, admin)
+    create_drive(api, admin, company_name='Expired', deadline='2020-01-01')
+    create_drive(api, admin, company_name='Strict', eligibility={**DRIVE['eligibility'], 'min_cgpa': 9.5})
+    closing = create_drive(api, admin, company_name='Closing')
+    application = apply(api, student, closing)
+    assert api.put(f"/api/drives/{closing['id']}", json={'status': 'closed'}, headers=admin['headers']).status_code == 200
+
+    dashboard = api.get('/api/dashboard/student', headers=student['headers']).json()
+    assert [d['id'] for d in dashboard['drives']] == [open_drive['id']]
+    # The application to the closed drive is still shown
+    assert [a['id'] for a in dashboard['applications']] == [application['id']]
+
+def test_student_dashboard_requires_a_student(api, admin):
+    assert api.get('/api/dashboard/student', headers=admin['headers']).status_code == 403
+    assert api.get('/api/dashboard/student').status_code in (401, 403)
+
+def test_admin_dashboard_lists_every_drive_and_application(api, admin, student):
+    classmate = add_user('student', name='Classmate')
+    first = create_drive(api, admin)
+    closed = create_drive(api, admin, company_name='Closed', status='closed', deadline='2020-01-01')
+    applications = [apply(api, student, first), apply(api, classmate, first)]
+
+    response = api.get('/api/dashboard/admin', headers=admin['headers'])
+    assert response.status_code == 200, response.text
+    dashboard = response.json()
+    assert {d['id'] for d in dashboard['drives']} == {first['id'], closed['id']}
+    assert {a['id'] for a in dashboard['applications']} == {a['id'] for a in applications}
+    assert {a['student_name'] for a in dashboard['applications']} == {f"Student {student['user_id']}", 'Classmate'}
+    assert api.get('/api/dashboard/admin', headers=student['headers']).status_code == 403
+
+def test_admin_drive_dashboard(api, admin, student):
+    drive = create_drive(api, admin)
+    other = create_drive(api, admin, company_name='Globex')
+    application = apply(api, student, drive)
+    apply(api, student, other)
+
+    dashboard = api.get(f"/api/dashboard/admin/drive/{drive['id']}", headers=admin['headers']).json()
+    assert dashboard['drive'] == drive
+    assert [(a['id'], a['company_name']) for a in dashboard['applications']] == [(application['id'], 'Acme')]
+    assert dashboard['applications'] == api.get(f"/api/applications/drive/{drive['id']}", headers=admin['headers']).json()
+    assert api.get('/api/dashboard/admin/drive/missing', headers=admin['headers']).status_code == 404
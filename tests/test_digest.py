@@ -0,0 +1,95 @@
+import socket
+from datetime import datetime, timezone
+from email import message_from_bytes
+
+import pytest
+
+from digest import DigestMailer
+from mailer import SMTPPool
+from tests.conftest import profile_doc
+
+aiosmtpd_controller = pytest.importorskip('aiosmtpd.controller')
+
+NOW = datetime(2025, 1, 2, 12, tzinfo=timezone.utc)
+
+class Sink:
+    """Local debugging SMTP server handler: records every message and the connection it came on"""
+
+    def __init__(self, reject=()):
+        self.reject = set(reject)
+        self.messages = []
+
+    async def handle_RCPT(self, server, session, envelope, address, rcpt_options):
+        if address in self.reject:
+            return '550 Mailbox unavailable'
+        envelope.rcpt_tos.append(address)
+        return '250 OK'
+
+    async def handle_DATA(self, server, session, envelope):
+        self.messages.append((session.peer, envelope.rcpt_tos[0], message_from_bytes(envelope.content)))
+        return '250 OK'
+
+    @property
+    def connections(self) -> set:
+        return {peer for peer, _, _ in self.messages}
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+@pytest.fixture
+def smtp_sink():
+    def start(**kwargs):
+        sink = Sink(**kwargs)
+        port = free_port()
+        controller = aiosmtpd_controller.Controller(sink, hostname='127.0.0.1', port=port)
+        controller.start()
+        started.append(controller)
+        return sink, SMTPPool(host='127.0.0.1', port=port, security='none', size=1, user=None)
+    started = []
+    yield start
+    for controller in started:
+        controller.stop()
+
+async def add_notifications(storage, user_id: str, messages, created_at: str = '2025-01-02T11:00:00+00:00'):
+    await storage.profiles.insert(profile_doc(user_id))
+    for i, message in enumerate(messages):
+        await storage.notifications.insert({'id': f"notif_{user_id}_{i}", 'user_id': user_id, 'message': message,
+                                            'read': False, 'created_at': created_at})
+
+@pytest.mark.anyio
+async def test_digest_batches_notifications_per_user_over_one_connection(storage, smtp_sink):
+    sink, pool = smtp_sink()
+    await add_notifications(storage, 'alice', ['New placement drive: Acme - SDE', 'Application shortlisted'])
+    await add_notifications(storage, 'bob', ['New placement drive: Initech - Analyst'])
+    await add_notifications(storage, 'carol', ['Already seen'])
+    await storage.notifications.mark_all_read('carol')
+
+    result = await DigestMailer(storage, pool).run_once(NOW)
+    assert result == {'notifications': 3, 'sent': 2, 'failed': 0, 'skipped': 0}
+    by_recipient = {to: message for _, to, message in sink.messages}
+    assert sorted(by_recipient) == ['alice@college.edu', 'bob@college.edu']
+    alice = by_recipient['alice@college.edu']
+    assert alice['Subject'] == 'You have 2 new notifications on Placement Flow'
+    assert '- New placement drive: Acme - SDE' in alice.get_payload()
+    assert '- Application shortlisted' in alice.get_payload()
+    assert len(sink.connections) == 1  # one pooled connection carried both emails
+
+    # Mailed notifications are not sent again by the next interval
+    assert (await DigestMailer(storage, pool).run_once(NOW))['notifications'] == 0
+    assert len(sink.messages) == 2
+
+@pytest.mark.anyio
+async def test_failed_digest_is_retried_next_interval(storage, smtp_sink):
+    sink, pool = smtp_sink(reject={'bob@college.edu'})
+    await add_notifications(storage, 'alice', ['Drive posted'])
+    await add_notifications(storage, 'bob', ['Drive posted'])
+
+    result = await DigestMailer(storage, pool).run_once(NOW)
+    assert (result['sent'], result['failed']) == (1, 1)
+
+    sink.reject.clear()
+    retry = await DigestMailer(storage, pool).run_once(NOW)
+    assert (retry['notifications'], retry['sent']) == (1, 1)
+    assert [to for _, to, _ in sink.messages] == ['alice@college.edu', 'bob@college.edu']
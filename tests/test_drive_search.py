@@ -0,0 +1,134 @@
+import pytest
+
+from drive_search import package_fields, parse_package_range
+from storage.memory import MemoryStorage
+from storage.mongo import MongoDriveRepository
+from tests.conftest import drive_doc, profile_doc
+from tests.test_api import DRIVE, create_drive
+
+@pytest.mark.parametrize('text, expected', [
+    ('12-15 LPA', (12.0, 15.0)),
+    ('15 LPA – 18 LPA', (15.0, 18.0)),
+    ('12 to 15 lakhs', (12.0, 15.0)),
+    ('6.5L', (6.5, 6.5)),
+    ('3.5 LPA + bonus', (3.5, 3.5)),
+    ('10', (10.0, 10.0)),
+    ('8,50,000', (8.5, 8.5)),
+    ('8,00,000 - 10,00,000', (8.0, 10.0)),
+    ('1.2 Cr', (120.0, 120.0)),
+    ('1.2Cr', (120.0, 120.0)),
+    ('1-1.5 Cr', (100.0, 150.0)),
+    ('50k/month', (6.0, 6.0)),
+    ('Stipend 25k per month', (3.0, 3.0)),
+    ('20k pm', (2.4, 2.4)),
+    ('Rs 50,000 per month', (6.0, 6.0)),
+    ('₹40000/month', (4.8, 4.8)),
+    # Amounts that cannot be placed are left unspecified rather than guessed
+    ('50/month', (None, None)),
+    ('$120k', (None, None)),
+    ('Competitive', (None, None)),
+    ('', (None, None)),
+    (None, (None, None)),
+])
+def test_parse_package_range(text, expected):
+    assert parse_package_range(text) == expected
+
+def test_package_fields_band():
+    assert package_fields('50k/month') == {'package_min': 6.0, 'package_max': 6.0, 'package_band': '5-10 LPA'}
+    assert package_fields('1.2Cr')['package_band'] == '20+ LPA'
+    assert package_fields('Competitive')['package_band'] == 'unspecified'
+
+# ============ Search API ============
+
+SEARCH_DRIVES = [
+    {'company_name': 'Acme', 'package': '12-15 LPA', 'deadline': '2099-03-01'},
+    {'company_name': 'Globex', 'company_domain': 'Finance', 'location': 'Mumbai', 'job_role': 'Analyst',
+     'job_description': 'Reporting for Acme clients', 'package': '6 LPA', 'deadline': '2099-01-01'},
+    {'company_name': 'Initech', 'package': 'Competitive', 'deadline': '2099-02-01',
+     'eligibility': {**DRIVE['eligibility'], 'min_cgpa': 9.0}},  # the student's 8.0 is not enough
+    {'company_name': 'Umbrella', 'location': 'Remote', 'package': '25 LPA', 'deadline': '2099-04-01', 'status': 'closed'},
+    {'company_name': 'Hooli', 'package': '8 LPA', 'deadline': '2020-01-01'},  # past its deadline
+]
+
+@pytest.fixture
+def drives(api, admin):
+    return {d['company_name']: d['id'] for d in (create_drive(api, admin, **overrides) for overrides in SEARCH_DRIVES)}
+
+def search(api, user, **params):
+    response = api.get('/api/drives/search', params=params, headers=user['headers'])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+def companies(result) -> list:
+    return [d['company_name'] for d in result['items']]
+
+def test_text_search_ranks_by_weighted_field(api, admin, drives):
+    # The company name outweighs a mention in the description
+    assert companies(search(api, admin, q='acme')) == ['Acme', 'Globex']
+    assert companies(search(api, admin, q='analyst')) == ['Globex']
+    assert search(api, admin, q='nothing like this')['total'] == 0
+
+def test_sort_modes(api, admin, drives):
+    assert companies(search(api, admin, sort='deadline')) == ['Hooli', 'Globex', 'Initech', 'Acme', 'Umbrella']
+    # Unparsed packages sort last
+    assert companies(search(api, admin, sort='package')) == ['Umbrella', 'Acme', 'Hooli', 'Globex', 'Initech']
+    # Without a query there is nothing to rank on, so relevance falls back to the deadline
+    assert companies(search(api, admin)) == companies(search(api, admin, sort='deadline'))
+
+def test_facets_count_every_match(api, admin, drives):
+    assert search(api, admin)['facets'] == {
+        'domain': {'Tech': 4, 'Finance': 1},
+        'location': {'Pune': 3, 'Mumbai': 1, 'Remote': 1},
+        'package_band': {'10-20 LPA': 1, '5-10 LPA': 2, 'unspecified': 1, '20+ LPA': 1},
+        'status': {'active': 4, 'closed': 1},
+    }
+    result = search(api, admin, domain='Tech', location='Pune', page_size=1)
+    assert result['total'] == 3
+    assert result['facets']['package_band'] == {'10-20 LPA': 1, '5-10 LPA': 1, 'unspecified': 1}
+    assert companies(search(api, admin, package_band='5-10 LPA', sort='package')) == ['Hooli', 'Globex']
+    assert companies(search(api, admin, min_package=10, sort='package')) == ['Umbrella', 'Acme']
+
+def test_pagination_reports_the_full_total(api, admin, drives):
+    pages = [search(api, admin, sort='deadline', page=page, page_size=2) for page in (1, 2, 3, 4)]
+    assert [companies(p) for p in pages] == [['Hooli', 'Globex'], ['Initech', 'Acme'], ['Umbrella'], []]
+    assert {p['total'] for p in pages} == {5}
+    assert (pages[1]['page'], pages[1]['page_size']) == (2, 2)
+    assert api.get('/api/drives/search', params={'page': 0}, headers=admin['headers']).status_code == 422
+
+def test_students_only_find_open_drives_they_are_eligible_for(api, admin, student, drives):
+    result = search(api, student, sort='deadline')
+    assert companies(result) == ['Globex', 'Acme']
+    assert result['total'] == 2
+    assert result['facets']['status'] == {'active': 2}
+    assert companies(search(api, student, q='acme')) == ['Acme', 'Globex']
+    assert search(api, student, status='closed')['total'] == 0
+
+# ============ Mongo and memory agreement ============
+
+@pytest.mark.anyio
+@pytest.mark.parametrize('params', [
+    {},
+    {'sort': 'package'},
+    {'skip': 2, 'limit': 2},
+    {'filters': {'company_domain': 'Tech', 'location': 'Pune'}},
+    {'filters': {'status': 'closed'}},
+    {'min_package': 6, 'max_package': 15},
+    {'open_on': '2025-01-01'},
+    {'profile': profile_doc('s1'), 'open_on': '2025-01-01'},
+    {'profile': profile_doc('s1', skills=['Go']), 'sort': 'package'},
+])
+async def test_mongo_pipeline_matches_memory_search(params):
+    # $text has no in-process stand-in, so text ranking is covered by the API tests above
+    mongomock_motor = pytest.importorskip('mongomock_motor')
+    db = mongomock_motor.AsyncMongoMockClient()['placement_flow_test']
+    mongo, memory = MongoDriveRepository(db, db), MemoryStorage().drives
+    docs = [drive_doc(**overrides) for overrides in SEARCH_DRIVES]
+    docs.append(drive_doc(company_name='Deleted', deleted_at='2025-01-02T00:00:00+00:00'))
+    for doc in docs:
+        await mongo.insert(doc)
+        await memory.insert(doc)
+    await memory.soft_delete(docs[-1]['id'], docs[-1]['deleted_at'])
+
+    expected, actual = await memory.search(**params), await mongo.search(**params)
+    assert [d['id'] for d in actual['items']] == [d['id'] for d in expected['items']]
+    assert (actual['total'], actual['facets']) == (expected['total'], expected['facets'])
@@ -0,0 +1,54 @@
+from eligibility import EligibilityCache, check_eligibility, eligibility_query, eligible_profiles_query
+from notifications import audience_query
+from storage.mongo import with_required_skill_keys, with_skill_keys
+from tests.conftest import drive_doc, profile_doc
+
+CRITERIA = {'min_cgpa': 8.0, 'required_skills': ['Python'], 'departments': ['CSE'], 'batches': [2025]}
+
+def test_check_eligibility():
+    profile = profile_doc('s1', cgpa=8.5, skills=['python', 'SQL'])
+    assert check_eligibility(profile, CRITERIA)
+    assert not check_eligibility({**profile, 'cgpa': 7.9}, CRITERIA)
+    assert not check_eligibility({**profile, 'department': 'ECE'}, CRITERIA)
+    assert not check_eligibility({**profile, 'skills': ['SQL']}, CRITERIA)
+
+def test_cache_follows_drive_edits():
+    cache = EligibilityCache()
+    profile = profile_doc('s1', cgpa=8.5)
+    drive = drive_doc(eligibility=CRITERIA)
+    assert cache.eligible(profile, [drive]) == [drive]
+    edited = {**drive, 'eligibility': {**CRITERIA, 'min_cgpa': 9.0}}
+    assert cache.eligible(profile, [edited]) == []
+
+def test_profile_change_reports_flips():
+    cache = EligibilityCache()
+    old = profile_doc('s1', cgpa=7.0)
+    drive = drive_doc(eligibility=CRITERIA)
+    assert cache.eligible(old, [drive]) == []
+    new = {**old, 'cgpa': 8.5}
+    assert cache.apply_profile_change(old, new, [drive]) == ([drive], [])
+    assert cache.apply_profile_change(new, old, [drive]) == ([], [drive])
+
+def test_profile_change_drops_results_for_drives_not_rechecked():
+    cache = EligibilityCache()
+    old = profile_doc('s1', cgpa=7.0)
+    drive = drive_doc(eligibility=CRITERIA)
+    assert cache.eligible(old, [drive]) == []  # cached as ineligible
+
+    # The drive is not part of this change (e.g. filtered out of the candidates)
+    new = {**old, 'cgpa': 9.0}
+    assert cache.apply_profile_change(old, new, []) == ([], [])
+    assert cache.eligible(new, [drive]) == [drive]
+
+# ============ Mongo filters ============
+
+def test_skill_filters_match_lower_cased_keys():
+    assert eligible_profiles_query(CRITERIA)['skill_keys'] == {'$in': ['python']}
+    assert audience_query({'skills': ['SQL', 'Python', 'sql']})['skill_keys'] == {'$in': ['python', 'sql']}
+    skills_clause = eligibility_query(profile_doc('s1', skills=['Python', 'GO']))['$or'][1]
+    assert skills_clause == {'required_skill_keys': {'$in': ['go', 'python']}}
+
+    # Written by the Mongo repositories alongside the originals
+    assert with_skill_keys({'skills': ['Python', 'SQL']})['skill_keys'] == ['python', 'sql']
+    assert 'skill_keys' not in with_skill_keys({'cgpa': 9.0})
+    assert with_required_skill_keys({'eligibility': CRITERIA})['required_skill_keys'] == ['python']
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+from fastapi import HTTPException
+
+from ratelimit import MemoryBucketStore, RateLimiter, RedisBucketStore, parse_rate
+
+pytestmark = pytest.mark.anyio
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_parse_rate():
+    assert parse_rate('10/minute') == (10, 60, 10)
+    assert parse_rate(' 600 / minute ; burst=120 ') == (600, 60, 120)
+    with pytest.raises(ValueError):
+        parse_rate('10 per minute')
+
+# ============ Memory store ============
+
+async def test_memory_bucket_allows_burst_then_limits():
+    store = MemoryBucketStore(clock=Clock())
+    rate = parse_rate('60/minute;burst=3')
+    decisions = [await store.take('k', rate) for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    assert decisions[3].retry_after == pytest.approx(1.0)
+
+async def test_memory_bucket_refills_continuously_up_to_burst():
+    clock = Clock()
+    store = MemoryBucketStore(clock=clock)
+    rate = parse_rate('60/minute;burst=3')
+    for _ in range(3):
+        await store.take('k', rate)
+    clock.now += 1.5  # one and a half tokens
+    assert (await store.take('k', rate)).allowed
+    assert not (await store.take('k', rate)).allowed
+    clock.now += 3600
+    assert (await store.take('k', rate)).remaining == 2  # capped at burst, minus this request
+
+async def test_memory_buckets_are_per_key_and_pruned():
+    clock = Clock()
+    store = MemoryBucketStore(max_keys=2, clock=clock)
+    rate = parse_rate('1/hour')
+    assert (await store.take('a', rate)).allowed
+    assert (await store.take('b', rate)).allowed
+    assert not (await store.take('a', rate)).allowed
+    await store.take('c', rate)
+    assert len(store._buckets) == 2  # least recently used ('b') evicted
+    assert list(store._buckets) == ['a', 'c']
+
+async def test_memory_buckets_refilled_are_swept_periodically():
+    clock = Clock()
+    store = MemoryBucketStore(clock=clock, sweep_interval=60)
+    fast, slow = parse_rate('60/minute;burst=1'), parse_rate('1/hour')
+    await store.take('fast', fast)
+    await store.take('slow', slow)
+    clock.now += 30
+    await store.take('other', fast)
+    assert list(store._buckets) == ['fast', 'slow', 'other']  # refilled, but no sweep before the interval
+
+    clock.now += 30
+    await store.take('last', fast)
+    assert list(store._buckets) == ['slow', 'last']  # 'fast' and 'other' were full again
+    assert not (await store.take('slow', slow)).allowed  # still-draining buckets keep their state
+
+# ============ Redis store (Lua script on a fakeredis stand-in) ============
+
+@pytest.fixture
+async def redis_store():
+    fakeredis = pytest.importorskip('fakeredis')
+    pytest.importorskip('lupa')  # fakeredis runs Lua scripts through lupa
+    store = RedisBucketStore(client=fakeredis.FakeAsyncRedis())
+    yield store
+    await store.close()
+
+async def test_redis_bucket_allows_burst_then_limits(redis_store):
+    rate = parse_rate('60/minute;burst=3')
+    decisions = [await redis_store.take('k', rate) for _ in range(4)]
+    assert [d.allowed for d in decisions] == [True, True, True, False]
+    assert [d.remaining for d in decisions[:3]] == [2, 1, 0]
+    assert 0 < decisions[3].retry_after <= 1.0
+
+async def test_redis_bucket_refills_and_expires(redis_store):
+    rate = parse_rate('20/second;burst=1')
+    assert (await redis_store.take('k', rate)).allowed
+    assert not (await redis_store.take('k', rate)).allowed
+    await asyncio.sleep(0.1)  # two tokens' worth, capped at the burst of one
+    assert (await redis_store.take('k', rate)).allowed
+    assert 0 < await redis_store.client.pttl('ratelimit:k') <= 1050
+
+async def test_redis_buckets_are_per_key(redis_store):
+    rate = parse_rate('1/hour')
+    assert (await redis_store.take('a', rate)).allowed
+    assert (await redis_store.take('b', rate)).allowed
+    assert not (await redis_store.take('a', rate)).allowed
+
+# ============ Limiter ============
+
+async def test_enforce_raises_429_with_retry_after():
+    limiter = RateLimiter(MemoryBucketStore(clock=Clock()), {'login': parse_rate('2/minute')}, enabled=True)
+    await limiter.enforce('login', 'ip')
+    await limiter.enforce('login', 'ip')
+    with pytest.raises(HTTPException) as error:
+        await limiter.enforce('login', 'ip')
+    assert error.value.status_code == 429
+    assert error.value.headers['Retry-After'] == '30'
+
+async def test_store_outage_lets_requests_through():
+    class BrokenStore:
+        async def take(self, key, rate, cost=1):
+            raise ConnectionError('store down')
+
+    limiter = RateLimiter(BrokenStore(), {'login': parse_rate('1/minute')}, enabled=True)
+    for _ in range(3):
+        await limiter.enforce('login', 'ip')
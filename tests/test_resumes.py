@@ -0,0 +1,128 @@
+import os
+
+import pytest
+
+from resumes import InvalidResume, LocalBlobStore, ResumeTooLarge, parse_range, resume_filename, spool_resume
+from tests.conftest import add_user
+
+PDF = 'application/pdf'
+DOCX = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+
+@pytest.mark.parametrize('header, expected', [
+    (None, None),
+    ('bytes=0-99', (0, 99)),
+    ('bytes=100-', (100, 999)),
+    ('bytes=900-5000', (900, 999)),  # clamped to the file
+    ('bytes=-100', (900, 999)),  # suffix range
+    ('bytes=-5000', (0, 999)),
+    ('bytes=0-1,5-6', None),  # multi-range and malformed headers send the whole file
+    ('items=0-1', None),
+    ('bytes=-', None),
+])
+def test_parse_range(header, expected):
+    assert parse_range(header, 1000) == expected
+
+@pytest.mark.parametrize('header', ['bytes=1000-', 'bytes=10-5', 'bytes=-0'])
+def test_unsatisfiable_range(header):
+    with pytest.raises(ValueError):
+        parse_range(header, 1000)
+
+def test_resume_filename():
+    assert resume_filename('../../etc/My CV.PDF', PDF) == 'My CV.pdf'
+    assert resume_filename('cv"\n.docx', DOCX) == 'cv.docx'
+    assert resume_filename('notes.txt', PDF) == 'notes.txt.pdf'
+    assert resume_filename(None, PDF) == 'resume.pdf'
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+@pytest.mark.anyio
+async def test_spool_resume_hashes_and_checks_the_upload(tmp_path):
+    spooled = await spool_resume(chunks(b'%P', b'DF-1.7 body'), PDF, directory=str(tmp_path))
+    assert spooled.size == 13
+    with open(spooled.path, 'rb') as f:
+        assert f.read() == b'%PDF-1.7 body'
+
+    with pytest.raises(InvalidResume):
+        await spool_resume(chunks(b'<html>'), PDF, directory=str(tmp_path))
+    with pytest.raises(InvalidResume):
+        await spool_resume(chunks(b'%PDF-'), 'text/plain', directory=str(tmp_path))
+    with pytest.raises(ResumeTooLarge):
+        await spool_resume(chunks(b'%PDF-', b'x' * 10), PDF, max_bytes=10, directory=str(tmp_path))
+    assert os.listdir(tmp_path) == [os.path.basename(spooled.path)]  # rejected uploads leave no temp file
+
+def test_upload_and_ranged_download(api, admin, student):
+    body = b'%PDF-1.7 ' + bytes(range(256)) * 4
+    response = api.put('/api/profile/resume', params={'filename': 'cv.pdf'}, content=body,
+                       headers={**student['headers'], 'Content-Type': PDF})
+    assert response.status_code == 200, response.text
+    url = response.json()['resume_url']
+
+    full = api.get(url, headers=admin['headers'])
+    assert (full.status_code, full.content) == (200, body)
+    partial = api.get(url, headers={**admin['headers'], 'Range': 'bytes=5-8'})
+    assert (partial.status_code, partial.content) == (206, body[5:9])
+    assert partial.headers['Content-Range'] == f"bytes 5-8/{len(body)}"
+    assert api.get(url, headers={**admin['headers'], 'Range': f"bytes={len(body)}-"}).status_code == 416
+    assert api.get(url, headers={**admin['headers'], 'If-None-Match': full.headers['ETag']}).status_code == 304
+
+    assert api.get(url, headers=student['headers']).status_code == 200
+    assert api.get(url, headers=add_user('student')['headers']).status_code == 403
+    response = api.put('/api/profile/resume', content=b'plain text',
+                       headers={**student['headers'], 'Content-Type': PDF})
+    assert response.status_code == 415
+
+# ============ Shared blobs ============
+
+async def stored_blob(store: LocalBlobStore, tmp_path, content: bytes = b'%PDF-shared') -> str:
+    spool = tmp_path / 'upload'
+    spool.write_bytes(content)
+    await store.put('ab' * 32, str(spool))
+    return 'ab' * 32
+
+@pytest.mark.anyio
+async def test_blob_is_restored_when_referenced_during_delete(tmp_path):
+    store = LocalBlobStore(str(tmp_path / 'blobs'))
+    digest = await stored_blob(store, tmp_path)
+    checks = iter([False, True])  # an upload references the digest after the first check
+
+    async def in_use():
+        return next(checks)
+    assert not await store.delete_unused(digest, in_use)
+    assert await store.exists(digest)
+    assert os.listdir(store.spool_dir) == []
+
+@pytest.mark.anyio
+async def test_upload_after_delete_stores_its_own_copy(tmp_path):
+    store = LocalBlobStore(str(tmp_path / 'blobs'))
+    digest = await stored_blob(store, tmp_path)
+
+    async def unused():
+        return False
+    assert await store.delete_unused(digest, unused)
+    assert not await store.exists(digest)
+    assert await stored_blob(store, tmp_path) == digest  # put() runs after the reference was written
+    assert await store.exists(digest)
+
+def test_deleting_a_shared_resume_during_an_upload_keeps_the_blob(api, monkeypatch):
+    import server
+    body = b'%PDF-1.7 shared resume'
+    first, second = add_user('student'), add_user('student')
+    upload = {'content': body, 'params': {'filename': 'cv.pdf'}}
+    assert api.put('/api/profile/resume', headers={**first['headers'], 'Content-Type': PDF},
+                   **upload).status_code == 200
+
+    put = server.resume_store.put
+    async def release_after_put(digest, path):
+        stored = await put(digest, path)
+        assert not stored  # deduplicated against the first student's copy
+        # ...which that student removes right away
+        await server.delete_resume(current_user={'user_id': first['user_id'], 'role': 'student'})
+        return stored
+    monkeypatch.setattr(server.resume_store, 'put', release_after_put)
+
+    response = api.put('/api/profile/resume', headers={**second['headers'], 'Content-Type': PDF}, **upload)
+    assert response.status_code == 200, response.text
+    download = api.get(response.json()['resume_url'], headers=second['headers'])
+    assert (download.status_code, download.content) == (200, body)
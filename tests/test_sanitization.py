@@ -0,0 +1,24 @@
+import pytest
+
+from sanitization import password_error, sanitize_input
+
+@pytest.mark.parametrize('text, expected', [
+    ('AT&T', 'AT&T'),
+    ('a < b > c', 'a < b > c'),
+    ('R&D <b>team</b>', 'R&D team'),
+    ('<script>alert(1)</script>Hi', 'alert(1)Hi'),
+    ('Tom &amp; Jerry', 'Tom & Jerry'),
+])
+def test_sanitize_strips_tags_and_keeps_plain_text(text, expected):
+    assert sanitize_input(text) == expected
+
+def test_encoded_tags_do_not_decode_into_markup():
+    assert sanitize_input('&lt;script&gt;x') == 'x'
+    assert sanitize_input('&amp;lt;b&amp;gt;y') == 'y'
+    assert '<' not in sanitize_input('&amp;amp;amp;amp;amp;lt;i&gt;')
+
+def test_password_policy():
+    assert password_error('Passw0rd') is None
+    assert 'at least 8' in password_error('Pa0')
+    assert 'uppercase' in password_error('passw0rd')
+    assert 'number' in password_error('Password')
@@ -0,0 +1,74 @@
+from shortlisting import rank_applicants
+from tests.conftest import add_user
+
+CRITERIA = {'min_cgpa': 6.0, 'required_skills': ['Python', 'SQL'], 'departments': ['CSE'], 'batches': [2025]}
+
+def test_rank_applicants_weights_and_ties():
+    apps = [
+        {'id': 'a', 'student_id': 'high_cgpa', 'applied_at': '2025-01-02'},
+        {'id': 'b', 'student_id': 'skilled', 'applied_at': '2025-01-01'},
+        {'id': 'c', 'student_id': 'skilled_late', 'applied_at': '2025-01-03'},
+        {'id': 'd', 'student_id': 'no_profile', 'applied_at': '2025-01-01'},
+    ]
+    profiles = {
+        'high_cgpa': {'cgpa': 9.5, 'skills': [], 'department': 'CSE'},
+        'skilled': {'cgpa': 7.0, 'skills': ['python', 'sql'], 'department': 'CSE'},
+        'skilled_late': {'cgpa': 7.0, 'skills': ['Python', 'SQL'], 'department': 'CSE'},
+    }
+    by_default = rank_applicants(apps, profiles, CRITERIA)
+    assert [a['id'] for a in by_default] == ['b', 'c', 'a']  # equal scores: earliest applied first
+    assert by_default[0]['score_breakdown'] == {'cgpa': 0.7, 'skills': 1.0, 'department': 1.0}
+
+    cgpa_only = rank_applicants(apps, profiles, CRITERIA, {'cgpa': 1, 'skills': 0, 'department': 0}, top_k=1)
+    assert [a['id'] for a in cgpa_only] == ['a']
+
+def test_ranking_previews_weighted_shortlist(api, admin):
+    response = api.post('/api/drives', json={
+        'company_name': 'Acme', 'company_domain': 'Tech', 'job_role': 'SDE', 'package': '10 LPA',
+        'location': 'Pune', 'job_description': 'Build things', 'deadline': '2099-01-01', 'eligibility': CRITERIA,
+    }, headers=admin['headers'])
+    drive_id = response.json()['id']
+    high_cgpa = add_user('student', cgpa=9.8, skills=['Python'])
+    skilled = add_user('student', cgpa=7.0, skills=['Python', 'SQL'])
+    for student in (high_cgpa, skilled):
+        api.post('/api/applications', json={'drive_id': drive_id}, headers=student['headers'])
+
+    ranking = f"/api/drives/{drive_id}/ranking"
+    default_order = [a['student_id'] for a in api.get(ranking, headers=admin['headers']).json()]
+    assert default_order == [skilled['user_id'], high_cgpa['user_id']]
+    weighted = api.get(ranking, params={'cgpa': 1, 'skills': 0, 'department': 0}, headers=admin['headers']).json()
+    assert [a['student_id'] for a in weighted] == [high_cgpa['user_id'], skilled['user_id']]
+    assert api.get(ranking, params={'cgpa': -1}, headers=admin['headers']).status_code == 422
+
+    response = api.post(f"/api/drives/{drive_id}/shortlist", headers=admin['headers'], json={
+        'top_k': 1, 'weights': {'cgpa': 1, 'skills': 0, 'department': 0}})
+    assert response.json()['application_ids'] == [weighted[0]['id']]
+
+def test_shortlist_skips_applications_changed_after_ranking(api, admin, monkeypatch):
+    import server
+    response = api.post('/api/drives', json={
+        'company_name': 'Acme', 'company_domain': 'Tech', 'job_role': 'SDE', 'package': '10 LPA',
+        'location': 'Pune', 'job_description': 'Build things', 'deadline': '2099-01-01', 'eligibility': CRITERIA,
+    }, headers=admin['headers'])
+    drive_id = response.json()['id']
+    students = [add_user('student', cgpa=cgpa, skills=['Python', 'SQL']) for cgpa in (9.0, 8.0)]
+    app_ids = [api.post('/api/applications', json={'drive_id': drive_id}, headers=s['headers']).json()['id']
+               for s in students]
+
+    ranked_applicants = server.ranked_applicants
+    async def rank_then_reject_first(*args, **kwargs):
+        ranked = await ranked_applicants(*args, **kwargs)
+        # Another admin rejects the top candidate between the ranking and the bulk write
+        await server.storage.applications.update_status(app_ids[0], 'applied', 'rejected', '2025-01-02T00:00:00+00:00')
+        return ranked
+    monkeypatch.setattr(server, 'ranked_applicants', rank_then_reject_first)
+
+    response = api.post(f"/api/drives/{drive_id}/shortlist", json={'top_k': 2}, headers=admin['headers'])
+    assert response.status_code == 200, response.text
+    assert (response.json()['shortlisted'], response.json()['application_ids']) == (1, [app_ids[1]])
+
+    rejected = api.get(f"/api/applications/{app_ids[0]}/timeline", headers=admin['headers']).json()
+    assert [e['to_status'] for e in rejected] == ['applied']
+    for student, expected in zip(students, ([], ['Application status updated: Acme - shortlisted'])):
+        messages = [n['message'] for n in api.get('/api/notifications', headers=student['headers']).json()]
+        assert [m for m in messages if m.startswith('Application status')] == expected
@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+from tests.test_api import create_drive
+
+pytestmark = pytest.mark.anyio
+
+class CountingLoader:
+    """Loader that blocks until released and counts the underlying calls"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error:
+            raise self.error
+        return self.result if self.result is not None else self.calls
+
+async def waiting(flight: SingleFlight, count: int) -> None:
+    await asyncio.sleep(0)  # let every caller reach do()
+    assert flight.in_flight() == count
+
+async def test_concurrent_calls_share_one_load():
+    flight = SingleFlight('test')
+    loader = CountingLoader(result={'id': 'drive_1'})
+    callers = [asyncio.create_task(flight.do('drive_1', loader)) for _ in range(5)]
+    await waiting(flight, 1)
+    loader.release.set()
+    results = await asyncio.gather(*callers)
+    assert loader.calls == 1
+    assert all(r is results[0] for r in results)
+    assert flight.in_flight() == 0
+
+async def test_keys_are_loaded_independently():
+    flight = SingleFlight('test')
+    loader = CountingLoader()
+    callers = [asyncio.create_task(flight.do(key, loader)) for key in ('a', 'b', 'a')]
+    await waiting(flight, 2)
+    loader.release.set()
+    await asyncio.gather(*callers)
+    assert loader.calls == 2
+
+async def test_error_reaches_every_waiter():
+    flight = SingleFlight('test')
+    loader = CountingLoader(error=ValueError('query failed'))
+    callers = [asyncio.create_task(flight.do('k', loader)) for _ in range(3)]
+    await waiting(flight, 1)
+    loader.release.set()
+    results = await asyncio.gather(*callers, return_exceptions=True)
+    assert [str(r) for r in results] == ['query failed'] * 3
+    assert loader.calls == 1 and flight.in_flight() == 0
+
+async def test_key_is_released_so_later_calls_load_fresh_data():
+    flight = SingleFlight('test')
+    loader = CountingLoader()
+    loader.release.set()
+    assert await flight.do('k', loader) == 1
+    assert await flight.do('k', loader) == 2  # nothing cached past the call
+    assert flight.in_flight() == 0
+
+async def test_cancelled_caller_does_not_cancel_the_shared_load():
+    flight = SingleFlight('test')
+    loader = CountingLoader(result='ok')
+    leader = asyncio.create_task(flight.do('k', loader))
+    follower = asyncio.create_task(flight.do('k', loader))
+    await waiting(flight, 1)
+    leader.cancel()
+    await asyncio.sleep(0)
+    loader.release.set()
+    assert await follower == 'ok'
+    assert loader.calls == 1
+
+def test_coalesced_drive_reads_see_updates_immediately(api, admin, student):
+    drive = create_drive(api, admin)
+    url = f"/api/drives/{drive['id']}"
+    assert api.get(url, headers=student['headers']).json()['location'] == 'Pune'
+    assert api.put(url, json={'location': 'Remote'}, headers=admin['headers']).status_code == 200
+    assert api.get(url, headers=student['headers']).json()['location'] == 'Remote'
+    assert [d['location'] for d in api.get('/api/drives', headers=student['headers']).json()] == ['Remote']
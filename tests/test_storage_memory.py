@@ -0,0 +1,172 @@
+import pytest
+from pymongo.errors import DuplicateKeyError
+
+from tests.conftest import drive_doc, profile_doc
+
+# Repository contract (storage/base.py) on the in-memory backend
+
+pytestmark = pytest.mark.anyio
+
+def user_doc(user_id, email=None, role='student'):
+    return {'id': user_id, 'email': email or f"{user_id}@college.edu", 'role': role, 'name': user_id}
+
+def application_doc(app_id, student_id, drive_id, status='applied', applied_at='2025-01-01T00:00:00+00:00'):
+    return {'id': app_id, 'student_id': student_id, 'drive_id': drive_id, 'status': status,
+            'applied_at': applied_at, 'status_changed_at': applied_at}
+
+def notification_doc(notif_id, user_id, created_at, drive_id=None, read=False):
+    doc = {'id': notif_id, 'user_id': user_id, 'message': f"message {notif_id}", 'read': read,
+           'created_at': created_at}
+    if drive_id:
+        doc['drive_id'] = drive_id
+    return doc
+
+# ============ Users ============
+
+async def test_users_lookup_by_id_and_email(storage):
+    await storage.users.insert(user_doc('u1', 'a@college.edu'))
+    assert (await storage.users.get('u1'))['email'] == 'a@college.edu'
+    assert (await storage.users.get_by_email('a@college.edu'))['id'] == 'u1'
+    assert await storage.users.get('missing') is None
+
+async def test_users_reject_duplicate_email(storage):
+    await storage.users.insert(user_doc('u1', 'a@college.edu'))
+    with pytest.raises(DuplicateKeyError):
+        await storage.users.insert(user_doc('u2', 'a@college.edu'))
+
+async def test_users_insert_many_is_unordered(storage):
+    errors = await storage.users.insert_many([
+        user_doc('u1', 'a@college.edu'), user_doc('u2', 'a@college.edu'), user_doc('u3', 'c@college.edu'),
+    ])
+    assert errors == {1: 'Duplicate key'}
+    assert await storage.users.existing_emails(['a@college.edu', 'b@college.edu', 'c@college.edu']) == {
+        'a@college.edu', 'c@college.edu'}
+
+async def test_returned_documents_are_copies(storage):
+    await storage.users.insert(user_doc('u1'))
+    user = await storage.users.get('u1')
+    user['role'] = 'admin'
+    assert (await storage.users.get('u1'))['role'] == 'student'
+
+# ============ Profiles ============
+
+async def test_profiles_update_returns_new_document(storage):
+    await storage.profiles.insert(profile_doc('u1'))
+    updated = await storage.profiles.update('u1', {'cgpa': 9.1})
+    assert updated['cgpa'] == 9.1
+    assert (await storage.profiles.get_by_user('u1'))['cgpa'] == 9.1
+    assert await storage.profiles.update('missing', {'cgpa': 1.0}) is None
+
+async def test_profiles_list_eligible_matches_criteria(storage):
+    await storage.profiles.insert_many([
+        profile_doc('ok', skills=['python', 'Go']),
+        profile_doc('low_cgpa', cgpa=6.0),
+        profile_doc('other_department', department='ECE'),
+        profile_doc('other_batch', batch=2026),
+        profile_doc('no_skill', skills=['Java']),
+    ])
+    criteria = {'min_cgpa': 7.0, 'required_skills': ['Python'], 'departments': ['CSE'], 'batches': [2025]}
+    assert [p['user_id'] for p in await storage.profiles.list_eligible(criteria)] == ['ok']
+
+async def test_profiles_get_many_and_counts(storage):
+    await storage.profiles.insert_many([profile_doc('u1'), profile_doc('u2', department='ECE')])
+    assert set(await storage.profiles.get_many_by_user(['u1', 'u2', 'missing'])) == {'u1', 'u2'}
+    assert await storage.profiles.count() == 2
+    assert await storage.profiles.department_counts() == {'CSE': 1, 'ECE': 1}
+
+# ============ Drives ============
+
+async def test_drives_filter_by_package_and_open_date(storage):
+    cheap = drive_doc(package='4 LPA')
+    rich = drive_doc(package='20-25 LPA')
+    closed = drive_doc(package='20 LPA', deadline='2020-01-01')
+    for drive in (cheap, rich, closed):
+        await storage.drives.insert(drive)
+    assert {d['id'] for d in await storage.drives.list_all(min_package=10)} == {rich['id'], closed['id']}
+    assert {d['id'] for d in await storage.drives.list_all(open_on='2025-06-01')} == {cheap['id'], rich['id']}
+
+async def test_soft_deleted_drives_are_hidden(storage):
+    drive = drive_doc()
+    await storage.drives.insert(drive)
+    assert await storage.drives.soft_delete(drive['id'], '2025-01-02T00:00:00+00:00')
+    assert await storage.drives.get(drive['id']) is None
+    assert await storage.drives.list_all() == []
+    assert [d['id'] for d in await storage.drives.list_deleted()] == [drive['id']]
+    assert not await storage.drives.soft_delete(drive['id'], '2025-01-03T00:00:00+00:00')
+    assert await storage.drives.delete(drive['id'])
+    assert await storage.drives.list_deleted() == []
+
+async def test_drive_reminder_is_claimed_once(storage):
+    drive = drive_doc(deadline='2025-06-01')
+    await storage.drives.insert(drive)
+    assert (await storage.drives.claim_reminder('2025-06-01', 'now'))['id'] == drive['id']
+    assert await storage.drives.claim_reminder('2025-06-01', 'later') is None
+
+# ============ Applications ============
+
+async def test_applications_indexed_lookups(storage):
+    await storage.applications.insert(application_doc('a1', 's1', 'd1'))
+    await storage.applications.insert(application_doc('a2', 's1', 'd2'))
+    await storage.applications.insert(application_doc('a3', 's2', 'd1'))
+    assert (await storage.applications.find_for_student('s1', 'd2'))['id'] == 'a2'
+    assert {a['id'] for a in await storage.applications.list_by_student('s1')} == {'a1', 'a2'}
+    assert {a['id'] for a in await storage.applications.list_by_drive('d1')} == {'a1', 'a3'}
+    assert await storage.applications.count() == 3
+
+async def test_application_status_update_is_conditional(storage):
+    await storage.applications.insert(application_doc('a1', 's1', 'd1'))
+    updated = await storage.applications.update_status('a1', 'applied', 'shortlisted', 'now')
+    assert updated['status'] == 'shortlisted'
+    # A second writer that read 'applied' loses
+    assert await storage.applications.update_status('a1', 'applied', 'rejected', 'now') is None
+    assert await storage.applications.status_counts() == {'shortlisted': 1}
+
+async def test_application_delete_checks_owner_and_batches_by_drive(storage):
+    for i in range(5):
+        await storage.applications.insert(application_doc(f"a{i}", f"s{i}", 'd1'))
+    assert not await storage.applications.delete_for_student('a0', 'someone_else')
+    assert await storage.applications.delete_for_student('a0', 's0')
+    assert await storage.applications.delete_by_drive('d1', limit=3) == 3
+    assert await storage.applications.delete_by_drive('d1', limit=3) == 1
+    assert await storage.applications.list_by_drive('d1') == []
+
+# ============ Notifications ============
+
+async def test_notifications_newest_first_and_read_marks(storage):
+    await storage.notifications.insert_many([
+        notification_doc('n1', 'u1', '2025-01-01T00:00:00+00:00'),
+        notification_doc('n2', 'u1', '2025-01-02T00:00:00+00:00'),
+        notification_doc('n3', 'u2', '2025-01-03T00:00:00+00:00'),
+    ])
+    assert [n['id'] for n in await storage.notifications.list_for_user('u1')] == ['n2', 'n1']
+    assert not await storage.notifications.mark_read('n3', 'u1')
+    assert await storage.notifications.mark_read('n1', 'u1')
+    await storage.notifications.mark_all_read('u1')
+    assert all(n['read'] for n in await storage.notifications.list_for_user('u1'))
+    assert not (await storage.notifications.list_for_user('u2'))[0]['read']
+
+async def test_notifications_delete_by_drive(storage):
+    await storage.notifications.insert_many([
+        notification_doc('n1', 'u1', '2025-01-01T00:00:00+00:00', drive_id='d1'),
+        notification_doc('n2', 'u2', '2025-01-01T00:00:00+00:00', drive_id='d1'),
+        notification_doc('n3', 'u1', '2025-01-01T00:00:00+00:00', drive_id='d2'),
+    ])
+    assert await storage.notifications.delete_by_drive('d1') == 2
+    assert [n['id'] for n in await storage.notifications.list_for_user('u1')] == ['n3']
+
+async def test_notification_digest_claims_each_notification_once(storage):
+    await storage.notifications.insert_many([
+        notification_doc('n1', 'u1', '2025-01-01T01:00:00+00:00'),
+        notification_doc('n2', 'u1', '2025-01-01T02:00:00+00:00'),
+        notification_doc('n3', 'u2', '2025-01-01T03:00:00+00:00', read=True),
+        notification_doc('old', 'u2', '2024-01-01T00:00:00+00:00'),
+    ])
+    since, until = '2025-01-01T00:00:00+00:00', '2025-01-02T00:00:00+00:00'
+    assert await storage.notifications.claim_for_digest('digest_1', since, until) == 2
+    assert await storage.notifications.claim_for_digest('digest_2', since, until) == 0
+    assert await storage.notifications.digest_summaries('digest_1', max_messages=1) == [
+        {'user_id': 'u1', 'count': 2, 'messages': ['message n2']}]
+
+    await storage.notifications.release_digest('digest_1', ['u1'])
+    assert await storage.notifications.digest_summaries('digest_1', max_messages=5) == []
+    assert await storage.notifications.claim_for_digest('digest_3', since, until) == 2
@@ -0,0 +1,96 @@
+import threading
+import time
+
+import pytest
+
+import student_import
+from student_import import StudentImporter, fail_stale_jobs
+
+CSV = (
+    'email,name,password,department,batch,cgpa,skills\n'
+    'asha@college.edu,Asha,Passw0rd!,CSE,2025,8.2,Python; SQL\n'
+    'weak@college.edu,Weak,short,CSE,2025,7.0,\n'
+)
+
+async def fake_hash(password: str) -> str:
+    return f"hashed:{password}"
+
+def wait_for_import(api, job_id: str, headers: dict) -> dict:
+    for _ in range(100):
+        job = api.get(f"/api/students/import/{job_id}", headers=headers).json()
+        if job['status'] in ('completed', 'failed'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Import {job_id} did not finish: {job}")
+
+def test_import_creates_students_and_reports_row_errors(api, admin):
+    response = api.post('/api/students/import', content=CSV, headers={**admin['headers'], 'Content-Type': 'text/csv'})
+    assert response.status_code == 202, response.text
+    job = wait_for_import(api, response.json()['id'], admin['headers'])
+    assert (job['status'], job['processed'], job['created'], job['failed']) == ('completed', 2, 1, 1)
+    assert job['error'] is None
+    assert [(e['row'], e['email']) for e in job['errors']] == [(2, 'weak@college.edu')]
+
+    login = api.post('/api/auth/login', json={'email': 'asha@college.edu', 'password': 'Passw0rd!'})
+    assert login.status_code == 200
+    profile = api.get('/api/profile', headers={'Authorization': f"Bearer {login.json()['token']}"}).json()
+    assert profile['skills'] == ['Python', 'SQL']
+
+@pytest.mark.anyio
+async def test_user_is_removed_when_its_profile_fails(storage, tmp_path):
+    async def reject_profiles(docs):
+        return {0: 'duplicate key'}
+    storage.profiles.insert_many = reject_profiles
+
+    path = tmp_path / 'students.csv'
+    path.write_text(CSV)
+    await storage.import_jobs.insert({'id': 'job', 'status': 'queued', 'created_at': '2025-01-01T00:00:00+00:00'})
+    await StudentImporter(storage, 'job', fake_hash).run(str(path), 'csv')
+
+    job = await storage.import_jobs.get('job')
+    assert (job['status'], job['created'], job['failed']) == ('completed', 0, 2)
+    assert job['errors'][0]['error'] == 'Profile not created: duplicate key'
+    # No orphan user left to block re-importing the row
+    assert await storage.users.get_by_email('asha@college.edu') is None
+
+@pytest.mark.anyio
+async def test_rows_are_read_off_the_event_loop(storage, tmp_path, monkeypatch):
+    threads = set()
+    read_rows = student_import.iter_rows
+
+    def recording_iter_rows(path, fmt):
+        for row in read_rows(path, fmt):
+            threads.add(threading.get_ident())
+            yield row
+    monkeypatch.setattr(student_import, 'iter_rows', recording_iter_rows)
+
+    path = tmp_path / 'students.ndjson'
+    path.write_text(
+        '{"email": "asha@college.edu", "name": "Asha", "password": "Passw0rd!"}\n'
+        'not json\n'
+        '{"email": "ravi@college.edu", "name": "Ravi", "password": "Passw0rd!"}\n'
+    )
+    await storage.import_jobs.insert({'id': 'job', 'status': 'queued', 'created_at': '2025-01-01T00:00:00+00:00'})
+    await StudentImporter(storage, 'job', fake_hash, batch_size=2).run(str(path), 'ndjson')
+
+    job = await storage.import_jobs.get('job')
+    assert (job['status'], job['processed'], job['created'], job['failed']) == ('completed', 3, 2, 1)
+    assert [e['row'] for e in job['errors']] == [2]
+    assert threads and threading.get_ident() not in threads
+
+@pytest.mark.anyio
+async def test_stale_jobs_are_marked_failed(storage):
+    jobs = [
+        {'id': 'interrupted', 'status': 'running', 'updated_at': '2025-01-01T00:00:00+00:00'},
+        {'id': 'never_started', 'status': 'queued'},
+        {'id': 'in_progress', 'status': 'running', 'updated_at': '2999-01-01T00:00:00+00:00'},
+        {'id': 'finished', 'status': 'completed', 'updated_at': '2025-01-01T00:00:00+00:00'},
+    ]
+    for job in jobs:
+        await storage.import_jobs.insert({'created_at': '2025-01-01T00:00:00+00:00', **job})
+
+    assert await fail_stale_jobs(storage) == 2
+    statuses = {job['id']: (await storage.import_jobs.get(job['id']))['status'] for job in jobs}
+    assert statuses == {'interrupted': 'failed', 'never_started': 'failed', 'in_progress': 'running',
+                        'finished': 'completed'}
+    assert 'server restart' in (await storage.import_jobs.get('interrupted'))['error']